@@ -1,11 +1,12 @@
 """
 Paquete de estructuras de árboles
-Incluye: Árbol N-ario, Árbol Binario de Búsqueda y Árbol B
+Incluye: Árbol N-ario, Árbol Binario de Búsqueda, Árbol B y Árbol B+
 """
 
 from .arbol_nario import NodoArbolNario, ArbolNArio
 from .arbol_binario import NodoArbolBinario, ArbolBinarioBusqueda
 from .arbol_b import NodoBTree, BTree
+from .arbol_b_mas import NodoBPlus, BPlusTree
 
 __all__ = [
     'NodoArbolNario',
@@ -13,5 +14,7 @@ __all__ = [
     'NodoArbolBinario',
     'ArbolBinarioBusqueda',
     'NodoBTree',
-    'BTree'
+    'BTree',
+    'NodoBPlus',
+    'BPlusTree'
 ]
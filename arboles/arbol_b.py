@@ -1,15 +1,56 @@
 """
 Módulo que define el Árbol B (B-Tree) para índice global de archivos
 """
+import heapq
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+
+def comprimir_prefijos(claves):
+    """Front coding de claves ordenadas: ([caracteres compartidos con la anterior], [sufijos])"""
+    comunes = []
+    sufijos = []
+    anterior = ""
+    for clave in claves:
+        # Búsqueda binaria del prefijo común (startswith compara en C)
+        bajo, alto = 0, min(len(anterior), len(clave))
+        while bajo < alto:
+            medio = (bajo + alto + 1) // 2
+            if clave.startswith(anterior[:medio]):
+                bajo = medio
+            else:
+                alto = medio - 1
+        comunes.append(bajo)
+        sufijos.append(clave[bajo:])
+        anterior = clave
+    return comunes, sufijos
+
+
+def descomprimir_prefijos(comunes, sufijos):
+    """Inversa de comprimir_prefijos"""
+    claves = []
+    anterior = ""
+    for comun, sufijo in zip(comunes, sufijos):
+        anterior = anterior[:comun] + sufijo
+        claves.append(anterior)
+    return claves
+
 
 class NodoBTree:
     """Nodo para Árbol B (B-Tree)"""
+    __slots__ = ('t', 'hoja', 'claves', 'valores', 'hijos', 'cantidad')
+    
     def __init__(self, t, hoja=True):
         self.t = t  # Grado mínimo
         self.hoja = hoja
         self.claves = []  # Lista de claves (nombres de archivos)
         self.valores = []  # Lista de valores (metadatos)
         self.hijos = []  # Lista de hijos
+        self.cantidad = 0  # Claves en todo el subárbol (para rank/select)
+    
+    def recontar(self):
+        """Recalcula la cantidad de claves del subárbol a partir de sus hijos"""
+        self.cantidad = len(self.claves) + sum(hijo.cantidad for hijo in self.hijos)
     
     def __str__(self):
         return f"NodoBTree(hoja={self.hoja}, claves={self.claves})"
@@ -18,15 +59,79 @@ class NodoBTree:
 class BTree:
     """Árbol B para índice global de archivos"""
     def __init__(self, t=3):
+        if t < 2:
+            raise ValueError(f"El grado mínimo del árbol B debe ser >= 2 (recibido: {t})")
         self.raiz = None
         self.t = t  # Grado mínimo
     
+    @classmethod
+    def bulk_load(cls, pares_ordenados, fill_factor=1.0, t=3):
+        """
+        Construye un árbol B de abajo hacia arriba en O(n) a partir de pares
+        (clave, valor) ya ordenados por clave y sin claves repetidas.
+        fill_factor (0-1] indica qué fracción de las 2t-1 claves ocupa cada nodo.
+        """
+        arbol = cls(t)
+        claves = [clave for clave, _ in pares_ordenados]
+        valores = [valor for _, valor in pares_ordenados]
+        if not claves:
+            return arbol
+        
+        capacidad = round(fill_factor * (2 * t - 1))
+        capacidad = max(t - 1, min(2 * t - 1, capacidad), 1)
+        
+        hijos = None
+        while True:
+            nodos, claves, valores = arbol._construir_nivel(claves, valores, hijos, capacidad)
+            if len(nodos) == 1:
+                arbol.raiz = nodos[0]
+                return arbol
+            hijos = nodos
+    
+    def _construir_nivel(self, claves, valores, hijos, capacidad):
+        """
+        Reparte las claves de un nivel en nodos de tamaño parejo.
+        Retorna los nodos y las claves separadoras que suben al nivel superior.
+        """
+        n = len(claves)
+        num_nodos = -(-(n + 1) // (capacidad + 1))
+        while num_nodos > 1 and (n - num_nodos + 1) // num_nodos < self.t - 1:
+            num_nodos -= 1
+        
+        base, extra = divmod(n - num_nodos + 1, num_nodos)
+        nodos = []
+        claves_padre = []
+        valores_padre = []
+        inicio = 0
+        inicio_hijos = 0
+        
+        for i in range(num_nodos):
+            tamanio = base + (1 if i < extra else 0)
+            nodo = NodoBTree(self.t, hijos is None)
+            nodo.claves = claves[inicio:inicio + tamanio]
+            nodo.valores = valores[inicio:inicio + tamanio]
+            if hijos is not None:
+                nodo.hijos = hijos[inicio_hijos:inicio_hijos + tamanio + 1]
+                inicio_hijos += tamanio + 1
+            nodo.recontar()
+            nodos.append(nodo)
+            inicio += tamanio
+            
+            # La clave siguiente separa este nodo del próximo y sube un nivel
+            if i < num_nodos - 1:
+                claves_padre.append(claves[inicio])
+                valores_padre.append(valores[inicio])
+                inicio += 1
+        
+        return nodos, claves_padre, valores_padre
+    
     def insertar(self, clave, valor):
         """Inserta una clave-valor en el árbol B"""
         if not self.raiz:
             self.raiz = NodoBTree(self.t, True)
             self.raiz.claves.append(clave)
             self.raiz.valores.append(valor)
+            self.raiz.cantidad = 1
         else:
             if len(self.raiz.claves) == (2 * self.t - 1):
                 nueva_raiz = NodoBTree(self.t, False)
@@ -38,26 +143,101 @@ class BTree:
     
     def _insertar_no_lleno(self, nodo, clave, valor):
         """Inserta en un nodo no lleno"""
-        i = len(nodo.claves) - 1
+        # Búsqueda binaria: posición tras las claves <= clave
+        i = bisect_right(nodo.claves, clave)
         
         if nodo.hoja:
-            while i >= 0 and clave < nodo.claves[i]:
-                i -= 1
-            
-            nodo.claves.insert(i + 1, clave)
-            nodo.valores.insert(i + 1, valor)
+            nodo.claves.insert(i, clave)
+            nodo.valores.insert(i, valor)
         else:
-            while i >= 0 and clave < nodo.claves[i]:
-                i -= 1
-            
-            i += 1
-            
             if len(nodo.hijos[i].claves) == (2 * self.t - 1):
                 self._dividir_hijo(nodo, i)
                 if clave > nodo.claves[i]:
                     i += 1
             
             self._insertar_no_lleno(nodo.hijos[i], clave, valor)
+        
+        nodo.cantidad += 1
+    
+    def insertar_lote(self, pares):
+        """
+        Inserta muchos pares (clave, valor) de una vez. Ordena el lote una sola vez
+        y lo mezcla de izquierda a derecha hoja por hoja (un descenso por hoja
+        tocada), dividiendo sólo los nodos que se desbordan. Si el lote es al
+        menos tan grande como el árbol, mezcla todo y lo recarga en O(n + m).
+        Igual que insertar, las claves repetidas no reemplazan a las existentes.
+        """
+        pares = sorted(pares, key=itemgetter(0))
+        if not pares:
+            return
+        
+        if self.raiz is None or len(pares) >= self.contar():
+            # heapq.merge es estable: ante claves iguales quedan primero las del árbol
+            mezcla = list(heapq.merge(self.seek(), pares, key=itemgetter(0)))
+            self.raiz = BTree.bulk_load(mezcla, t=self.t).raiz
+            return
+        
+        claves_lote = [clave for clave, _ in pares]
+        i = 0
+        while i < len(pares):
+            # Bajar hasta la hoja de la próxima clave recordando el separador más cercano a la derecha
+            camino = []
+            nodo = self.raiz
+            limite = None
+            while not nodo.hoja:
+                idx = bisect_right(nodo.claves, claves_lote[i])
+                if idx < len(nodo.claves):
+                    limite = nodo.claves[idx]
+                camino.append((nodo, idx))
+                nodo = nodo.hijos[idx]
+            
+            # Todas las claves del lote menores que el separador caen en esta misma hoja
+            j = len(pares) if limite is None else bisect_left(claves_lote, limite, i)
+            self._mezclar_en_hoja(nodo, pares, i, j)
+            for ancestro, _ in camino:
+                ancestro.cantidad += j - i
+            
+            # Dividir hacia arriba sólo mientras haya nodos desbordados
+            hijo = nodo
+            while len(hijo.claves) > 2 * self.t - 1:
+                if camino:
+                    padre, idx = camino.pop()
+                else:
+                    padre, idx = NodoBTree(self.t, False), 0
+                    padre.hijos.append(hijo)
+                    padre.cantidad = hijo.cantidad
+                    self.raiz = padre
+                self._dividir_en_nodos(padre, idx)
+                hijo = padre
+            
+            i = j
+    
+    def _mezclar_en_hoja(self, hoja, pares, inicio, fin):
+        """Mezcla pares[inicio:fin] (ordenados) en una hoja; puede dejarla con más de 2t-1 claves"""
+        if fin - inicio <= 8:
+            # Pocas claves: inserción binaria avanzando desde la posición anterior
+            posicion = 0
+            for clave, valor in pares[inicio:fin]:
+                posicion = bisect_right(hoja.claves, clave, posicion)
+                hoja.claves.insert(posicion, clave)
+                hoja.valores.insert(posicion, valor)
+                posicion += 1
+        else:
+            # Ordenamiento estable de dos tramos ya ordenados: O(hoja + lote), las existentes primero
+            mezcla = list(zip(hoja.claves, hoja.valores)) + pares[inicio:fin]
+            mezcla.sort(key=itemgetter(0))
+            hoja.claves = [clave for clave, _ in mezcla]
+            hoja.valores = [valor for _, valor in mezcla]
+        hoja.cantidad = len(hoja.claves)
+    
+    def _dividir_en_nodos(self, padre, i):
+        """Divide el hijo i (con cualquier cantidad de claves) en los nodos llenos que hagan falta"""
+        hijo = padre.hijos[i]
+        nodos, claves, valores = self._construir_nivel(hijo.claves, hijo.valores,
+                                                       None if hijo.hoja else hijo.hijos, 2 * self.t - 1)
+        padre.hijos[i:i + 1] = nodos
+        padre.claves[i:i] = claves
+        padre.valores[i:i] = valores
     
     def _dividir_hijo(self, padre, i):
         """Divide un hijo lleno"""
@@ -78,70 +258,178 @@ class BTree:
             hijo.hijos = hijo.hijos[0:t]
         
         padre.hijos.insert(i + 1, nuevo_hijo)
+        hijo.recontar()
+        nuevo_hijo.recontar()
+        padre.recontar()
     
     def buscar(self, clave):
-        """Busca una clave en el árbol B"""
-        return self._buscar_rec(self.raiz, clave) if self.raiz else None
-    
-    def _buscar_rec(self, nodo, clave):
-        """Búsqueda recursiva en el árbol B"""
-        if not nodo:
-            return None
-        
-        i = 0
-        while i < len(nodo.claves) and clave > nodo.claves[i]:
-            i += 1
-        
-        if i < len(nodo.claves) and clave == nodo.claves[i]:
-            return nodo.valores[i]
+        """Busca una clave en el árbol B (descenso iterativo desde la raíz)"""
+        nodo = self.raiz
+        while nodo:
+            claves = nodo.claves
+            i = bisect_left(claves, clave)
+            
+            if i < len(claves) and clave == claves[i]:
+                return nodo.valores[i]
+            
+            if nodo.hoja:
+                return None
+            
+            nodo = nodo.hijos[i]
         
-        if nodo.hoja:
-            return None
+        return None
+    
+    def seek(self, clave=None):
+        """
+        Cursor en orden: genera pares (clave, valor) desde la primera clave
+        >= clave (o desde la menor si clave es None) hasta el final del árbol.
+        Es perezoso: posicionarse cuesta O(log n) y cada paso O(1) amortizado.
+        El árbol no debe modificarse mientras se recorre el cursor.
+        """
+        # Pila de [nodo, índice de la próxima clave a emitir en ese nodo]
+        pila = []
+        nodo = self.raiz
+        while nodo:
+            i = 0 if clave is None else bisect_left(nodo.claves, clave)
+            pila.append([nodo, i])
+            nodo = None if nodo.hoja else nodo.hijos[i]
+        
+        return self._recorrer_pila(pila)
+    
+    def seek_posicion(self, posicion):
+        """
+        Cursor en orden desde la clave número 'posicion' (base 0), usando las
+        cantidades por subárbol: posicionarse cuesta O(t log n), no O(posicion)
+        """
+        pila = []
+        nodo = self.raiz
+        while nodo and posicion < nodo.cantidad:
+            if nodo.hoja:
+                pila.append([nodo, posicion])
+                break
+            
+            for i, hijo in enumerate(nodo.hijos):
+                if posicion < hijo.cantidad:
+                    pila.append([nodo, i])
+                    nodo = hijo
+                    break
+                
+                posicion -= hijo.cantidad
+                if posicion == 0 and i < len(nodo.claves):
+                    # La posición cae justo en la clave i de este nodo
+                    pila.append([nodo, i])
+                    nodo = None
+                    break
+                posicion -= 1
+        
+        return self._recorrer_pila(pila)
+    
+    def _recorrer_pila(self, pila):
+        """Genera pares (clave, valor) en orden a partir de una pila de cursor"""
+        while pila:
+            nodo, i = pila[-1]
+            if i >= len(nodo.claves):
+                pila.pop()
+                continue
+            
+            yield nodo.claves[i], nodo.valores[i]
+            pila[-1][1] = i + 1
+            
+            # Bajar por el extremo izquierdo del subárbol siguiente
+            if not nodo.hoja:
+                hijo = nodo.hijos[i + 1]
+                while hijo:
+                    pila.append([hijo, 0])
+                    hijo = None if hijo.hoja else hijo.hijos[0]
+    
+    def cambiar_grado(self, t):
+        """Reconstruye el árbol con otro grado mínimo mediante carga masiva, O(n)"""
+        if t == self.t:
+            return
+        nuevo = BTree.bulk_load(list(self.seek()), t=t)
+        self.raiz, self.t = nuevo.raiz, nuevo.t
+    
+    def contar(self):
+        """Cantidad total de claves en el árbol, O(1)"""
+        return self.raiz.cantidad if self.raiz else 0
+    
+    def rank(self, clave):
+        """Cantidad de claves estrictamente menores que clave, O(t log n)"""
+        menores = 0
+        nodo = self.raiz
+        while nodo:
+            i = bisect_left(nodo.claves, clave)
+            menores += i
+            if not nodo.hoja:
+                menores += sum(hijo.cantidad for hijo in nodo.hijos[:i])
+            
+            if i < len(nodo.claves) and nodo.claves[i] == clave:
+                if not nodo.hoja:
+                    menores += nodo.hijos[i].cantidad
+                return menores
+            
+            nodo = None if nodo.hoja else nodo.hijos[i]
         
-        return self._buscar_rec(nodo.hijos[i], clave)
+        return menores
+    
+    def select(self, posicion):
+        """Retorna el par (clave, valor) número 'posicion' (base 0) en orden, o None"""
+        return next(self.seek_posicion(posicion), None)
+    
+    def iter_range(self, minimo=None, maximo=None):
+        """Genera pares (clave, valor) con minimo <= clave <= maximo, en orden"""
+        for clave, valor in self.seek(minimo):
+            if maximo is not None and clave > maximo:
+                return
+            yield clave, valor
+    
+    def iter_prefix(self, prefijo):
+        """Genera pares (clave, valor) cuyas claves empiezan con prefijo, en orden"""
+        for clave, valor in self.seek(prefijo):
+            if not clave.startswith(prefijo):
+                return
+            yield clave, valor
     
     def buscar_parcial(self, texto):
         """Busca claves que contengan texto"""
         resultados = []
-        if self.raiz:
-            self._buscar_parcial_rec(self.raiz, texto.lower(), resultados)
-        return resultados
-    
-    def _buscar_parcial_rec(self, nodo, texto, resultados):
-        """Búsqueda parcial recursiva"""
-        for i, clave in enumerate(nodo.claves):
-            if texto in clave.lower():
-                resultados.append(nodo.valores[i])
+        texto = texto.lower()
+        pila = [self.raiz] if self.raiz else []
+        while pila:
+            nodo = pila.pop()
+            for i, clave in enumerate(nodo.claves):
+                if texto in clave.lower():
+                    resultados.append(nodo.valores[i])
+            
+            # Invertidos para visitar los hijos de izquierda a derecha
+            if not nodo.hoja:
+                pila.extend(reversed(nodo.hijos))
         
-        if not nodo.hoja:
-            for hijo in nodo.hijos:
-                self._buscar_parcial_rec(hijo, texto, resultados)
+        return resultados
     
     def buscar_por_rango(self, min_valor, max_valor, campo='tamanio'):
         """Busca por rango de valores"""
         resultados = []
-        if self.raiz:
-            self._buscar_rango_rec(self.raiz, min_valor, max_valor, campo, resultados)
-        return resultados
-    
-    def _buscar_rango_rec(self, nodo, min_valor, max_valor, campo, resultados):
-        """Búsqueda por rango recursiva"""
-        for i, valor in enumerate(nodo.valores):
-            if campo == 'tamanio' and min_valor <= valor['tamanio_kb'] <= max_valor:
-                resultados.append(valor)
-            elif campo == 'fecha':
-                pass
+        pila = [self.raiz] if self.raiz else []
+        while pila:
+            nodo = pila.pop()
+            for i, valor in enumerate(nodo.valores):
+                if campo == 'tamanio' and min_valor <= valor.tamanio_kb <= max_valor:
+                    resultados.append(valor)
+                elif campo == 'fecha':
+                    pass
+            
+            if not nodo.hoja:
+                pila.extend(reversed(nodo.hijos))
         
-        if not nodo.hoja:
-            for hijo in nodo.hijos:
-                self._buscar_rango_rec(hijo, min_valor, max_valor, campo, resultados)
+        return resultados
     
     def eliminar(self, clave):
         """Elimina una clave del árbol B"""
         if not self.raiz:
             return False
         
-        self._eliminar_rec(self.raiz, clave)
+        self._eliminar_desde(self.raiz, clave)
         
         if len(self.raiz.claves) == 0:
             if self.raiz.hoja:
@@ -151,16 +439,24 @@ class BTree:
         
         return True
     
-    def _eliminar_rec(self, nodo, clave):
-        """Eliminación recursiva"""
-        idx = self._encontrar_clave(nodo, clave)
-        
-        if idx < len(nodo.claves) and nodo.claves[idx] == clave:
-            if nodo.hoja:
-                self._eliminar_de_hoja(nodo, idx)
-            else:
-                self._eliminar_de_no_hoja(nodo, idx)
-        else:
+    def _eliminar_desde(self, nodo, clave):
+        """
+        Eliminación iterativa: baja una sola vez desde nodo, asegurando que cada
+        hijo visitado tenga al menos t claves. Retorna False si la clave no está.
+        """
+        camino = []
+        while True:
+            camino.append(nodo)
+            idx = self._encontrar_clave(nodo, clave)
+            
+            if idx < len(nodo.claves) and nodo.claves[idx] == clave:
+                if nodo.hoja:
+                    self._eliminar_de_hoja(nodo, idx)
+                    break
+                # Reemplazo por predecesor/sucesor o fusión: se sigue bajando por la clave a quitar
+                nodo, clave = self._eliminar_de_no_hoja(nodo, idx)
+                continue
+            
             if nodo.hoja:
                 return False
             
@@ -170,18 +466,18 @@ class BTree:
                 self._llenar(nodo, idx)
             
             if ultimo and idx > len(nodo.claves):
-                self._eliminar_rec(nodo.hijos[idx - 1], clave)
+                nodo = nodo.hijos[idx - 1]
             else:
-                self._eliminar_rec(nodo.hijos[idx], clave)
+                nodo = nodo.hijos[idx]
         
+        # Los préstamos y fusiones sólo mueven claves entre hijos: cada subárbol del camino pierde una
+        for visitado in camino:
+            visitado.cantidad -= 1
         return True
     
     def _encontrar_clave(self, nodo, clave):
-        """Encuentra el índice de una clave"""
-        idx = 0
-        while idx < len(nodo.claves) and nodo.claves[idx] < clave:
-            idx += 1
-        return idx
+        """Encuentra el índice de la primera clave >= clave (búsqueda binaria)"""
+        return bisect_left(nodo.claves, clave)
     
     def _eliminar_de_hoja(self, nodo, idx):
         """Elimina clave de nodo hoja"""
@@ -189,22 +485,25 @@ class BTree:
         del nodo.valores[idx]
     
     def _eliminar_de_no_hoja(self, nodo, idx):
-        """Elimina clave de nodo no hoja"""
+        """
+        Elimina clave de nodo no hoja. Retorna (hijo, clave) desde donde
+        debe continuar la eliminación.
+        """
         clave = nodo.claves[idx]
         
         if len(nodo.hijos[idx].claves) >= self.t:
             predecesor = self._obtener_predecesor(nodo, idx)
             nodo.claves[idx] = predecesor['clave']
             nodo.valores[idx] = predecesor['valor']
-            self._eliminar_rec(nodo.hijos[idx], predecesor['clave'])
+            return nodo.hijos[idx], predecesor['clave']
         elif len(nodo.hijos[idx + 1].claves) >= self.t:
             sucesor = self._obtener_sucesor(nodo, idx)
             nodo.claves[idx] = sucesor['clave']
             nodo.valores[idx] = sucesor['valor']
-            self._eliminar_rec(nodo.hijos[idx + 1], sucesor['clave'])
+            return nodo.hijos[idx + 1], sucesor['clave']
         else:
             self._fusionar(nodo, idx)
-            self._eliminar_rec(nodo.hijos[idx], clave)
+            return nodo.hijos[idx], clave
     
     def _obtener_predecesor(self, nodo, idx):
         """Obtiene el predecesor de una clave"""
@@ -253,6 +552,8 @@ class BTree:
         
         nodo.claves[idx - 1] = hermano.claves.pop()
         nodo.valores[idx - 1] = hermano.valores.pop()
+        hijo.recontar()
+        hermano.recontar()
     
     def _pedir_prestado_derecha(self, nodo, idx):
         """Toma prestada una clave del hermano derecho"""
@@ -267,6 +568,8 @@ class BTree:
         
         nodo.claves[idx] = hermano.claves.pop(0)
         nodo.valores[idx] = hermano.valores.pop(0)
+        hijo.recontar()
+        hermano.recontar()
     
     def _fusionar(self, nodo, idx):
         """Fusiona dos hijos"""
@@ -285,43 +588,316 @@ class BTree:
         del nodo.claves[idx]
         del nodo.valores[idx]
         del nodo.hijos[idx + 1]
+        hijo.cantidad += hermano.cantidad + 1
+    
+    def eliminar_rango(self, minimo, maximo):
+        """
+        Elimina todas las claves con minimo <= clave <= maximo.
+        Corta el rango contiguo dividiendo el árbol por sus dos extremos y
+        vuelve a unir las partes, rebalanceando sólo los caminos frontera.
+        Retorna la lista de pares (clave, valor) eliminados, en orden.
+        """
+        return self._eliminar_intervalo(minimo, maximo, True)
+    
+    def eliminar_prefijo(self, prefijo):
+        """Elimina todas las claves que empiezan con prefijo (ver eliminar_rango)"""
+        if not prefijo:
+            return self._eliminar_intervalo(None, None, True)
+        
+        # Las claves con el prefijo son exactamente las de [prefijo, siguiente)
+        siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+        return self._eliminar_intervalo(prefijo, siguiente, False)
+    
+    def _eliminar_intervalo(self, minimo, maximo, incluir_maximo):
+        """Elimina el intervalo [minimo, maximo] o [minimo, maximo) (None = sin límite)"""
+        if not self.raiz:
+            return []
+        
+        izquierda, resto = (None, 0), (self.raiz, self._altura(self.raiz))
+        if minimo is not None:
+            izquierda, resto = self._partir(resto, minimo, False)
+        
+        medio, derecha = resto, (None, 0)
+        if maximo is not None and resto[0]:
+            medio, derecha = self._partir(resto, maximo, incluir_maximo)
+        
+        eliminados = []
+        if medio[0]:
+            arbol_medio = BTree(self.t)
+            arbol_medio.raiz = medio[0]
+            eliminados = list(arbol_medio.seek())
+        
+        self.raiz = self._concatenar(izquierda, derecha)
+        return eliminados
+    
+    def altura(self):
+        """Cantidad de niveles del árbol"""
+        return self._altura(self.raiz)
+    
+    def _altura(self, nodo):
+        """Altura de un subárbol (una hoja tiene altura 1, vacío 0)"""
+        altura = 0
+        while nodo:
+            altura += 1
+            nodo = None if nodo.hoja else nodo.hijos[0]
+        return altura
+    
+    def _partir(self, arbol, clave, incluir_igual):
+        """
+        Divide un árbol (raiz, altura) en dos: claves < clave y claves >= clave
+        (o <= / > si incluir_igual). Recorre un solo camino raíz-hoja y une
+        las piezas de cada nivel de abajo hacia arriba.
+        """
+        posicion = bisect_right if incluir_igual else bisect_left
+        piezas_izq = []
+        piezas_der = []
+        nodo, altura = arbol
+        
+        while not nodo.hoja:
+            i = posicion(nodo.claves, clave)
+            if i > 0:
+                pieza = self._crear_pieza(nodo.claves[:i - 1], nodo.valores[:i - 1], nodo.hijos[:i], altura)
+                piezas_izq.append((pieza, (nodo.claves[i - 1], nodo.valores[i - 1])))
+            if i < len(nodo.claves):
+                pieza = self._crear_pieza(nodo.claves[i + 1:], nodo.valores[i + 1:], nodo.hijos[i + 1:], altura)
+                piezas_der.append((pieza, (nodo.claves[i], nodo.valores[i])))
+            nodo = nodo.hijos[i]
+            altura -= 1
+        
+        i = posicion(nodo.claves, clave)
+        izquierda = self._crear_pieza(nodo.claves[:i], nodo.valores[:i], None, 1)
+        derecha = self._crear_pieza(nodo.claves[i:], nodo.valores[i:], None, 1)
+        
+        for pieza, par in reversed(piezas_izq):
+            izquierda = self._unir(pieza, par, izquierda)
+        for pieza, par in reversed(piezas_der):
+            derecha = self._unir(derecha, par, pieza)
+        
+        return izquierda, derecha
+    
+    def _crear_pieza(self, claves, valores, hijos, altura):
+        """Crea un subárbol (raiz, altura) con parte de un nodo; colapsa nodos sin claves"""
+        if not claves:
+            if hijos:
+                return hijos[0], altura - 1
+            return None, 0
+        
+        nodo = NodoBTree(self.t, hijos is None)
+        nodo.claves = claves
+        nodo.valores = valores
+        if hijos is not None:
+            nodo.hijos = hijos
+        nodo.recontar()
+        return nodo, altura
+    
+    def _unir(self, izquierda, par, derecha):
+        """
+        Une dos árboles (raiz, altura) con una clave separadora intermedia:
+        izquierda < par < derecha. Cuesta O(diferencia de alturas + 1).
+        """
+        (raiz_izq, alt_izq), (raiz_der, alt_der) = izquierda, derecha
+        
+        if raiz_izq is None or raiz_der is None:
+            arbol = BTree(self.t)
+            arbol.raiz = raiz_izq or raiz_der
+            arbol.insertar(*par)
+            return arbol.raiz, self._altura(arbol.raiz)
+        
+        if alt_izq == alt_der:
+            nodo = NodoBTree(self.t, raiz_izq.hoja)
+            nodo.claves = raiz_izq.claves + [par[0]] + raiz_der.claves
+            nodo.valores = raiz_izq.valores + [par[1]] + raiz_der.valores
+            nodo.hijos = raiz_izq.hijos + raiz_der.hijos
+            nodo.recontar()
+            if len(nodo.claves) <= 2 * self.t - 1:
+                return nodo, alt_izq
+            
+            nueva_raiz = NodoBTree(self.t, False)
+            nueva_raiz.hijos.append(nodo)
+            self._partir_hijo(nueva_raiz, 0)
+            return nueva_raiz, alt_izq + 1
+        
+        # Bajar por el borde del árbol más alto hasta el nivel del más bajo
+        por_derecha = alt_izq > alt_der
+        raiz, altura = (raiz_izq, alt_izq) if por_derecha else (raiz_der, alt_der)
+        bajo, alt_bajo = (raiz_der, alt_der) if por_derecha else (raiz_izq, alt_izq)
+        
+        camino = []
+        nodo = raiz
+        for _ in range(altura - alt_bajo - 1):
+            camino.append(nodo)
+            nodo = nodo.hijos[-1] if por_derecha else nodo.hijos[0]
+        
+        if por_derecha:
+            nodo.claves.append(par[0])
+            nodo.valores.append(par[1])
+            nodo.hijos.append(bajo)
+            idx = len(nodo.claves) - 1
+        else:
+            nodo.claves.insert(0, par[0])
+            nodo.valores.insert(0, par[1])
+            nodo.hijos.insert(0, bajo)
+            idx = 0
+        
+        # La raíz del árbol bajo puede tener pocas claves: fusionar o repartir con su hermano
+        if len(bajo.claves) < self.t - 1:
+            self._repartir(nodo, idx)
+        nodo.recontar()
+        
+        # Propagar divisiones hacia arriba si el nodo quedó con 2t claves
+        while len(nodo.claves) > 2 * self.t - 1:
+            if not camino:
+                nueva_raiz = NodoBTree(self.t, False)
+                nueva_raiz.hijos.append(nodo)
+                self._partir_hijo(nueva_raiz, 0)
+                return nueva_raiz, altura + 1
+            
+            padre = camino.pop()
+            self._partir_hijo(padre, len(padre.hijos) - 1 if por_derecha else 0)
+            nodo = padre
+        
+        # Los ancestros restantes ganaron claves en su subárbol
+        for ancestro in reversed(camino):
+            ancestro.recontar()
+        
+        return raiz, altura
+    
+    def _repartir(self, nodo, idx):
+        """Fusiona los hijos idx e idx+1 o, si no caben en un nodo, reparte sus claves"""
+        hijo = nodo.hijos[idx]
+        hermano = nodo.hijos[idx + 1]
+        if len(hijo.claves) + len(hermano.claves) + 1 <= 2 * self.t - 1:
+            self._fusionar(nodo, idx)
+            return
+        
+        claves = hijo.claves + [nodo.claves[idx]] + hermano.claves
+        valores = hijo.valores + [nodo.valores[idx]] + hermano.valores
+        hijos = hijo.hijos + hermano.hijos
+        medio = len(claves) // 2
+        
+        hijo.claves, nodo.claves[idx], hermano.claves = claves[:medio], claves[medio], claves[medio + 1:]
+        hijo.valores, nodo.valores[idx], hermano.valores = valores[:medio], valores[medio], valores[medio + 1:]
+        if not hijo.hoja:
+            hijo.hijos, hermano.hijos = hijos[:medio + 1], hijos[medio + 1:]
+        hijo.recontar()
+        hermano.recontar()
+    
+    def _partir_hijo(self, padre, i):
+        """Divide por la mitad un hijo con más de 2t-1 claves (cualquier tamaño)"""
+        hijo = padre.hijos[i]
+        medio = len(hijo.claves) // 2
+        nuevo_hijo = NodoBTree(self.t, hijo.hoja)
+        
+        padre.claves.insert(i, hijo.claves[medio])
+        padre.valores.insert(i, hijo.valores[medio])
+        
+        nuevo_hijo.claves = hijo.claves[medio + 1:]
+        nuevo_hijo.valores = hijo.valores[medio + 1:]
+        hijo.claves = hijo.claves[:medio]
+        hijo.valores = hijo.valores[:medio]
+        
+        if not hijo.hoja:
+            nuevo_hijo.hijos = hijo.hijos[medio + 1:]
+            hijo.hijos = hijo.hijos[:medio + 1]
+        
+        padre.hijos.insert(i + 1, nuevo_hijo)
+        hijo.recontar()
+        nuevo_hijo.recontar()
+        padre.recontar()
     
-    def to_dict(self):
-        """Convierte el árbol B a diccionario para serialización"""
+    def _concatenar(self, izquierda, derecha):
+        """Une dos árboles (raiz, altura) con izquierda < derecha; retorna la nueva raíz"""
+        if izquierda[0] is None:
+            return derecha[0]
+        if derecha[0] is None:
+            return izquierda[0]
+        
+        # La menor clave de la derecha pasa a ser la separadora
+        arbol_der = BTree(self.t)
+        arbol_der.raiz = derecha[0]
+        par = next(arbol_der.seek())
+        arbol_der.eliminar(par[0])
+        
+        raiz, _ = self._unir(izquierda, par, (arbol_der.raiz, self._altura(arbol_der.raiz)))
+        return raiz
+    
+    def to_dict(self, codificar=None, comprimir_claves=True):
+        """
+        Convierte el árbol B a diccionario para serialización.
+        codificar(valor) convierte cada valor a algo serializable (por defecto se deja igual).
+        Con comprimir_claves, las claves de texto de cada nodo se guardan con front
+        coding: cuántos caracteres comparte con la clave anterior y el sufijo restante.
+        """
         if not self.raiz:
             return {}
         
-        return self._nodo_to_dict(self.raiz)
+        raiz = self._nodo_to_dict(self.raiz, codificar, comprimir_claves)
+        # Sólo los nodos internos pasan por la pila: las hojas quedan completas al crearlas
+        # (todos los hijos de un nodo están al mismo nivel, así que basta mirar el primero)
+        pila = [(self.raiz, raiz)] if not self.raiz.hoja else []
+        while pila:
+            nodo, data = pila.pop()
+            data['hijos'] = [self._nodo_to_dict(hijo, codificar, comprimir_claves) for hijo in nodo.hijos]
+            if not nodo.hijos[0].hoja:
+                pila.extend(zip(nodo.hijos, data['hijos']))
+        
+        return raiz
     
-    def _nodo_to_dict(self, nodo):
-        """Convierte un nodo a diccionario"""
-        return {
+    def _nodo_to_dict(self, nodo, codificar=None, comprimir_claves=True):
+        """Convierte un nodo a diccionario (los hijos los agrega to_dict)"""
+        data = {
             't': self.t,
             'hoja': nodo.hoja,
             'claves': nodo.claves,
-            'valores': nodo.valores,
-            'hijos': [self._nodo_to_dict(h) for h in nodo.hijos] if not nodo.hoja else []
+            'valores': [codificar(v) for v in nodo.valores] if codificar else nodo.valores,
+            'hijos': []
         }
+        if comprimir_claves and all(isinstance(clave, str) for clave in nodo.claves):
+            data['comunes'], data['claves'] = comprimir_prefijos(nodo.claves)
+        return data
     
     @classmethod
-    def from_dict(cls, data):
-        """Crea un árbol B desde diccionario"""
+    def from_dict(cls, data, decodificar=None, t=None):
+        """
+        Crea un árbol B desde diccionario.
+        decodificar(clave, dato) reconstruye cada valor a partir de su clave y lo guardado.
+        Si se indica t y difiere del grado guardado, el árbol se recarga con ese grado.
+        """
         if not data:
-            return cls()
+            return cls(t or 3)
         
         arbol = cls(t=data['t'])
-        arbol.raiz = cls._dict_to_nodo(data)
+        arbol.raiz = cls._dict_to_nodo(data, decodificar)
+        
+        # Construcción de arriba hacia abajo; las cantidades de los nodos internos se
+        # recalculan al final en orden inverso, de modo que cada hijo se cuenta antes que su padre
+        internos = []
+        pila = [(data, arbol.raiz)] if not data['hoja'] else []
+        while pila:
+            nodo_data, nodo = pila.pop()
+            internos.append(nodo)
+            nodo.hijos = [cls._dict_to_nodo(hijo_data, decodificar) for hijo_data in nodo_data['hijos']]
+            if not nodo_data['hijos'][0]['hoja']:
+                pila.extend(zip(nodo_data['hijos'], nodo.hijos))
+        
+        for nodo in reversed(internos):
+            nodo.recontar()
+        
+        if t is not None:
+            arbol.cambiar_grado(t)
         return arbol
     
     @classmethod
-    def _dict_to_nodo(cls, data):
-        """Crea un nodo desde diccionario"""
+    def _dict_to_nodo(cls, data, decodificar=None):
+        """Crea un nodo (sin hijos) desde diccionario"""
         nodo = NodoBTree(data['t'], data['hoja'])
-        nodo.claves = data['claves']
-        nodo.valores = data['valores']
-        
-        if not data['hoja']:
-            for hijo_data in data['hijos']:
-                nodo.hijos.append(cls._dict_to_nodo(hijo_data))
-        
+        if 'comunes' in data:
+            nodo.claves = descomprimir_prefijos(data['comunes'], data['claves'])
+        else:
+            nodo.claves = data['claves']
+        if decodificar:
+            nodo.valores = [decodificar(clave, dato) for clave, dato in zip(nodo.claves, data['valores'])]
+        else:
+            nodo.valores = data['valores']
+        nodo.cantidad = len(nodo.claves)
         return nodo
@@ -0,0 +1,263 @@
+"""
+Formato binario en disco para árboles B y B+: una página por nodo, con un
+directorio de offsets al final del archivo. El archivo se abre con mmap y cada
+nodo se decodifica recién cuando una búsqueda baja hasta él, de modo que abrir
+un índice no depende de su tamaño.
+"""
+import mmap
+import os
+import struct
+from collections import deque
+from .arbol_b import BTree, comprimir_prefijos, descomprimir_prefijos
+from .arbol_b_mas import BPlusTree
+
+MAGICO = b'IDXB'
+VERSION = 2
+# mágico, versión, tipo (0 = B, 1 = B+), t, claves totales, altura, páginas, offset del directorio,
+# bytes de metadatos (que van a continuación de la cabecera)
+CABECERA = struct.Struct('<4sHBxIQIIQI')
+# La versión 1 no tenía metadatos
+CABECERA_V1 = struct.Struct('<4sHBxIQIIQ')
+# hoja, cantidad de claves, página de la hoja siguiente (sólo B+, -1 = ninguna)
+CABECERA_PAGINA = struct.Struct('<BIi')
+TIPOS = {0: BTree, 1: BPlusTree}
+
+
+def _codificar_texto(valor):
+    return valor.encode('utf-8')
+
+
+def _decodificar_texto(clave, datos):
+    return datos.decode('utf-8')
+
+
+def es_archivo_paginas(ruta):
+    """Indica si un archivo está en el formato binario de páginas"""
+    try:
+        with open(ruta, 'rb') as f:
+            return f.read(len(MAGICO)) == MAGICO
+    except OSError:
+        return False
+
+
+def _empaquetar_textos(textos):
+    """Largos (en caracteres) y bytes UTF-8 concatenados de una lista de cadenas"""
+    largos = [len(texto) for texto in textos]
+    datos = ''.join(textos).encode('utf-8')
+    return struct.pack(f'<{len(largos)}II', *largos, len(datos)) + datos
+
+
+def _empaquetar_bytes(bloques):
+    """Largos (en bytes) y concatenación de una lista de bloques de bytes"""
+    return struct.pack(f'<{len(bloques)}I', *(len(bloque) for bloque in bloques)) + b''.join(bloques)
+
+
+def _codificar_pagina(nodo, con_valores, ids_hijos, siguiente, codificar):
+    """Bytes de la página de un nodo (las claves deben ser cadenas)"""
+    n = len(nodo.claves)
+    comunes, sufijos = comprimir_prefijos(nodo.claves)
+    partes = [CABECERA_PAGINA.pack(nodo.hoja, n, siguiente),
+              struct.pack(f'<{n}I', *comunes),
+              _empaquetar_textos(sufijos)]
+    if con_valores:
+        partes.append(_empaquetar_bytes([codificar(valor) for valor in nodo.valores]))
+    if not nodo.hoja:
+        partes.append(struct.pack(f'<{len(ids_hijos)}I', *ids_hijos))
+        partes.append(struct.pack(f'<{len(ids_hijos)}Q', *(hijo.cantidad for hijo in nodo.hijos)))
+    return b''.join(partes)
+
+
+def guardar_paginas(arbol, ruta, codificar=None, metadatos=b''):
+    """
+    Escribe un BTree o BPlusTree en formato binario de páginas. Los nodos se
+    numeran por niveles (la raíz es la página 0 y las hojas quedan al final,
+    contiguas y en orden). Se escribe en un archivo temporal que luego reemplaza
+    al destino, así un índice abierto con mmap nunca se ve a medio escribir.
+    'metadatos' son bytes libres de quien guarda el árbol (ArchivoPaginas.metadatos).
+    """
+    codificar = codificar or _codificar_texto
+    tipo = 1 if isinstance(arbol, BPlusTree) else 0
+    temporal = ruta + '.tmp'
+    offsets = []
+    with open(temporal, 'wb') as f:
+        f.write(bytes(CABECERA.size))
+        f.write(metadatos)
+        cola = deque([arbol.raiz] if arbol.raiz else [])
+        siguiente_id = 1
+        while cola:
+            nodo = cola.popleft()
+            ids_hijos = []
+            if not nodo.hoja:
+                ids_hijos = list(range(siguiente_id, siguiente_id + len(nodo.hijos)))
+                siguiente_id += len(nodo.hijos)
+                cola.extend(nodo.hijos)
+            
+            # En B+ las hojas son las últimas páginas y están en orden: la siguiente es la próxima página
+            pagina = len(offsets)
+            siguiente = pagina + 1 if tipo and nodo.hoja and cola else -1
+            offsets.append(f.tell())
+            f.write(_codificar_pagina(nodo, nodo.hoja or not tipo, ids_hijos, siguiente, codificar))
+        
+        directorio = f.tell()
+        offsets.append(directorio)
+        f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+        f.seek(0)
+        f.write(CABECERA.pack(MAGICO, VERSION, tipo, arbol.t, arbol.contar(), arbol.altura(),
+                              len(offsets) - 1, directorio, len(metadatos)))
+    os.replace(temporal, ruta)
+
+
+class NodoDisco:
+    """
+    Nodo de un árbol abierto desde disco. Se crea sin leer su página (sólo con
+    la cantidad de claves del subárbol, que viene en la página del padre) y la
+    decodifica la primera vez que se consultan sus claves, valores o hijos.
+    Expone la misma interfaz de lectura que NodoBTree y NodoBPlus.
+    """
+    __slots__ = ('_archivo', 'pagina', '_cantidad', '_hoja', '_claves', '_valores', '_hijos', '_siguiente')
+    
+    def __init__(self, archivo, pagina, cantidad=None):
+        self._archivo = archivo
+        self.pagina = pagina
+        self._cantidad = cantidad
+        self._claves = None
+    
+    def _cargar(self):
+        self._archivo.leer_pagina(self)
+    
+    @property
+    def hoja(self):
+        if self._claves is None:
+            self._cargar()
+        return self._hoja
+    
+    @property
+    def claves(self):
+        if self._claves is None:
+            self._cargar()
+        return self._claves
+    
+    @property
+    def valores(self):
+        if self._claves is None:
+            self._cargar()
+        return self._valores
+    
+    @property
+    def hijos(self):
+        if self._claves is None:
+            self._cargar()
+        return self._hijos
+    
+    @property
+    def siguiente(self):
+        if self._claves is None:
+            self._cargar()
+        return self._siguiente
+    
+    @property
+    def cantidad(self):
+        if self._cantidad is None:
+            # Sólo pasa con hojas alcanzadas por el enlace de la hoja anterior
+            self._cantidad = len(self.claves)
+        return self._cantidad
+
+
+class ArchivoPaginas:
+    """
+    Índice en formato binario de páginas abierto con mmap (sólo lectura).
+    arbol() retorna un BTree o BPlusTree cuyos nodos se leen bajo demanda; las
+    páginas leídas quedan decodificadas en memoria. El árbol no debe modificarse:
+    para escribir hay que copiarlo a un árbol en memoria.
+    """
+    
+    def __init__(self, ruta, decodificar=None):
+        self.ruta = ruta
+        self.decodificar = decodificar or _decodificar_texto
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            magico, version = struct.unpack_from('<4sH', self._mapa, 0)
+            if magico != MAGICO or version not in (1, VERSION):
+                raise ValueError(f"{ruta} no es un índice binario compatible")
+            if version == 1:
+                (_, _, tipo, self.t, self.cantidad, self.altura,
+                 self.num_paginas, self._directorio) = CABECERA_V1.unpack_from(self._mapa, 0)
+                self.metadatos = b''
+            else:
+                (_, _, tipo, self.t, self.cantidad, self.altura,
+                 self.num_paginas, self._directorio, largo) = CABECERA.unpack_from(self._mapa, 0)
+                self.metadatos = self._mapa[CABECERA.size:CABECERA.size + largo]
+        except Exception:
+            self.cerrar()
+            raise
+        self.clase = TIPOS[tipo]
+        self.paginas_leidas = 0
+        self._nodos = {}
+    
+    def arbol(self):
+        """Árbol de sólo lectura respaldado por el archivo"""
+        arbol = self.clase(self.t)
+        if self.num_paginas:
+            arbol.raiz = self.nodo(0, self.cantidad)
+        return arbol
+    
+    def nodo(self, pagina, cantidad=None):
+        """Nodo (sin leer) de una página; cada página tiene un único nodo"""
+        nodo = self._nodos.get(pagina)
+        if nodo is None:
+            nodo = self._nodos[pagina] = NodoDisco(self, pagina, cantidad)
+        return nodo
+    
+    def leer_pagina(self, nodo):
+        """Decodifica la página de un nodo y completa sus atributos"""
+        mapa = self._mapa
+        posicion = struct.unpack_from('<Q', mapa, self._directorio + 8 * nodo.pagina)[0]
+        hoja, n, siguiente = CABECERA_PAGINA.unpack_from(mapa, posicion)
+        posicion += CABECERA_PAGINA.size
+        
+        comunes = struct.unpack_from(f'<{n}I', mapa, posicion)
+        posicion += 4 * n
+        sufijos, posicion = self._leer_textos(n, posicion)
+        claves = descomprimir_prefijos(comunes, sufijos)
+        
+        valores = []
+        if hoja or self.clase is BTree:
+            largos = struct.unpack_from(f'<{n}I', mapa, posicion)
+            posicion += 4 * n
+            for clave, largo in zip(claves, largos):
+                valores.append(self.decodificar(clave, mapa[posicion:posicion + largo]))
+                posicion += largo
+        
+        hijos = []
+        if not hoja:
+            ids = struct.unpack_from(f'<{n + 1}I', mapa, posicion)
+            cantidades = struct.unpack_from(f'<{n + 1}Q', mapa, posicion + 4 * (n + 1))
+            hijos = [self.nodo(pagina, cantidad) for pagina, cantidad in zip(ids, cantidades)]
+        
+        nodo._hoja = bool(hoja)
+        nodo._valores = valores
+        nodo._hijos = hijos
+        nodo._siguiente = self.nodo(siguiente) if siguiente >= 0 else None
+        nodo._claves = claves
+        self.paginas_leidas += 1
+    
+    def _leer_textos(self, n, posicion):
+        """Lee n cadenas empaquetadas con _empaquetar_textos; retorna (cadenas, nueva posición)"""
+        *largos, total = struct.unpack_from(f'<{n}II', self._mapa, posicion)
+        posicion += 4 * (n + 1)
+        texto = self._mapa[posicion:posicion + total].decode('utf-8')
+        textos = []
+        inicio = 0
+        for largo in largos:
+            textos.append(texto[inicio:inicio + largo])
+            inicio += largo
+        return textos, posicion + total
+    
+    def cerrar(self):
+        """Libera el mmap y el archivo (los nodos aún no leídos dejan de poder cargarse)"""
+        if getattr(self, '_mapa', None) is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+        self._nodos = {}
@@ -0,0 +1,578 @@
+"""
+Módulo que define el Árbol B+ (B+Tree) para índice global de archivos.
+Los valores viven sólo en las hojas, enlazadas de izquierda a derecha, de modo
+que los recorridos completos y por rango son una caminata lineal por las hojas.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from .arbol_b import comprimir_prefijos, descomprimir_prefijos
+
+
+class NodoBPlus:
+    """Nodo para Árbol B+: las hojas guardan claves y valores, los internos sólo separadores"""
+    __slots__ = ('hoja', 'claves', 'valores', 'hijos', 'siguiente', 'cantidad')
+    
+    def __init__(self, hoja=True):
+        self.hoja = hoja
+        self.claves = []  # Hoja: claves de los archivos; interno: separadores (claves[i] <= todo hijos[i + 1])
+        self.valores = []  # Sólo en hojas
+        self.hijos = []  # Sólo en nodos internos
+        self.siguiente = None  # Sólo en hojas: la hoja siguiente en orden
+        self.cantidad = 0  # Claves (de hojas) en todo el subárbol (para rank/select)
+    
+    def recontar(self):
+        """Recalcula la cantidad de claves del subárbol a partir de sus hijos"""
+        self.cantidad = len(self.claves) if self.hoja else sum(hijo.cantidad for hijo in self.hijos)
+    
+    def __str__(self):
+        return f"NodoBPlus(hoja={self.hoja}, claves={self.claves})"
+
+
+class BPlusTree:
+    """
+    Árbol B+ con la misma interfaz que BTree. Cada nodo tiene entre t-1 y 2t-1
+    claves (la raíz puede tener menos). A diferencia de BTree, las claves son
+    únicas: insertar una clave existente reemplaza su valor.
+    """
+    
+    # Marca del formato serializado, para distinguirlo del de BTree
+    TIPO = 'b+'
+    
+    def __init__(self, t=3):
+        if t < 2:
+            raise ValueError(f"El grado mínimo del árbol B+ debe ser >= 2 (recibido: {t})")
+        self.raiz = None
+        self.t = t  # Grado mínimo
+    
+    @classmethod
+    def bulk_load(cls, pares_ordenados, fill_factor=1.0, t=3):
+        """
+        Construye un árbol B+ de abajo hacia arriba en O(n) a partir de pares
+        (clave, valor) ya ordenados por clave y sin claves repetidas.
+        fill_factor (0-1] indica qué fracción de las 2t-1 claves ocupa cada hoja.
+        """
+        arbol = cls(t)
+        claves = [clave for clave, _ in pares_ordenados]
+        valores = [valor for _, valor in pares_ordenados]
+        if not claves:
+            return arbol
+        
+        capacidad = round(fill_factor * (2 * t - 1))
+        capacidad = max(t - 1, min(2 * t - 1, capacidad), 1)
+        hojas = arbol._crear_hojas(claves, valores, capacidad)
+        arbol.raiz = arbol._construir_internos(hojas)
+        return arbol
+    
+    def _crear_hojas(self, claves, valores, capacidad):
+        """Reparte claves y valores ordenados en hojas enlazadas de tamaño parejo"""
+        n = len(claves)
+        num_hojas = -(-n // capacidad)
+        while num_hojas > 1 and n // num_hojas < self.t - 1:
+            num_hojas -= 1
+        
+        base, extra = divmod(n, num_hojas)
+        hojas = []
+        inicio = 0
+        for i in range(num_hojas):
+            tamanio = base + (1 if i < extra else 0)
+            hoja = NodoBPlus(True)
+            hoja.claves = claves[inicio:inicio + tamanio]
+            hoja.valores = valores[inicio:inicio + tamanio]
+            hoja.cantidad = tamanio
+            if hojas:
+                hojas[-1].siguiente = hoja
+            hojas.append(hoja)
+            inicio += tamanio
+        return hojas
+    
+    def _construir_internos(self, hojas):
+        """Construye los niveles internos sobre una lista de hojas enlazadas; retorna la raíz"""
+        nodos = hojas
+        minimos = [hoja.claves[0] for hoja in hojas]
+        while len(nodos) > 1:
+            n = len(nodos)
+            num_nodos = -(-n // (2 * self.t))
+            while num_nodos > 1 and n // num_nodos < self.t:
+                num_nodos -= 1
+            
+            base, extra = divmod(n, num_nodos)
+            padres = []
+            minimos_padres = []
+            inicio = 0
+            for i in range(num_nodos):
+                tamanio = base + (1 if i < extra else 0)
+                padre = NodoBPlus(False)
+                padre.hijos = nodos[inicio:inicio + tamanio]
+                padre.claves = minimos[inicio + 1:inicio + tamanio]
+                padre.recontar()
+                padres.append(padre)
+                minimos_padres.append(minimos[inicio])
+                inicio += tamanio
+            
+            nodos, minimos = padres, minimos_padres
+        return nodos[0]
+    
+    def _repartir(self, nodo):
+        """
+        Divide un nodo desbordado (más de 2t-1 claves) en los nodos llenos que hagan
+        falta; el primero es el mismo nodo. Retorna (nodos, separadores para el padre).
+        """
+        if nodo.hoja:
+            n = len(nodo.claves)
+            num_nodos = -(-n // (2 * self.t - 1))
+            base, extra = divmod(n, num_nodos)
+            claves, valores, siguiente = nodo.claves, nodo.valores, nodo.siguiente
+            nodos = []
+            inicio = 0
+            for i in range(num_nodos):
+                tamanio = base + (1 if i < extra else 0)
+                hoja = nodo if i == 0 else NodoBPlus(True)
+                hoja.claves = claves[inicio:inicio + tamanio]
+                hoja.valores = valores[inicio:inicio + tamanio]
+                hoja.cantidad = tamanio
+                if nodos:
+                    nodos[-1].siguiente = hoja
+                nodos.append(hoja)
+                inicio += tamanio
+            nodos[-1].siguiente = siguiente
+            return nodos, [hoja.claves[0] for hoja in nodos[1:]]
+        
+        n = len(nodo.hijos)
+        num_nodos = -(-n // (2 * self.t))
+        base, extra = divmod(n, num_nodos)
+        claves, hijos = nodo.claves, nodo.hijos
+        nodos = []
+        separadores = []
+        inicio = 0
+        for i in range(num_nodos):
+            tamanio = base + (1 if i < extra else 0)
+            interno = nodo if i == 0 else NodoBPlus(False)
+            interno.hijos = hijos[inicio:inicio + tamanio]
+            interno.claves = claves[inicio:inicio + tamanio - 1]
+            interno.recontar()
+            if i < num_nodos - 1:
+                # El separador entre este nodo y el siguiente sube al padre
+                separadores.append(claves[inicio + tamanio - 1])
+            nodos.append(interno)
+            inicio += tamanio
+        return nodos, separadores
+    
+    def _dividir_hacia_arriba(self, nodo, camino):
+        """Divide nodo y sus ancestros (camino de (padre, índice)) mientras estén desbordados"""
+        while len(nodo.claves) > 2 * self.t - 1:
+            if camino:
+                padre, i = camino.pop()
+            else:
+                padre, i = NodoBPlus(False), 0
+                padre.hijos.append(nodo)
+                padre.cantidad = nodo.cantidad
+                self.raiz = padre
+            
+            nodos, separadores = self._repartir(nodo)
+            padre.hijos[i:i + 1] = nodos
+            padre.claves[i:i] = separadores
+            nodo = padre
+    
+    def _descender(self, clave):
+        """Baja hasta la hoja donde está (o iría) clave; retorna (hoja, camino de (padre, índice))"""
+        camino = []
+        nodo = self.raiz
+        while not nodo.hoja:
+            i = bisect_right(nodo.claves, clave)
+            camino.append((nodo, i))
+            nodo = nodo.hijos[i]
+        return nodo, camino
+    
+    def insertar(self, clave, valor):
+        """Inserta una clave-valor en el árbol B+ (reemplaza el valor si la clave ya existe)"""
+        if not self.raiz:
+            self.raiz = NodoBPlus(True)
+            self.raiz.claves.append(clave)
+            self.raiz.valores.append(valor)
+            self.raiz.cantidad = 1
+            return
+        
+        hoja, camino = self._descender(clave)
+        i = bisect_left(hoja.claves, clave)
+        if i < len(hoja.claves) and hoja.claves[i] == clave:
+            hoja.valores[i] = valor
+            return
+        
+        hoja.claves.insert(i, clave)
+        hoja.valores.insert(i, valor)
+        hoja.cantidad += 1
+        for ancestro, _ in camino:
+            ancestro.cantidad += 1
+        self._dividir_hacia_arriba(hoja, camino)
+    
+    def insertar_lote(self, pares):
+        """
+        Inserta muchos pares (clave, valor) de una vez, como BTree.insertar_lote:
+        un descenso por hoja tocada y divisiones sólo donde hay desborde. Si una
+        clave se repite, queda el último valor.
+        """
+        pares = sorted(pares, key=itemgetter(0))
+        if not pares:
+            return
+        
+        if self.raiz is None or len(pares) >= self.contar():
+            # heapq.merge es estable: ante claves iguales el valor del lote queda último
+            mezcla = self._sin_repetidas(heapq.merge(self.seek(), pares, key=itemgetter(0)))
+            self.raiz = BPlusTree.bulk_load(mezcla, t=self.t).raiz
+            return
+        
+        claves_lote = [clave for clave, _ in pares]
+        i = 0
+        while i < len(pares):
+            hoja, camino = self._descender(claves_lote[i])
+            limite = None
+            for padre, idx in camino:
+                if idx < len(padre.claves):
+                    limite = padre.claves[idx]
+            
+            # Todas las claves del lote menores que el separador caen en esta misma hoja
+            j = len(pares) if limite is None else bisect_left(claves_lote, limite, i)
+            agregadas = self._mezclar_en_hoja(hoja, pares, i, j)
+            for ancestro, _ in camino:
+                ancestro.cantidad += agregadas
+            self._dividir_hacia_arriba(hoja, camino)
+            i = j
+    
+    def _sin_repetidas(self, pares_ordenados):
+        """Lista de pares ordenados donde cada clave repetida conserva el último valor"""
+        resultado = []
+        for clave, valor in pares_ordenados:
+            if resultado and resultado[-1][0] == clave:
+                resultado[-1] = (clave, valor)
+            else:
+                resultado.append((clave, valor))
+        return resultado
+    
+    def _mezclar_en_hoja(self, hoja, pares, inicio, fin):
+        """Mezcla pares[inicio:fin] (ordenados) en una hoja; retorna cuántas claves nuevas agregó"""
+        antes = len(hoja.claves)
+        if fin - inicio <= 8:
+            posicion = 0
+            for clave, valor in pares[inicio:fin]:
+                posicion = bisect_left(hoja.claves, clave, posicion)
+                if posicion < len(hoja.claves) and hoja.claves[posicion] == clave:
+                    hoja.valores[posicion] = valor
+                else:
+                    hoja.claves.insert(posicion, clave)
+                    hoja.valores.insert(posicion, valor)
+        else:
+            mezcla = list(zip(hoja.claves, hoja.valores)) + pares[inicio:fin]
+            mezcla.sort(key=itemgetter(0))
+            mezcla = self._sin_repetidas(mezcla)
+            hoja.claves = [clave for clave, _ in mezcla]
+            hoja.valores = [valor for _, valor in mezcla]
+        hoja.cantidad = len(hoja.claves)
+        return hoja.cantidad - antes
+    
+    def buscar(self, clave):
+        """Busca una clave en el árbol B+"""
+        if not self.raiz:
+            return None
+        
+        hoja, _ = self._descender(clave)
+        i = bisect_left(hoja.claves, clave)
+        if i < len(hoja.claves) and hoja.claves[i] == clave:
+            return hoja.valores[i]
+        return None
+    
+    def _primera_hoja(self):
+        nodo = self.raiz
+        while nodo and not nodo.hoja:
+            nodo = nodo.hijos[0]
+        return nodo
+    
+    def _recorrer_hojas(self, hoja, i):
+        """Genera pares (clave, valor) en orden desde la posición i de una hoja, siguiendo los enlaces"""
+        if hoja and i:
+            yield from zip(hoja.claves[i:], hoja.valores[i:])
+            hoja = hoja.siguiente
+        while hoja:
+            yield from zip(hoja.claves, hoja.valores)
+            hoja = hoja.siguiente
+    
+    def seek(self, clave=None):
+        """
+        Cursor en orden: genera pares (clave, valor) desde la primera clave
+        >= clave (o desde la menor si clave es None) hasta el final del árbol.
+        Posicionarse cuesta O(log n); después es una caminata por las hojas.
+        El árbol no debe modificarse mientras se recorre el cursor.
+        """
+        if not self.raiz:
+            return iter(())
+        if clave is None:
+            return self._recorrer_hojas(self._primera_hoja(), 0)
+        
+        hoja, _ = self._descender(clave)
+        return self._recorrer_hojas(hoja, bisect_left(hoja.claves, clave))
+    
+    def seek_posicion(self, posicion):
+        """Cursor en orden desde la clave número 'posicion' (base 0), O(t log n)"""
+        nodo = self.raiz
+        if not nodo or not 0 <= posicion < nodo.cantidad:
+            return iter(())
+        
+        while not nodo.hoja:
+            for hijo in nodo.hijos:
+                if posicion < hijo.cantidad:
+                    nodo = hijo
+                    break
+                posicion -= hijo.cantidad
+        return self._recorrer_hojas(nodo, posicion)
+    
+    def cambiar_grado(self, t):
+        """Reconstruye el árbol con otro grado mínimo mediante carga masiva, O(n)"""
+        if t == self.t:
+            return
+        nuevo = BPlusTree.bulk_load(list(self.seek()), t=t)
+        self.raiz, self.t = nuevo.raiz, nuevo.t
+    
+    def contar(self):
+        """Cantidad total de claves en el árbol, O(1)"""
+        return self.raiz.cantidad if self.raiz else 0
+    
+    def rank(self, clave):
+        """Cantidad de claves estrictamente menores que clave, O(t log n)"""
+        if not self.raiz:
+            return 0
+        
+        menores = 0
+        nodo = self.raiz
+        while not nodo.hoja:
+            i = bisect_right(nodo.claves, clave)
+            menores += sum(hijo.cantidad for hijo in nodo.hijos[:i])
+            nodo = nodo.hijos[i]
+        return menores + bisect_left(nodo.claves, clave)
+    
+    def select(self, posicion):
+        """Retorna el par (clave, valor) número 'posicion' (base 0) en orden, o None"""
+        return next(self.seek_posicion(posicion), None)
+    
+    def iter_range(self, minimo=None, maximo=None):
+        """Genera pares (clave, valor) con minimo <= clave <= maximo, en orden"""
+        for clave, valor in self.seek(minimo):
+            if maximo is not None and clave > maximo:
+                return
+            yield clave, valor
+    
+    def iter_prefix(self, prefijo):
+        """Genera pares (clave, valor) cuyas claves empiezan con prefijo, en orden"""
+        for clave, valor in self.seek(prefijo):
+            if not clave.startswith(prefijo):
+                return
+            yield clave, valor
+    
+    def buscar_parcial(self, texto):
+        """Busca claves que contengan texto (caminata lineal por las hojas)"""
+        texto = texto.lower()
+        resultados = []
+        hoja = self._primera_hoja()
+        while hoja:
+            for clave, valor in zip(hoja.claves, hoja.valores):
+                if texto in clave.lower():
+                    resultados.append(valor)
+            hoja = hoja.siguiente
+        return resultados
+    
+    def buscar_por_rango(self, min_valor, max_valor, campo='tamanio'):
+        """Busca por rango de valores (caminata lineal por las hojas)"""
+        if campo != 'tamanio':
+            return []
+        resultados = []
+        hoja = self._primera_hoja()
+        while hoja:
+            resultados.extend(valor for valor in hoja.valores if min_valor <= valor.tamanio_kb <= max_valor)
+            hoja = hoja.siguiente
+        return resultados
+    
+    def eliminar(self, clave):
+        """Elimina una clave del árbol B+"""
+        if not self.raiz:
+            return False
+        
+        hoja, camino = self._descender(clave)
+        i = bisect_left(hoja.claves, clave)
+        if i < len(hoja.claves) and hoja.claves[i] == clave:
+            del hoja.claves[i]
+            del hoja.valores[i]
+            hoja.cantidad -= 1
+            for ancestro, _ in camino:
+                ancestro.cantidad -= 1
+            
+            # Rebalancear hacia arriba mientras haya nodos con menos de t-1 claves
+            nodo = hoja
+            while camino and len(nodo.claves) < self.t - 1:
+                padre, idx = camino.pop()
+                self._rebalancear(padre, idx)
+                nodo = padre
+        
+        if not self.raiz.claves:
+            self.raiz = None if self.raiz.hoja else self.raiz.hijos[0]
+        
+        return True
+    
+    def _rebalancear(self, padre, i):
+        """Completa el hijo i pidiendo una clave prestada a un hermano o fusionándolo con él"""
+        hijo = padre.hijos[i]
+        izquierdo = padre.hijos[i - 1] if i > 0 else None
+        derecho = padre.hijos[i + 1] if i + 1 < len(padre.hijos) else None
+        
+        if izquierdo and len(izquierdo.claves) > self.t - 1:
+            if hijo.hoja:
+                hijo.claves.insert(0, izquierdo.claves.pop())
+                hijo.valores.insert(0, izquierdo.valores.pop())
+                movidas = 1
+                padre.claves[i - 1] = hijo.claves[0]
+            else:
+                movido = izquierdo.hijos.pop()
+                hijo.hijos.insert(0, movido)
+                hijo.claves.insert(0, padre.claves[i - 1])
+                padre.claves[i - 1] = izquierdo.claves.pop()
+                movidas = movido.cantidad
+            izquierdo.cantidad -= movidas
+            hijo.cantidad += movidas
+        elif derecho and len(derecho.claves) > self.t - 1:
+            if hijo.hoja:
+                hijo.claves.append(derecho.claves.pop(0))
+                hijo.valores.append(derecho.valores.pop(0))
+                movidas = 1
+                padre.claves[i] = derecho.claves[0]
+            else:
+                movido = derecho.hijos.pop(0)
+                hijo.hijos.append(movido)
+                hijo.claves.append(padre.claves[i])
+                padre.claves[i] = derecho.claves.pop(0)
+                movidas = movido.cantidad
+            derecho.cantidad -= movidas
+            hijo.cantidad += movidas
+        elif izquierdo:
+            self._fusionar(padre, i - 1)
+        else:
+            self._fusionar(padre, i)
+    
+    def _fusionar(self, padre, i):
+        """Fusiona el hijo i+1 dentro del hijo i y quita su separador del padre"""
+        izquierdo = padre.hijos[i]
+        derecho = padre.hijos[i + 1]
+        if izquierdo.hoja:
+            izquierdo.claves.extend(derecho.claves)
+            izquierdo.valores.extend(derecho.valores)
+            izquierdo.siguiente = derecho.siguiente
+        else:
+            izquierdo.claves.append(padre.claves[i])
+            izquierdo.claves.extend(derecho.claves)
+            izquierdo.hijos.extend(derecho.hijos)
+        izquierdo.cantidad += derecho.cantidad
+        
+        del padre.claves[i]
+        del padre.hijos[i + 1]
+    
+    def eliminar_rango(self, minimo, maximo):
+        """
+        Elimina todas las claves con minimo <= clave <= maximo.
+        Retorna la lista de pares (clave, valor) eliminados, en orden.
+        """
+        return self._eliminar_intervalo(minimo, maximo, True)
+    
+    def eliminar_prefijo(self, prefijo):
+        """Elimina todas las claves que empiezan con prefijo (ver eliminar_rango)"""
+        if not prefijo:
+            return self._eliminar_intervalo(None, None, True)
+        
+        siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+        return self._eliminar_intervalo(prefijo, siguiente, False)
+    
+    def _eliminar_intervalo(self, minimo, maximo, incluir_maximo):
+        """
+        Elimina el intervalo [minimo, maximo] o [minimo, maximo) (None = sin límite).
+        Si el intervalo es una fracción grande del árbol, lo recarga con lo que queda
+        (O(n)); si no, elimina clave por clave (O(k log n)).
+        """
+        inicio = 0 if minimo is None else self.rank(minimo)
+        eliminados = []
+        for clave, valor in self.seek_posicion(inicio):
+            if maximo is not None and (clave > maximo or (clave == maximo and not incluir_maximo)):
+                break
+            eliminados.append((clave, valor))
+        
+        if not eliminados:
+            return []
+        
+        if len(eliminados) * 4 >= self.contar():
+            restantes = [par for posicion, par in enumerate(self.seek())
+                         if not inicio <= posicion < inicio + len(eliminados)]
+            self.raiz = BPlusTree.bulk_load(restantes, t=self.t).raiz
+        else:
+            for clave, _ in eliminados:
+                self.eliminar(clave)
+        
+        return eliminados
+    
+    def altura(self):
+        """Cantidad de niveles del árbol"""
+        altura = 0
+        nodo = self.raiz
+        while nodo:
+            altura += 1
+            nodo = None if nodo.hoja else nodo.hijos[0]
+        return altura
+    
+    def to_dict(self, codificar=None, comprimir_claves=True):
+        """
+        Convierte el árbol B+ a diccionario para serialización. Sólo se guardan
+        las hojas, en orden (caminata lineal); los niveles internos se reconstruyen
+        al cargar. codificar y comprimir_claves funcionan como en BTree.to_dict.
+        """
+        if not self.raiz:
+            return {}
+        
+        hojas = []
+        hoja = self._primera_hoja()
+        while hoja:
+            data = {
+                'claves': hoja.claves,
+                'valores': [codificar(v) for v in hoja.valores] if codificar else hoja.valores
+            }
+            if comprimir_claves and all(isinstance(clave, str) for clave in hoja.claves):
+                data['comunes'], data['claves'] = comprimir_prefijos(hoja.claves)
+            hojas.append(data)
+            hoja = hoja.siguiente
+        
+        return {'tipo': self.TIPO, 't': self.t, 'hojas': hojas}
+    
+    @classmethod
+    def from_dict(cls, data, decodificar=None, t=None):
+        """
+        Crea un árbol B+ desde diccionario (ver BTree.from_dict).
+        Las hojas se restauran tal como se guardaron y se enlazan en orden.
+        """
+        if not data:
+            return cls(t or 3)
+        
+        arbol = cls(t=data['t'])
+        hojas = []
+        for hoja_data in data['hojas']:
+            hoja = NodoBPlus(True)
+            if 'comunes' in hoja_data:
+                hoja.claves = descomprimir_prefijos(hoja_data['comunes'], hoja_data['claves'])
+            else:
+                hoja.claves = hoja_data['claves']
+            if decodificar:
+                hoja.valores = [decodificar(clave, dato) for clave, dato in zip(hoja.claves, hoja_data['valores'])]
+            else:
+                hoja.valores = hoja_data['valores']
+            hoja.cantidad = len(hoja.claves)
+            if hojas:
+                hojas[-1].siguiente = hoja
+            hojas.append(hoja)
+        
+        if hojas:
+            arbol.raiz = arbol._construir_internos(hojas)
+        if t is not None:
+            arbol.cambiar_grado(t)
+        return arbol
@@ -0,0 +1,5 @@
+"""
+Paquete de benchmarks del sistema
+Cada módulo se ejecuta desde la raíz del proyecto, por ejemplo:
+    python -m benchmarks.bench_arbol_b
+"""
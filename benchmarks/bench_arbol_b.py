@@ -0,0 +1,52 @@
+"""
+Benchmark de throughput del Árbol B (inserción, búsqueda y eliminación)
+para distintos grados mínimos t.
+
+Uso:
+    python -m benchmarks.bench_arbol_b [n_claves]
+"""
+import sys
+from arboles import BTree
+from benchmarks.utilidades import generar_rutas, medir, formatear_tasa
+
+GRADOS = [3, 16, 64, 256]
+
+
+def _insertar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.insertar(ruta, {'ruta_completa': ruta})
+
+
+def _buscar_todas(arbol, rutas):
+    encontradas = 0
+    for ruta in rutas:
+        if arbol.buscar(ruta) is not None:
+            encontradas += 1
+    return encontradas
+
+
+def _eliminar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.eliminar(ruta)
+
+
+def ejecutar(n=100000):
+    """Ejecuta el benchmark y muestra una tabla de resultados"""
+    rutas = generar_rutas(n)
+    print(f"Árbol B: {n} claves")
+    print(f"{'t':>5} | {'insertar':>15} | {'buscar':>15} | {'eliminar':>15}")
+    print("-" * 60)
+    
+    for t in GRADOS:
+        arbol = BTree(t)
+        seg_insertar, _ = medir(_insertar_todas, arbol, rutas)
+        seg_buscar, encontradas = medir(_buscar_todas, arbol, rutas)
+        assert encontradas == n, "Faltan claves tras la inserción"
+        seg_eliminar, _ = medir(_eliminar_todas, arbol, rutas)
+        
+        print(f"{t:>5} | {formatear_tasa(n, seg_insertar):>15} | "
+              f"{formatear_tasa(n, seg_buscar):>15} | {formatear_tasa(n, seg_eliminar):>15}")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
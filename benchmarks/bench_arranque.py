@@ -0,0 +1,94 @@
+"""
+Arranque de la consola con n archivos cargados desde un backup: reconstruir y
+guardar el índice global antes del prompt (arranque anterior) contra hacerlo en
+el hilo de CargadorIndice. Mide el tiempo hasta el prompt y cuánto tarda un
+comando index escrito apenas aparece (cd, dir, mkdir... no esperan al índice).
+Con el índice sellado con la generación del backup no hay reconstrucción: el
+hilo sólo abre el archivo. El primer index es una página de index search -path
+(las búsquedas por nombre, tamaño o fecha además construyen los índices
+secundarios la primera vez).
+
+Uso:
+    python -m benchmarks.bench_arranque [n_archivos]
+"""
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+from indice_global import IndiceGlobal
+from cargador_indice import CargadorIndice
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+
+GRADO = 64
+GENERACION = "generacion-del-backup"
+TAMANIO_PAGINA = 50
+
+
+def _primer_index(indice):
+    return list(islice(indice.buscar_por_carpeta("D::/Fotos"), TAMANIO_PAGINA))
+
+
+def _construir(archivos_con_ruta, archivo):
+    indice = IndiceGlobal(GRADO)
+    indice.reconstruir(archivos_con_ruta)
+    indice.sellar_generacion(GENERACION)
+    indice.guardar_indice(archivo)
+    return indice
+
+
+def _abrir_sellado(archivos_con_ruta, archivo):
+    """Como SistemaConsola._preparar_indice_global: reconstruye sólo si la generación no coincide"""
+    indice = IndiceGlobal(GRADO)
+    if indice.cargar_indice(archivo) and indice.generacion == GENERACION:
+        indice.indexar_contenido(archivos_con_ruta)
+        return indice
+    return _construir(archivos_con_ruta, archivo)
+
+
+def ejecutar(n=100000):
+    """Compara el arranque sincrónico con la carga del índice en segundo plano"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    print(f"Índice global: {n} archivos (desde backup), t={GRADO}")
+    print(f"{'arranque':>14} | {'hasta el prompt':>15} | {'primer index':>12}")
+    print("-" * 48)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice_global.idx")
+        
+        inicio = time.perf_counter()
+        indice = _construir(archivos_con_ruta, archivo)
+        prompt = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _primer_index(indice)
+        primer_index = time.perf_counter() - inicio
+        print(f"{'sincrónico':>14} | {prompt * 1000:>12.1f} ms | {primer_index * 1000:>9.1f} ms")
+        del indice
+        
+        # Peor caso: el index se escribe apenas aparece el prompt y espera la carga completa
+        inicio = time.perf_counter()
+        cargador = CargadorIndice(lambda: _construir(archivos_con_ruta, archivo))
+        prompt_diferido = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _primer_index(cargador.obtener())
+        primer_index_diferido = time.perf_counter() - inicio
+        print(f"{'segundo plano':>14} | {prompt_diferido * 1000:>12.1f} ms | {primer_index_diferido * 1000:>9.1f} ms")
+        reconstruccion = cargador.segundos_carga
+        del cargador
+        
+        # Arranque siguiente: el índice guardado tiene la generación del backup
+        inicio = time.perf_counter()
+        cargador = CargadorIndice(lambda: _abrir_sellado(archivos_con_ruta, archivo))
+        prompt_sellado = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        _primer_index(cargador.obtener())
+        primer_index_sellado = time.perf_counter() - inicio
+        print(f"{'sellado':>14} | {prompt_sellado * 1000:>12.1f} ms | {primer_index_sellado * 1000:>9.1f} ms")
+        
+        print(f"\nCarga en segundo plano: {reconstruccion * 1000:.1f} ms reconstruyendo, "
+              f"{cargador.segundos_carga * 1000:.1f} ms abriendo el índice sellado")
+        print(f"Hasta el prompt: {prompt / prompt_diferido:.0f}x más rápido")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,95 @@
+"""
+Costo del backup automático después de cada comando que modifica el sistema
+(mkdir, type, rm...): serializar todas las unidades y escribir un backup
+completo (como antes) contra reutilizar la serialización de las carpetas que
+no cambiaron y escribir sólo un delta con las que sí. También mide cuánto
+agrega a cargar_ultimo_backup reconstruir la base más sus deltas.
+
+Uso:
+    python -m benchmarks.bench_backup_incremental [n_archivos]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from configuracion import Configuracion
+from benchmarks.bench_resincronizacion import construir_sistema
+from benchmarks.utilidades import medir
+
+COMANDOS = 50
+
+
+def _configuracion(directorio, deltas_por_base):
+    """Configuracion con sus backups en un directorio propio"""
+    archivo_config = os.path.join(directorio, f"config_{deltas_por_base}.json")
+    with open(archivo_config, 'w', encoding='utf-8') as f:
+        json.dump({"backup_dir": os.path.join(directorio, f"backups_{deltas_por_base}"),
+                   "backup_automatico": True, "formato_backup": "json",
+                   "backup_deltas_por_base": deltas_por_base}, f)
+    return Configuracion(archivo_config)
+
+
+def _olvidar_serializacion(sistema):
+    """Descarta la serialización guardada de todas las carpetas (el costo de antes: todo se recorre)"""
+    pendientes = [unidad.arbol_directorios.raiz.dato for unidad in sistema.unidades.listar_unidades()]
+    while pendientes:
+        carpeta = pendientes.pop()
+        carpeta._serializada = None
+        pendientes.extend(carpeta.listar_subcarpetas())
+
+
+def _comandos(sistema, carpetas, config, completo):
+    """Crea un archivo por comando en carpetas distintas, con su backup; retorna (segundos, bytes escritos)"""
+    directorio = config.config['backup_dir']
+    segundos = 0
+    escritos = 0
+    for i in range(COMANDOS):
+        carpeta = carpetas[i * 7 % len(carpetas)]
+        unidad = sistema.unidades.obtener_unidad(carpeta.ruta_completa[:carpeta.ruta_completa.index(':') + 1])
+        unidad.crear_archivo(f"nuevo_{i}_{completo}", f"Contenido nuevo {i}", carpeta)
+        if completo:
+            _olvidar_serializacion(sistema)
+        
+        inicio = time.perf_counter()
+        archivo = config.hacer_backup(sistema.obtener_estructura_completa())
+        segundos += time.perf_counter() - inicio
+        escritos += os.path.getsize(archivo)
+        if completo:
+            # Cada backup completo tiene su propio archivo (los nombres son por segundo)
+            os.replace(archivo, os.path.join(directorio, f"completo_{i}.json"))
+    return segundos, escritos
+
+
+def ejecutar(n=100000):
+    """Compara el backup completo por comando con el backup delta"""
+    sistema, carpetas = construir_sistema(n)
+    print(f"Sistema de archivos: {n} archivos en {len(carpetas)} carpetas, {COMANDOS} comandos con backup")
+    print(f"{'backup':>28} | {'por comando':>12} | {'escrito por comando':>20}")
+    print("-" * 68)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        resultados = {}
+        for nombre, deltas_por_base, completo in (("completo (antes)", 0, True), ("delta", COMANDOS, False)):
+            config = _configuracion(directorio, deltas_por_base)
+            config.hacer_backup(sistema.obtener_estructura_completa())
+            segundos, escritos = _comandos(sistema, carpetas, config, completo)
+            resultados[nombre] = segundos
+            print(f"{nombre:>28} | {segundos / COMANDOS * 1000:>9.2f} ms | {escritos / COMANDOS / 1024:>17.1f} KB")
+        
+        print(f"\nBackup por comando: {resultados['completo (antes)'] / resultados['delta']:.0f}x más rápido")
+        
+        # Carga: la base sola contra la base más COMANDOS deltas
+        config = _configuracion(directorio, COMANDOS)
+        seg_con_deltas, datos = medir(config.cargar_ultimo_backup)
+        assert datos['generacion'] == config.generacion_backup
+        assert json.dumps(datos['unidades'], sort_keys=True) == \
+            json.dumps(sistema.obtener_estructura_completa()['unidades'], sort_keys=True)
+        config = _configuracion(directorio, 0)
+        seg_base, _ = medir(config.cargar_ultimo_backup)
+        print(f"Carga del último backup: {seg_base * 1000:.0f} ms completo, "
+              f"{seg_con_deltas * 1000:.0f} ms base + {COMANDOS} deltas")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,41 @@
+"""
+Benchmark de index search <texto>: recorrido completo del árbol
+(BTree.buscar_parcial) contra el índice de trigramas de IndiceGlobal.
+
+Uso:
+    python -m benchmarks.bench_busqueda_parcial [n_archivos]
+"""
+import sys
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+from benchmarks.utilidades import medir
+from indice_global import IndiceGlobal
+
+CONSULTAS = ["a", "fotos", "archivo_12", "archivo_4242", "musica/archivo_7", "inexistente"]
+REPETICIONES = 10
+
+
+def _repetir(funcion, *args):
+    for _ in range(REPETICIONES):
+        resultado = list(funcion(*args))
+    return resultado
+
+
+def ejecutar(n=100000):
+    """Compara ambas estrategias para consultas de distinta selectividad"""
+    indice = IndiceGlobal()
+    indice.reconstruir(generar_archivos_con_ruta(n))
+    print(f"index search <texto>: {n} archivos, {REPETICIONES} repeticiones por consulta")
+    print(f"{'consulta':>18} | {'resultados':>10} | {'recorrido':>12} | {'trigramas':>12}")
+    print("-" * 62)
+    
+    for consulta in CONSULTAS:
+        seg_recorrido, esperado = medir(_repetir, indice.arbol_b.buscar_parcial, consulta)
+        seg_trigramas, obtenido = medir(_repetir, indice.buscar_parcial, consulta)
+        assert len(esperado) == len(obtenido)
+        
+        print(f"{consulta:>18} | {len(obtenido):>10} | "
+              f"{seg_recorrido / REPETICIONES * 1000:>9.2f} ms | {seg_trigramas / REPETICIONES * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
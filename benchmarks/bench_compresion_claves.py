@@ -0,0 +1,77 @@
+"""
+Reporte del front coding de claves en la serialización del índice global
+sobre una jerarquía profunda: tamaño en disco de indice_global.json y memoria
+(pico de tracemalloc) al cargarlo, para el formato anterior (indentado, claves
+completas), JSON compacto con claves completas y JSON compacto con front coding.
+
+Uso:
+    python -m benchmarks.bench_compresion_claves [n_archivos] [profundidad]
+"""
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from arboles import BTree
+from indice_global import IndiceGlobal, EntradaIndice
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+
+
+FORMATOS = [
+    # (nombre, comprimir_claves, opciones de json.dump)
+    ("indentado", False, {'indent': 4}),
+    ("compacto", False, {'separators': (',', ':')}),
+    ("front coding", True, {'separators': (',', ':')})
+]
+
+
+def _guardar(indice, archivo, comprimir_claves, opciones_json):
+    """Igual que IndiceGlobal.guardar_indice, eligiendo formato"""
+    with open(archivo, 'w', encoding='utf-8') as f:
+        json.dump(indice.arbol_b.to_dict(EntradaIndice.a_lista, comprimir_claves=comprimir_claves),
+                  f, ensure_ascii=False, **opciones_json)
+
+
+def _pico_de_carga(archivo, t):
+    """Pico de memoria (bytes) al leer y decodificar el árbol principal guardado"""
+    tracemalloc.start()
+    try:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            arbol = BTree.from_dict(json.load(f), EntradaIndice.desde_datos, t=t)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del arbol
+    return pico
+
+
+def ejecutar(n=100000, profundidad=8, t=64):
+    """Compara ambos formatos y muestra el ahorro"""
+    indice = IndiceGlobal(t)
+    indice.reconstruir(generar_archivos_con_ruta(n, profundidad))
+    bytes_claves = sum(len(clave.encode('utf-8')) for clave, _ in indice.arbol_b.seek())
+    
+    print(f"Índice global: {n} archivos, hasta {profundidad} niveles de carpetas, t={t}")
+    print(f"Claves sin comprimir: {bytes_claves / 1024 / 1024:.1f} MB ({bytes_claves / n:.0f} bytes por ruta)")
+    print(f"{'formato':>13} | {'disco':>10} | {'pico al cargar':>14}")
+    print("-" * 45)
+    
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, comprimir, opciones_json in FORMATOS:
+            archivo = os.path.join(directorio, f"indice_{len(resultados)}.json")
+            _guardar(indice, archivo, comprimir, opciones_json)
+            tamanio = os.path.getsize(archivo)
+            resultados[nombre] = (tamanio, _pico_de_carga(archivo, t))
+            print(f"{nombre:>13} | {tamanio / 1024 / 1024:>7.1f} MB | {resultados[nombre][1] / 1024 / 1024:>11.1f} MB")
+    
+    disco_antes, pico_antes = resultados["indentado"]
+    for nombre in ("compacto", "front coding"):
+        disco, pico = resultados[nombre]
+        print(f"Ahorro de {nombre} frente al formato anterior: disco {1 - disco / disco_antes:.0%}, "
+              f"pico al cargar {1 - pico / pico_antes:.0%}")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 8)
@@ -0,0 +1,86 @@
+"""
+Costo de persistir el índice global después de cada comando que lo modifica
+(type, rm, rename...): reescribir el índice completo en cada guardado contra
+agregar los cambios al diario, con un checkpoint cada MAX_REGISTROS registros.
+También mide cuánto agrega reproducir un diario lleno al cargar.
+
+Uso:
+    python -m benchmarks.bench_diario [n_archivos]
+"""
+import os
+import sys
+import tempfile
+import time
+from indice_global import IndiceGlobal
+from sistema import Archivo
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+from benchmarks.utilidades import medir
+
+GRADO = 64
+COMANDOS = 200
+MAX_REGISTROS = 1000
+
+
+def _comandos(indice, archivo, cantidad):
+    """Alterna altas y bajas de archivos guardando después de cada una; retorna (segundos, bytes escritos)"""
+    diario = indice._archivo_diario(archivo)
+    segundos = 0
+    escritos = 0
+    for i in range(cantidad):
+        if i % 2 == 0:
+            indice.insertar_archivo(Archivo(f"nuevo_{i}", f"Contenido nuevo {i}"), "C::/Nuevos")
+        else:
+            indice.eliminar_archivo(f"C::/Nuevos/nuevo_{i - 1}.txt")
+        
+        antes = os.path.getsize(diario) if os.path.exists(diario) else 0
+        inicio = time.perf_counter()
+        indice.guardar_indice(archivo)
+        segundos += time.perf_counter() - inicio
+        if os.path.exists(diario) and os.path.getsize(diario) > antes:
+            escritos += os.path.getsize(diario) - antes
+        else:
+            escritos += os.path.getsize(archivo)
+    return segundos, escritos
+
+
+def _cargar(archivo):
+    indice = IndiceGlobal(GRADO)
+    indice.cargar_indice(archivo)
+    return indice
+
+
+def ejecutar(n=100000):
+    """Compara ambas formas de guardar y el costo del diario al cargar"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    print(f"Índice global: {n} archivos, t={GRADO}, {COMANDOS} comandos que lo modifican")
+    print(f"{'guardado':>20} | {'por comando':>12} | {'escrito por comando':>20}")
+    print("-" * 60)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice_global.idx")
+        resultados = {}
+        for nombre, max_registros in (("índice completo", 0), ("diario", MAX_REGISTROS)):
+            indice = IndiceGlobal(GRADO)
+            indice.reconstruir(archivos_con_ruta)
+            indice.guardar_indice(archivo)
+            indice.max_registros_diario = max_registros
+            segundos, escritos = _comandos(indice, archivo, COMANDOS)
+            resultados[nombre] = segundos
+            print(f"{nombre:>20} | {segundos / COMANDOS * 1000:>9.2f} ms | {escritos / COMANDOS / 1024:>17.1f} KB")
+        
+        print(f"\nGuardado por comando: {resultados['índice completo'] / resultados['diario']:.0f}x más rápido")
+        
+        # Diario lleno: MAX_REGISTROS cambios pendientes de reproducir al cargar
+        indice.max_registros_diario = MAX_REGISTROS
+        indice.guardar_indice(archivo)
+        _comandos(indice, archivo, MAX_REGISTROS - indice._registros_diario)
+        seg_con_diario, cargado = medir(_cargar, archivo)
+        assert cargado.arbol_b.contar() == indice.arbol_b.contar()
+        indice._checkpoint(archivo)
+        seg_sin_diario, _ = medir(_cargar, archivo)
+        print(f"Carga del índice: {seg_sin_diario * 1000:.1f} ms sin diario, "
+              f"{seg_con_diario * 1000:.1f} ms reproduciendo {MAX_REGISTROS} registros")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,110 @@
+"""
+Arranque en frío del índice global: JSON (se lee y decodifica completo) contra
+el formato binario de páginas abierto con mmap (sólo se leen los nodos que las
+consultas recorren). Muestra tamaño en disco, tiempo hasta poder responder,
+latencia de las primeras consultas y memoria retenida.
+
+Para JSON se mide sólo la carga del árbol principal: cargar_indice además
+reconstruye los índices secundarios, así que el arranque real es aún más lento.
+
+Uso:
+    python -m benchmarks.bench_formato_binario [n_archivos]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from itertools import islice
+from arboles import BTree
+from indice_global import IndiceGlobal, EntradaIndice
+from benchmarks.utilidades import generar_rutas, medir
+
+GRADO = 64
+CONSULTAS = 10
+TAMANIO_PAGINA = 50
+
+
+def _crear_indice(n):
+    """Índice con n entradas en el árbol principal (sin índices secundarios, que no se guardan)"""
+    aleatorio = random.Random(5)
+    pares = []
+    for ruta in generar_rutas(n):
+        fecha = 1.7e9 + aleatorio.random() * 3e7
+        pares.append((ruta, EntradaIndice(ruta, aleatorio.random() * 100, fecha, fecha,
+                                          f"Contenido de {ruta.rsplit('/', 1)[1]}")))
+    pares.sort(key=lambda par: par[0])
+    indice = IndiceGlobal(GRADO)
+    indice.arbol_b = BTree.bulk_load(pares, t=GRADO)
+    return indice
+
+
+def _cargar_json(archivo):
+    with open(archivo, 'r', encoding='utf-8') as f:
+        return BTree.from_dict(json.load(f), EntradaIndice.desde_datos, t=GRADO)
+
+
+def _cargar_binario(archivo):
+    indice = IndiceGlobal(GRADO)
+    indice.cargar_indice(archivo)
+    return indice.arbol_b
+
+
+def _consultar(arbol, rutas, carpeta):
+    """Búsquedas por ruta exacta y una página de resultados de una carpeta"""
+    for ruta in rutas:
+        arbol.buscar(ruta)
+    return list(islice(arbol.iter_prefix(carpeta), TAMANIO_PAGINA))
+
+
+def _medir_formato(cargar, archivo, rutas, carpeta):
+    """Retorna (segundos de carga, segundos de consultas, MB retenidos, MB de pico)"""
+    seg_carga, arbol = medir(cargar, archivo)
+    seg_consultas, _ = medir(_consultar, arbol, rutas, carpeta)
+    del arbol
+    
+    tracemalloc.start()
+    try:
+        arbol = cargar(archivo)
+        _consultar(arbol, rutas, carpeta)
+        actual, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del arbol
+    return seg_carga, seg_consultas, actual / 1024 / 1024, pico / 1024 / 1024
+
+
+def ejecutar(n=1000000):
+    """Guarda un índice de n archivos en ambos formatos y compara el arranque"""
+    indice = _crear_indice(n)
+    rutas = random.Random(9).sample([clave for clave, _ in indice.arbol_b.seek()], CONSULTAS)
+    carpeta = "D::/Fotos/"
+    
+    print(f"Índice global: {n} archivos, t={GRADO}, {CONSULTAS} búsquedas por ruta "
+          f"+ 1 página de {TAMANIO_PAGINA} de una carpeta")
+    print(f"{'formato':>8} | {'disco':>9} | {'guardar':>9} | {'carga':>10} | {'consultas':>9} | "
+          f"{'retenida':>9} | {'pico':>9}")
+    print("-" * 82)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        formatos = [
+            ("json", os.path.join(directorio, "indice_global.json"), indice.exportar_json, _cargar_json),
+            ("binario", os.path.join(directorio, "indice_global.idx"), indice.guardar_indice, _cargar_binario)
+        ]
+        resultados = {}
+        for nombre, archivo, guardar, cargar in formatos:
+            seg_guardar, _ = medir(guardar, archivo)
+            tamanio = os.path.getsize(archivo) / 1024 / 1024
+            seg_carga, seg_consultas, retenida, pico = _medir_formato(cargar, archivo, rutas, carpeta)
+            resultados[nombre] = (seg_carga + seg_consultas, retenida)
+            print(f"{nombre:>8} | {tamanio:>6.1f} MB | {seg_guardar:>7.2f} s | {seg_carga * 1000:>7.1f} ms | "
+                  f"{seg_consultas * 1000:>6.1f} ms | {retenida:>6.1f} MB | {pico:>6.1f} MB")
+    
+    (tiempo_json, memoria_json), (tiempo_binario, memoria_binario) = resultados["json"], resultados["binario"]
+    print(f"\nHasta responder las primeras consultas: {tiempo_json / tiempo_binario:.0f}x más rápido, "
+          f"{memoria_json / memoria_binario:.0f}x menos memoria retenida")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
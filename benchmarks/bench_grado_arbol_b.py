@@ -0,0 +1,88 @@
+"""
+Barrido del grado mínimo t del árbol B del índice global sobre las cargas
+sintéticas habituales (carga masiva, búsquedas, altas/bajas, páginas de
+resultados y carga desde JSON). Recomienda el grado con menor tiempo total
+para configurarlo en config.json ("grado_arbol_b").
+
+Uso:
+    python -m benchmarks.bench_grado_arbol_b [n_archivos]
+"""
+import random
+import sys
+from itertools import islice
+from arboles import BTree
+from benchmarks.utilidades import generar_rutas, medir
+
+GRADOS = [2, 3, 4, 8, 16, 32, 64, 128, 256]
+TAMANIO_PAGINA = 50
+PAGINAS = 2000
+
+
+def _buscar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.buscar(ruta)
+
+
+def _insertar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.insertar(ruta, ruta)
+
+
+def _eliminar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.eliminar(ruta)
+
+
+def _leer_paginas(arbol, inicios):
+    for inicio in inicios:
+        for _ in islice(arbol.seek_posicion(arbol.rank(inicio)), TAMANIO_PAGINA):
+            pass
+
+
+def _cargar_json(arbol):
+    return BTree.from_dict(arbol.to_dict())
+
+
+def medir_grado(t, pares, consultas, nuevas, inicios):
+    """Retorna (altura, {carga: segundos}) para un grado"""
+    tiempos = {}
+    tiempos['bulk_load'], arbol = medir(BTree.bulk_load, pares, t=t)
+    tiempos['buscar'], _ = medir(_buscar_todas, arbol, consultas)
+    tiempos['insertar'], _ = medir(_insertar_todas, arbol, nuevas)
+    tiempos['eliminar'], _ = medir(_eliminar_todas, arbol, nuevas)
+    tiempos['paginas'], _ = medir(_leer_paginas, arbol, inicios)
+    tiempos['cargar_json'], _ = medir(_cargar_json, arbol)
+    return arbol.altura(), tiempos
+
+
+def ejecutar(n=100000):
+    """Ejecuta el barrido y recomienda un grado"""
+    aleatorio = random.Random(7)
+    rutas = generar_rutas(n + n // 10)
+    existentes, nuevas = rutas[:n], rutas[n:]
+    pares = sorted((ruta, ruta) for ruta in existentes)
+    consultas = aleatorio.sample(existentes, min(n, 50000))
+    inicios = aleatorio.sample(existentes, min(n, PAGINAS))
+    
+    cargas = ['bulk_load', 'buscar', 'insertar', 'eliminar', 'paginas', 'cargar_json']
+    print(f"Árbol B: {n} claves, {len(consultas)} búsquedas, {len(nuevas)} altas/bajas, "
+          f"{len(inicios)} páginas de {TAMANIO_PAGINA}")
+    print(f"{'t':>4} | {'altura':>6} | " + " | ".join(f"{carga:>11}" for carga in cargas) + f" | {'total':>9}")
+    print("-" * (26 + 14 * len(cargas)))
+    
+    totales = {}
+    for t in GRADOS:
+        altura, tiempos = medir_grado(t, pares, consultas, nuevas, inicios)
+        totales[t] = sum(tiempos.values())
+        print(f"{t:>4} | {altura:>6} | " + " | ".join(f"{tiempos[carga] * 1000:>8.1f} ms" for carga in cargas)
+              + f" | {totales[t] * 1000:>6.0f} ms")
+    
+    # El menor grado a no más de un 5% del mejor total: los grados grandes empatan
+    # dentro del ruido y copian más claves en cada división o fusión de nodos
+    umbral = min(totales.values()) * 1.05
+    recomendado = min(t for t in GRADOS if totales[t] <= umbral)
+    print(f"\nGrado recomendado para {n} archivos: \"grado_arbol_b\": {recomendado}")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,96 @@
+"""
+Latencia de los comandos que modifican el índice global (type, rm, rename...)
+cuando cada uno guarda el índice antes de responder, contra marcar el cambio y
+dejar que EscritorIndice guarde en segundo plano una sola vez por ráfaga.
+Se mide con el índice reescrito completo en cada guardado y con el diario.
+
+Uso:
+    python -m benchmarks.bench_guardado_diferido [n_archivos]
+"""
+import os
+import sys
+import tempfile
+import time
+from indice_global import IndiceGlobal
+from escritor_indice import EscritorIndice
+from sistema import Archivo
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+
+GRADO = 64
+RAFAGAS = 5
+COMANDOS_POR_RAFAGA = 40
+ESPERA = 0.2
+
+
+def _comando(indice, i):
+    """Alta o baja de un archivo, como harían type y rm"""
+    if i % 2 == 0:
+        indice.insertar_archivo(Archivo(f"nuevo_{i}", f"Contenido nuevo {i}"), "C::/Nuevos")
+    else:
+        indice.eliminar_archivo(f"C::/Nuevos/nuevo_{i - 1}.txt")
+
+
+def _sincrono(indice, archivo):
+    """Cada comando guarda el índice antes de volver; retorna (segundos por comando, guardados)"""
+    segundos = 0
+    for rafaga in range(RAFAGAS):
+        for i in range(COMANDOS_POR_RAFAGA):
+            inicio = time.perf_counter()
+            _comando(indice, i)
+            indice.guardar_indice(archivo)
+            segundos += time.perf_counter() - inicio
+    comandos = RAFAGAS * COMANDOS_POR_RAFAGA
+    return segundos / comandos, comandos
+
+
+def _diferido(indice, archivo):
+    """Cada comando sólo marca el cambio; retorna (segundos por comando, métricas del escritor)"""
+    escritor = EscritorIndice(lambda: indice.guardar_indice(archivo), ESPERA)
+    segundos = 0
+    for rafaga in range(RAFAGAS):
+        for i in range(COMANDOS_POR_RAFAGA):
+            inicio = time.perf_counter()
+            with escritor.bloqueo:
+                _comando(indice, i)
+                escritor.marcar_cambios()
+            segundos += time.perf_counter() - inicio
+        # Pausa entre ráfagas: el escritor guarda mientras el usuario lee la respuesta
+        time.sleep(ESPERA * 2)
+    metricas = escritor.detener()
+    return segundos / (RAFAGAS * COMANDOS_POR_RAFAGA), metricas
+
+
+def ejecutar(n=100000):
+    """Compara guardar en cada comando contra el guardado diferido, con y sin diario"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    print(f"Índice global: {n} archivos, t={GRADO}, {RAFAGAS} ráfagas de {COMANDOS_POR_RAFAGA} comandos, "
+          f"espera {ESPERA} s")
+    print(f"{'persistencia':>16} | {'guardado':>9} | {'por comando':>12} | {'guardados':>9} | {'latencia guardado':>17}")
+    print("-" * 76)
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice_global.idx")
+        for nombre, max_registros in (("índice completo", 0), ("diario", 1000)):
+            for modo in ("síncrono", "diferido"):
+                indice = IndiceGlobal(GRADO)
+                indice.reconstruir(archivos_con_ruta)
+                indice.guardar_indice(archivo)
+                indice.max_registros_diario = max_registros
+                if modo == "síncrono":
+                    por_comando, guardados = _sincrono(indice, archivo)
+                    latencia = f"{por_comando * 1000:>14.2f} ms"
+                else:
+                    por_comando, metricas = _diferido(indice, archivo)
+                    guardados = metricas['guardados']
+                    latencia = f"{metricas['latencia_media_ms']:>14.2f} ms"
+                print(f"{nombre:>16} | {modo:>9} | {por_comando * 1000:>9.3f} ms | {guardados:>9} | {latencia}")
+                
+                # Lo guardado en disco refleja todos los comandos
+                cargado = IndiceGlobal(GRADO)
+                cargado.cargar_indice(archivo)
+                assert cargado.arbol_b.contar() == indice.arbol_b.contar()
+                cargado._cerrar_paginas()
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,93 @@
+"""
+Benchmark de ingesta por lotes sobre un índice ya cargado: N inserciones
+independientes contra una inserción por lote (BTree.insertar_lote e
+IndiceGlobal.insertar_archivos), con lotes dispersos por todo el árbol y
+con lotes que caen en una sola carpeta (importación o type masivo).
+
+Uso:
+    python -m benchmarks.bench_insercion_lote [n_existentes]
+"""
+import random
+import sys
+from arboles import BTree
+from indice_global import IndiceGlobal
+from sistema import Archivo
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+from benchmarks.utilidades import medir, formatear_tasa
+
+LOTES = [1000, 10000, 50000]
+GRADO = 64
+
+
+def _clave(item):
+    return f"{item['ruta']}/{item['archivo'].nombre}.{item['archivo'].extension}"
+
+
+def _lote_en_carpeta(tamanio):
+    """Archivos nuevos de una misma carpeta, en orden aleatorio"""
+    lote = [{'archivo': Archivo(f"importado_{i:06d}", f"Contenido importado {i}"), 'ruta': "C::/Importados"}
+            for i in range(tamanio)]
+    random.Random(tamanio).shuffle(lote)
+    return lote
+
+
+def _insertar_claves(arbol, pares):
+    for clave, valor in pares:
+        arbol.insertar(clave, valor)
+
+
+def _insertar_archivos(indice, archivos_con_ruta):
+    for item in archivos_con_ruta:
+        indice.insertar_archivo(item['archivo'], item['ruta'])
+
+
+def _cargar_indice(archivos_con_ruta):
+    indice = IndiceGlobal(GRADO)
+    indice.reconstruir(archivos_con_ruta)
+    return indice
+
+
+def _comparar(existentes, pares_existentes, lote):
+    """Retorna los segundos de (BTree uno a uno, insertar_lote, índice uno a uno, insertar_archivos)"""
+    pares_lote = [(_clave(item), None) for item in lote]
+
+    arbol = BTree.bulk_load(pares_existentes, t=GRADO)
+    seg_uno, _ = medir(_insertar_claves, arbol, pares_lote)
+    arbol = BTree.bulk_load(pares_existentes, t=GRADO)
+    seg_lote, _ = medir(arbol.insertar_lote, pares_lote)
+    assert arbol.contar() == len(pares_existentes) + len(lote)
+
+    indice = _cargar_indice(existentes)
+    seg_indice_uno, _ = medir(_insertar_archivos, indice, lote)
+    indice = _cargar_indice(existentes)
+    seg_indice_lote, _ = medir(indice.insertar_archivos, lote)
+    assert indice.arbol_b.contar() == len(existentes) + len(lote)
+
+    return seg_uno, seg_lote, seg_indice_uno, seg_indice_lote
+
+
+def ejecutar(n=100000):
+    """Compara ambas formas de ingesta sobre n archivos ya indexados"""
+    archivos = generar_archivos_con_ruta(n + max(LOTES))
+    existentes = archivos[:n]
+    pares_existentes = sorted((_clave(item), None) for item in existentes)
+    escenarios = [
+        ("dispersos", lambda tamanio: archivos[n:n + tamanio]),
+        ("1 carpeta", _lote_en_carpeta)
+    ]
+
+    print(f"Ingesta por lotes sobre {n} archivos existentes (t={GRADO})")
+    print(f"{'escenario':>10} | {'lote':>6} | {'BTree uno a uno':>16} | {'insertar_lote':>16} | "
+          f"{'índice uno a uno':>16} | {'insertar_archivos':>17}")
+    print("-" * 97)
+
+    for nombre, generar_lote in escenarios:
+        for tamanio in LOTES:
+            lote = generar_lote(tamanio)
+            segundos = _comparar(existentes, pares_existentes, lote)
+            print(f"{nombre:>10} | {tamanio:>6} | " + " | ".join(
+                f"{formatear_tasa(tamanio, seg):>{ancho}}" for seg, ancho in zip(segundos, (16, 16, 16, 17))))
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
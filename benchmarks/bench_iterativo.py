@@ -0,0 +1,168 @@
+"""
+Microbenchmark de latencia por operación del Árbol B: versiones recursivas
+anteriores (búsqueda, eliminación, búsqueda parcial y serialización) contra
+las iterativas con pila explícita.
+
+Uso:
+    python -m benchmarks.bench_iterativo [n_claves] [t]
+"""
+import random
+import sys
+from bisect import bisect_left
+from arboles import BTree
+from arboles.arbol_b import NodoBTree
+from benchmarks.utilidades import generar_rutas, medir
+
+REPETICIONES = 5
+
+
+class BTreeRecursivo(BTree):
+    """Árbol B con las implementaciones recursivas anteriores, como referencia"""
+
+    def buscar(self, clave):
+        return self._buscar_rec(self.raiz, clave) if self.raiz else None
+
+    def _buscar_rec(self, nodo, clave):
+        i = bisect_left(nodo.claves, clave)
+        if i < len(nodo.claves) and clave == nodo.claves[i]:
+            return nodo.valores[i]
+        if nodo.hoja:
+            return None
+        return self._buscar_rec(nodo.hijos[i], clave)
+
+    def buscar_parcial(self, texto):
+        resultados = []
+        if self.raiz:
+            self._buscar_parcial_rec(self.raiz, texto.lower(), resultados)
+        return resultados
+
+    def _buscar_parcial_rec(self, nodo, texto, resultados):
+        for i, clave in enumerate(nodo.claves):
+            if texto in clave.lower():
+                resultados.append(nodo.valores[i])
+        if not nodo.hoja:
+            for hijo in nodo.hijos:
+                self._buscar_parcial_rec(hijo, texto, resultados)
+
+    def _eliminar_desde(self, nodo, clave):
+        idx = self._encontrar_clave(nodo, clave)
+        if idx < len(nodo.claves) and nodo.claves[idx] == clave:
+            if nodo.hoja:
+                self._eliminar_de_hoja(nodo, idx)
+            else:
+                hijo, clave_hijo = self._eliminar_de_no_hoja(nodo, idx)
+                self._eliminar_desde(hijo, clave_hijo)
+        else:
+            if nodo.hoja:
+                return False
+            ultimo = (idx == len(nodo.claves))
+            if len(nodo.hijos[idx].claves) < self.t:
+                self._llenar(nodo, idx)
+            if ultimo and idx > len(nodo.claves):
+                eliminado = self._eliminar_desde(nodo.hijos[idx - 1], clave)
+            else:
+                eliminado = self._eliminar_desde(nodo.hijos[idx], clave)
+            if not eliminado:
+                return False
+        nodo.cantidad -= 1
+        return True
+
+    def to_dict(self, codificar=None, comprimir_claves=False):
+        return self._nodo_to_dict_rec(self.raiz) if self.raiz else {}
+
+    def _nodo_to_dict_rec(self, nodo):
+        return {
+            't': self.t,
+            'hoja': nodo.hoja,
+            'claves': nodo.claves,
+            'valores': nodo.valores,
+            'hijos': [self._nodo_to_dict_rec(h) for h in nodo.hijos] if not nodo.hoja else []
+        }
+
+    @classmethod
+    def from_dict(cls, data, decodificar=None, t=None):
+        arbol = cls(t=data['t'])
+        arbol.raiz = cls._dict_to_nodo_rec(data)
+        return arbol
+
+    @classmethod
+    def _dict_to_nodo_rec(cls, data):
+        nodo = NodoBTree(data['t'], data['hoja'])
+        nodo.claves = data['claves']
+        nodo.valores = data['valores']
+        if not data['hoja']:
+            for hijo_data in data['hijos']:
+                nodo.hijos.append(cls._dict_to_nodo_rec(hijo_data))
+        nodo.recontar()
+        return nodo
+
+
+def _buscar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.buscar(ruta)
+
+
+def _eliminar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.eliminar(ruta)
+
+
+def _parciales(arbol, textos):
+    for texto in textos:
+        arbol.buscar_parcial(texto)
+
+
+def _ida_y_vuelta(arbol, veces):
+    # Sin codificación por prefijo: la versión recursiva no la tiene y se compara sólo el recorrido
+    for _ in range(veces):
+        type(arbol).from_dict(arbol.to_dict(comprimir_claves=False))
+
+
+def _mejor(funcion, *args):
+    """Menor tiempo de REPETICIONES ejecuciones (reduce el ruido del sistema)"""
+    return min(medir(funcion, *args)[0] for _ in range(REPETICIONES))
+
+
+def _eliminar_en_arbol_nuevo(clase, pares, t, a_eliminar):
+    """Mide sólo las eliminaciones, sobre un árbol recién cargado"""
+    arbol = clase.bulk_load(pares, t=t)
+    segundos, _ = medir(_eliminar_todas, arbol, a_eliminar)
+    return segundos
+
+
+def medir_clase(clase, pares, consultas, a_eliminar, t):
+    """Retorna {operación: segundos por operación}"""
+    arbol = clase.bulk_load(pares, t=t)
+    return {
+        'buscar': _mejor(_buscar_todas, arbol, consultas) / len(consultas),
+        'buscar_parcial': _mejor(_parciales, arbol, ["archivo_1", "fotos"]) / 2,
+        'to/from_dict': _mejor(_ida_y_vuelta, arbol, 1),
+        'eliminar': min(_eliminar_en_arbol_nuevo(clase, pares, t, a_eliminar)
+                        for _ in range(REPETICIONES)) / len(a_eliminar)
+    }
+
+
+def ejecutar(n=100000, t=3):
+    """Compara ambas implementaciones y muestra la latencia por operación"""
+    rutas = generar_rutas(n)
+    pares = sorted((ruta, ruta) for ruta in rutas)
+    aleatorio = random.Random(3)
+    consultas = aleatorio.sample(rutas, min(n, 50000))
+    a_eliminar = aleatorio.sample(rutas, min(n, 20000))
+
+    print(f"Árbol B: {n} claves, t={t}")
+    print(f"{'operación':>15} | {'recursiva':>12} | {'iterativa':>12} | {'mejora':>7}")
+    print("-" * 56)
+
+    recursiva = medir_clase(BTreeRecursivo, pares, consultas, a_eliminar, t)
+    iterativa = medir_clase(BTree, pares, consultas, a_eliminar, t)
+    for operacion in recursiva:
+        antes, despues = recursiva[operacion], iterativa[operacion]
+        unidad, escala = ("ms", 1e3) if antes > 1e-3 else ("µs", 1e6)
+        print(f"{operacion:>15} | {antes * escala:>9.2f} {unidad} | {despues * escala:>9.2f} {unidad} | "
+              f"{antes / despues:>6.2f}x")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,85 @@
+"""
+Reporte de memoria del índice global (tracemalloc): bytes por archivo indexado
+con el formato anterior (nodos con __dict__ y valores como diccionario de 7
+claves con fechas ISO) contra el actual (nodos con __slots__ y EntradaIndice).
+
+Uso:
+    python -m benchmarks.bench_memoria [n_archivos]
+"""
+import sys
+import tracemalloc
+from arboles import BTree
+from indice_global import IndiceGlobal
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+
+
+class NodoConDict:
+    """Nodo equivalente a NodoBTree antes de __slots__ (con __dict__ por instancia)"""
+    def __init__(self, nodo):
+        self.t = nodo.t
+        self.hoja = nodo.hoja
+        self.claves = nodo.claves
+        self.valores = nodo.valores
+        self.hijos = [NodoConDict(hijo) for hijo in nodo.hijos]
+        self.cantidad = nodo.cantidad
+
+
+def _valor_anterior(archivo, clave):
+    """Valor del índice en el formato anterior (diccionario)"""
+    return {
+        'nombre': archivo.nombre,
+        'extension': archivo.extension,
+        'ruta_completa': clave,
+        'tamanio_kb': archivo.tamanio_kb,
+        'fecha_creacion': archivo.fecha_creacion.isoformat(),
+        'fecha_modificacion': archivo.fecha_modificacion.isoformat(),
+        'contenido_preview': archivo.contenido[:100] if archivo.contenido else ""
+    }
+
+
+def _arbol_anterior(archivos_con_ruta):
+    pares = []
+    for item in archivos_con_ruta:
+        archivo = item['archivo']
+        clave = f"{item['ruta']}/{archivo.nombre}.{archivo.extension}"
+        pares.append((clave, _valor_anterior(archivo, clave)))
+    pares.sort(key=lambda par: par[0])
+    return NodoConDict(BTree.bulk_load(pares).raiz)
+
+
+def _arbol_actual(archivos_con_ruta):
+    indice = IndiceGlobal()
+    pares = sorted((indice._crear_entrada(item['archivo'], item['ruta']) for item in archivos_con_ruta),
+                   key=lambda par: par[0])
+    return BTree.bulk_load(pares).raiz
+
+
+def medir_memoria(funcion, *args):
+    """Bytes que quedan reservados por el resultado de la función"""
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args)
+        actual, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del resultado
+    return actual
+
+
+def ejecutar(n=100000):
+    """Compara la memoria del árbol principal con ambos formatos de nodo y valor"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    print(f"Memoria del árbol principal del índice: {n} archivos")
+    print(f"{'formato':>10} | {'total':>12} | {'bytes/archivo':>14}")
+    print("-" * 44)
+    
+    totales = {}
+    for nombre, funcion in (("anterior", _arbol_anterior), ("actual", _arbol_actual)):
+        totales[nombre] = medir_memoria(funcion, archivos_con_ruta)
+        print(f"{nombre:>10} | {totales[nombre] / 1024 / 1024:>9.1f} MB | {totales[nombre] / n:>14.0f}")
+    
+    print(f"\nReducción: {1 - totales['actual'] / totales['anterior']:.0%}")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,116 @@
+"""
+Comparación directa de los dos motores del índice global (Árbol B y Árbol B+)
+con el mismo grado: carga masiva, búsquedas, altas/bajas, recorridos completos
+y por rango, búsqueda parcial, páginas de resultados e ida y vuelta a JSON.
+
+Uso:
+    python -m benchmarks.bench_motores [n_archivos] [t]
+"""
+import json
+import random
+import sys
+from itertools import islice
+from arboles import BTree, BPlusTree
+from benchmarks.utilidades import generar_rutas, medir
+
+REPETICIONES = 3
+TAMANIO_PAGINA = 50
+PAGINAS = 2000
+RANGOS = 500
+
+
+def _buscar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.buscar(ruta)
+
+
+def _insertar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.insertar(ruta, ruta)
+
+
+def _eliminar_todas(arbol, rutas):
+    for ruta in rutas:
+        arbol.eliminar(ruta)
+
+
+def _recorrer(arbol):
+    for _ in arbol.seek():
+        pass
+
+
+def _recorrer_rangos(arbol, rangos):
+    for minimo, maximo in rangos:
+        for _ in arbol.iter_range(minimo, maximo):
+            pass
+
+
+def _leer_paginas(arbol, inicios):
+    for inicio in inicios:
+        for _ in islice(arbol.seek_posicion(arbol.rank(inicio)), TAMANIO_PAGINA):
+            pass
+
+
+def _ida_y_vuelta_json(arbol):
+    return type(arbol).from_dict(json.loads(json.dumps(arbol.to_dict(), separators=(',', ':'))))
+
+
+def _mejor(funcion, *args):
+    """Menor tiempo de REPETICIONES ejecuciones (reduce el ruido del sistema)"""
+    return min(medir(funcion, *args)[0] for _ in range(REPETICIONES))
+
+
+def _altas_y_bajas(clase, pares, t, nuevas):
+    """Segundos de insertar y luego eliminar las rutas nuevas sobre un árbol recién cargado"""
+    arbol = clase.bulk_load(pares, t=t)
+    seg_insertar, _ = medir(_insertar_todas, arbol, nuevas)
+    seg_eliminar, _ = medir(_eliminar_todas, arbol, nuevas)
+    return seg_insertar, seg_eliminar
+
+
+def medir_motor(clase, pares, t, consultas, nuevas, rangos, inicios):
+    """Retorna (altura, {carga: segundos}) para un motor"""
+    tiempos = {'bulk_load': _mejor(clase.bulk_load, pares, 1.0, t)}
+    arbol = clase.bulk_load(pares, t=t)
+    tiempos['buscar'] = _mejor(_buscar_todas, arbol, consultas)
+    altas_bajas = [_altas_y_bajas(clase, pares, t, nuevas) for _ in range(REPETICIONES)]
+    tiempos['insertar'] = min(insertar for insertar, _ in altas_bajas)
+    tiempos['eliminar'] = min(eliminar for _, eliminar in altas_bajas)
+    tiempos['recorrido'] = _mejor(_recorrer, arbol)
+    tiempos['rangos'] = _mejor(_recorrer_rangos, arbol, rangos)
+    tiempos['parcial'] = _mejor(arbol.buscar_parcial, "archivo_1")
+    tiempos['paginas'] = _mejor(_leer_paginas, arbol, inicios)
+    tiempos['json'] = _mejor(_ida_y_vuelta_json, arbol)
+    return arbol.altura(), tiempos
+
+
+def ejecutar(n=100000, t=64):
+    """Compara ambos motores y muestra el tiempo de cada carga"""
+    aleatorio = random.Random(11)
+    rutas = generar_rutas(n + n // 10)
+    existentes, nuevas = rutas[:n], rutas[n:]
+    pares = sorted((ruta, ruta) for ruta in existentes)
+    consultas = aleatorio.sample(existentes, min(n, 50000))
+    inicios = aleatorio.sample(existentes, min(n, PAGINAS))
+    # Rangos de unas 500 claves consecutivas
+    rangos = []
+    for _ in range(RANGOS):
+        inicio = aleatorio.randrange(max(1, n - 500))
+        rangos.append((pares[inicio][0], pares[min(n - 1, inicio + 500)][0]))
+
+    print(f"Motores del índice: {n} claves, t={t}, {len(consultas)} búsquedas, {len(nuevas)} altas/bajas, "
+          f"{RANGOS} rangos de ~500 claves, {len(inicios)} páginas de {TAMANIO_PAGINA}")
+    print(f"{'carga':>10} | {'Árbol B':>10} | {'Árbol B+':>10} | {'B / B+':>7}")
+    print("-" * 47)
+
+    altura_b, tiempos_b = medir_motor(BTree, pares, t, consultas, nuevas, rangos, inicios)
+    altura_bmas, tiempos_bmas = medir_motor(BPlusTree, pares, t, consultas, nuevas, rangos, inicios)
+    for carga in tiempos_b:
+        antes, despues = tiempos_b[carga], tiempos_bmas[carga]
+        print(f"{carga:>10} | {antes * 1000:>7.1f} ms | {despues * 1000:>7.1f} ms | {antes / despues:>6.2f}x")
+    print(f"{'altura':>10} | {altura_b:>10} | {altura_bmas:>10} |")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 64)
@@ -0,0 +1,116 @@
+"""
+Índice global en un solo archivo contra particionado por unidad (un archivo y
+un diario por unidad). Mide lo que se escribe al hacer checkpoint después de
+un cambio en D:, la carga de las particiones en secuencia contra en un pool de
+hilos, y cuánto agrega a las búsquedas mezclar los resultados de cada unidad.
+
+La carga binaria es casi toda E/S y mmap; reproducir diarios y recorrer los
+árboles es CPU en Python, y ahí el GIL limita lo que gana el pool de hilos.
+
+Uso:
+    python -m benchmarks.bench_particiones [n_archivos]
+"""
+import os
+import sys
+import tempfile
+from itertools import islice
+from indice_global import IndiceGlobal
+from indice_particionado import IndiceParticionado
+from sistema import Archivo
+from benchmarks.bench_reconstruccion import generar_archivos_con_ruta
+from benchmarks.utilidades import UNIDADES, medir
+
+GRADO = 64
+PAGINA = 50
+REPETICIONES = 20
+
+
+def _checkpoint_tras_cambio(indice, archivo):
+    """Un alta en D: y un guardado que reescribe lo que cambió (sin diario); retorna los bytes escritos"""
+    antes = {nombre: os.path.getmtime(os.path.join(os.path.dirname(archivo), nombre))
+             for nombre in os.listdir(os.path.dirname(archivo))}
+    indice.insertar_archivo(Archivo("nuevo", "Contenido nuevo"), "D::/Nuevos")
+    indice.guardar_indice(archivo)
+    escritos = 0
+    for nombre in os.listdir(os.path.dirname(archivo)):
+        ruta = os.path.join(os.path.dirname(archivo), nombre)
+        if antes.get(nombre) != os.path.getmtime(ruta):
+            escritos += os.path.getsize(ruta)
+    return escritos
+
+
+def _cargar_en_secuencia(archivo):
+    indice = IndiceParticionado(GRADO, unidades=UNIDADES)
+    for unidad, particion in indice._ordenadas():
+        particion.cargar_indice(indice._archivo_particion(archivo, unidad))
+    return indice
+
+
+def _cargar_en_paralelo(archivo):
+    indice = IndiceParticionado(GRADO, unidades=UNIDADES)
+    indice.cargar_indice(archivo)
+    return indice
+
+
+def _recorrer(indice, en_paralelo):
+    """Primer recorrido completo de cada partición (lee todas las páginas del archivo)"""
+    contar = lambda particion: sum(1 for _ in particion.arbol_b.seek())
+    particiones = list(indice.particiones.values())
+    return indice._en_paralelo(contar, particiones) if en_paralelo else [contar(p) for p in particiones]
+
+
+def _pagina(resultados):
+    return list(islice(resultados, PAGINA))
+
+
+def ejecutar(n=100000):
+    """Compara guardado, carga y búsquedas del índice en un archivo y particionado"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    print(f"Índice global: {n} archivos en {len(UNIDADES)} unidades, t={GRADO}")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        unico = IndiceGlobal(GRADO)
+        unico.reconstruir(archivos_con_ruta)
+        particionado = IndiceParticionado(GRADO, unidades=UNIDADES)
+        particionado.reconstruir(archivos_con_ruta)
+        
+        print(f"\n{'checkpoint tras un cambio en D:':>32} | {'tiempo':>9} | {'escrito':>9}")
+        print("-" * 58)
+        for nombre, indice in (("un archivo", unico), ("particionado", particionado)):
+            os.makedirs(os.path.join(directorio, nombre))
+            archivo = os.path.join(directorio, nombre, "indice_global.idx")
+            indice.guardar_indice(archivo)
+            indice.max_registros_diario = 0  # Cada guardado reescribe el archivo (checkpoint)
+            segundos, escritos = medir(_checkpoint_tras_cambio, indice, archivo)
+            print(f"{nombre:>32} | {segundos * 1000:>6.1f} ms | {escritos / 1024:>6.0f} KB")
+        
+        archivo = os.path.join(directorio, "particionado", "indice_global.idx")
+        print(f"\n{'carga de las particiones':>32} | {'cargar':>9} | {'+ recorrer':>10}")
+        print("-" * 58)
+        for nombre, cargar, en_paralelo in (("en secuencia", _cargar_en_secuencia, False),
+                                            ("pool de hilos", _cargar_en_paralelo, True)):
+            seg_carga, cargado = medir(cargar, archivo)
+            seg_recorrido, cantidades = medir(_recorrer, cargado, en_paralelo)
+            assert sum(cantidades) == unico.arbol_b.contar()
+            print(f"{nombre:>32} | {seg_carga * 1000:>6.1f} ms | {seg_recorrido * 1000:>7.1f} ms")
+        
+        print(f"\n{f'primera página ({PAGINA})':>32} | {'un archivo':>10} | {'particionado':>12}")
+        print("-" * 62)
+        busquedas = (
+            ("parcial 'archivo_1'", lambda indice: indice.buscar_parcial("archivo_1")),
+            ("rango de tamaño", lambda indice: indice.buscar_por_rango_tamanio(0, 1)),
+            ("carpeta D::/Fotos", lambda indice: indice.buscar_por_carpeta("D::/Fotos")),
+            ("contenido 'contenido'", lambda indice: indice.buscar_por_contenido("contenido", PAGINA)),
+        )
+        for nombre, buscar in busquedas:
+            tiempos = []
+            for indice in (unico, particionado):
+                esperado = _pagina(buscar(indice))  # También construye los índices secundarios
+                segundos, pagina = medir(lambda: [_pagina(buscar(indice)) for _ in range(REPETICIONES)])
+                assert pagina[0] == esperado
+                tiempos.append(segundos / REPETICIONES)
+            print(f"{nombre:>32} | {tiempos[0] * 1000:>7.2f} ms | {tiempos[1] * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
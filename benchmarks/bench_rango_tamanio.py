@@ -0,0 +1,57 @@
+"""
+Benchmark de index search -range: recorrido completo del árbol por ruta
+(BTree.buscar_por_rango) contra el índice secundario por tamaño de IndiceGlobal.
+
+Uso:
+    python -m benchmarks.bench_rango_tamanio [n_archivos]
+"""
+import random
+import sys
+from indice_global import IndiceGlobal
+from sistema import Archivo
+from benchmarks.utilidades import generar_rutas, medir
+
+# Rangos en KB de selectividad decreciente
+RANGOS = [(0, 64), (10, 12), (20, 20.5), (31, 31.01)]
+REPETICIONES = 20
+
+
+def construir_indice(n):
+    """Construye un índice con archivos de tamaños entre 0 y 64 KB"""
+    aleatorio = random.Random(7)
+    archivos_con_ruta = []
+    for ruta in generar_rutas(n):
+        carpeta, nombre_completo = ruta.rsplit('/', 1)
+        nombre, extension = nombre_completo.rsplit('.', 1)
+        contenido = "x" * aleatorio.randint(0, 64 * 1024)
+        archivos_con_ruta.append({'archivo': Archivo(nombre, contenido, extension), 'ruta': carpeta})
+    
+    indice = IndiceGlobal()
+    indice.reconstruir(archivos_con_ruta)
+    return indice
+
+
+def _repetir(funcion, *args):
+    for _ in range(REPETICIONES):
+        resultado = list(funcion(*args))
+    return resultado
+
+
+def ejecutar(n=100000):
+    """Compara ambas estrategias para rangos de distinta selectividad"""
+    indice = construir_indice(n)
+    print(f"index search -range: {n} archivos, {REPETICIONES} repeticiones por rango")
+    print(f"{'rango KB':>14} | {'resultados':>10} | {'recorrido':>12} | {'índice':>12}")
+    print("-" * 58)
+    
+    for min_kb, max_kb in RANGOS:
+        seg_recorrido, esperado = medir(_repetir, indice.arbol_b.buscar_por_rango, min_kb, max_kb, 'tamanio')
+        seg_indice, obtenido = medir(_repetir, indice.buscar_por_rango_tamanio, min_kb, max_kb)
+        assert len(esperado) == len(obtenido)
+        
+        print(f"{f'{min_kb}-{max_kb}':>14} | {len(obtenido):>10} | "
+              f"{seg_recorrido / REPETICIONES * 1000:>9.2f} ms | {seg_indice / REPETICIONES * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,57 @@
+"""
+Benchmark de reconstrucción del índice global al iniciar:
+inserción archivo por archivo (bucle anterior) contra IndiceGlobal.reconstruir
+(ordenamiento único + carga masiva del Árbol B).
+
+Uso:
+    python -m benchmarks.bench_reconstruccion [n_archivos]
+"""
+import sys
+from indice_global import IndiceGlobal
+from sistema import Archivo
+from benchmarks.utilidades import generar_rutas, medir
+
+
+def generar_archivos_con_ruta(n, profundidad=4):
+    """Genera la misma estructura que SistemaArchivos.obtener_todos_archivos_con_ruta"""
+    archivos_con_ruta = []
+    for ruta in generar_rutas(n, profundidad=profundidad):
+        carpeta, nombre_completo = ruta.rsplit('/', 1)
+        nombre, extension = nombre_completo.rsplit('.', 1)
+        archivo = Archivo(nombre, f"Contenido de {nombre}", extension)
+        archivos_con_ruta.append({'archivo': archivo, 'ruta': carpeta})
+    return archivos_con_ruta
+
+
+def _reconstruir_con_bucle(archivos_con_ruta):
+    indice = IndiceGlobal()
+    for item in archivos_con_ruta:
+        indice.insertar_archivo(item['archivo'], item['ruta'])
+    return indice
+
+
+def _reconstruir_masivo(archivos_con_ruta):
+    indice = IndiceGlobal()
+    indice.reconstruir(archivos_con_ruta)
+    return indice
+
+
+def ejecutar(n=100000):
+    """Compara ambas estrategias de reconstrucción"""
+    archivos_con_ruta = generar_archivos_con_ruta(n)
+    
+    seg_bucle, indice_bucle = medir(_reconstruir_con_bucle, archivos_con_ruta)
+    seg_masivo, indice_masivo = medir(_reconstruir_masivo, archivos_con_ruta)
+    
+    total_bucle = indice_bucle.obtener_estadisticas()['total_archivos']
+    total_masivo = indice_masivo.obtener_estadisticas()['total_archivos']
+    assert total_bucle == total_masivo == n
+    
+    print(f"Reconstrucción del índice global: {n} archivos")
+    print(f"  insertar_archivo en bucle: {seg_bucle * 1000:10.1f} ms")
+    print(f"  reconstruir (bulk load):   {seg_masivo * 1000:10.1f} ms")
+    print(f"  aceleración:               {seg_bucle / seg_masivo:10.1f}x")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
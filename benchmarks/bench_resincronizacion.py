@@ -0,0 +1,116 @@
+"""
+Arranque cuando el índice guardado quedó atrás del backup (por ejemplo, la
+consola se cerró antes de que el escritor guardara los últimos cambios):
+reconstruir el índice completo contra resincronizar comparando los digests
+Merkle por carpeta y reindexando sólo las carpetas que cambiaron. También
+mide cuánto agregan los digests a cada backup (obtener_estructura_completa).
+
+Uso:
+    python -m benchmarks.bench_resincronizacion [n_archivos]
+"""
+import os
+import random
+import sys
+import tempfile
+from indice_global import IndiceGlobal
+from sistema import SistemaArchivos, Carpeta
+from benchmarks.utilidades import generar_rutas, medir
+
+GRADO = 64
+ARCHIVOS_NUEVOS = 10
+ARCHIVOS_MODIFICADOS = 5
+
+
+def construir_sistema(n):
+    """SistemaArchivos con los archivos de generar_rutas (los nombres repetidos en una carpeta se omiten)"""
+    sistema = SistemaArchivos()
+    carpetas = {}
+    for ruta in generar_rutas(n):
+        unidad_nombre, resto = ruta.split(':/', 1)
+        *partes, nombre_completo = resto.split('/')
+        nombre, extension = nombre_completo.rsplit('.', 1)
+        unidad = sistema.unidades.obtener_unidad(unidad_nombre)
+        ruta_carpeta = f"{unidad_nombre}:/{'/'.join(partes)}"
+        carpeta = carpetas.get(ruta_carpeta)
+        if carpeta is None:
+            carpeta = unidad.arbol_directorios.raiz.dato
+            for parte in partes:
+                carpeta = carpeta.buscar_carpeta(parte) or unidad.crear_carpeta(parte, carpeta)
+            carpetas[ruta_carpeta] = carpeta
+        if not carpeta.buscar_archivo(nombre):
+            unidad.crear_archivo(nombre, f"Contenido de {nombre}", carpeta).extension = extension
+    return sistema, list(carpetas.values())
+
+
+def _calcular_digests(data):
+    """Recalcula el digest de cada carpeta de una estructura serializada (su costo dentro de to_dict)"""
+    for subcarpeta_data in data.get('subcarpetas', []):
+        _calcular_digests(subcarpeta_data)
+    if 'archivos' in data:
+        Carpeta.calcular_digest(data['archivos'], data['subcarpetas'])
+    for unidad_data in data.get('unidades', []):
+        _calcular_digests(unidad_data['estructura'])
+
+
+def _reconstruir(archivos_con_ruta, archivo):
+    indice = IndiceGlobal(GRADO)
+    indice.reconstruir(archivos_con_ruta)
+    indice.guardar_indice(archivo)
+    return indice
+
+
+def _resincronizar(digests, archivos_con_ruta, archivo):
+    indice = IndiceGlobal(GRADO)
+    indice.cargar_indice(archivo)
+    carpetas = indice.resincronizar(digests, archivos_con_ruta)
+    indice.sellar_generacion("g2", digests)
+    indice.guardar_indice(archivo)
+    indice.indexar_contenido(archivos_con_ruta)
+    return indice, carpetas
+
+
+def ejecutar(n=100000):
+    """Modifica una carpeta después de sellar el índice y compara ambas formas de ponerlo al día"""
+    sistema, carpetas = construir_sistema(n)
+    segundos_backup, estructura = medir(sistema.obtener_estructura_completa)
+    segundos_digests, _ = medir(_calcular_digests, estructura)
+    
+    archivos_con_ruta = sistema.obtener_todos_archivos_con_ruta()
+    print(f"Índice global: {len(archivos_con_ruta)} archivos en {len(sistema.digests_carpetas)} carpetas, t={GRADO}")
+    print(f"Estructura para el backup: {segundos_backup * 1000:.0f} ms, "
+          f"de los cuales {segundos_digests * 1000:.0f} ms son los digests")
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "indice_global.idx")
+        indice = IndiceGlobal(GRADO)
+        indice.reconstruir(archivos_con_ruta)
+        indice.sellar_generacion("g1", sistema.digests_carpetas)
+        indice.guardar_indice(archivo)
+        del indice
+        
+        # Cambios en una carpeta que el índice guardado no llegó a ver
+        aleatorio = random.Random(3)
+        carpeta = aleatorio.choice([c for c in carpetas if c.listar_archivos()])
+        unidad = sistema.unidades.obtener_unidad(carpeta.ruta_completa.split(':/', 1)[0])
+        for i in range(ARCHIVOS_NUEVOS):
+            unidad.crear_archivo(f"nuevo_{i}", f"Contenido nuevo {i}", carpeta)
+        for archivo_modificado in carpeta.listar_archivos()[:ARCHIVOS_MODIFICADOS]:
+            archivo_modificado.actualizar_contenido("Contenido modificado")
+        sistema.obtener_estructura_completa()
+        archivos_con_ruta = sistema.obtener_todos_archivos_con_ruta()
+        print(f"Cambios: {ARCHIVOS_NUEVOS} archivos nuevos y {ARCHIVOS_MODIFICADOS} modificados en {carpeta.ruta_completa}\n")
+        
+        seg_resincronizar, (resincronizado, reindexadas) = medir(
+            _resincronizar, sistema.digests_carpetas, archivos_con_ruta, archivo)
+        seg_reconstruir, reconstruido = medir(_reconstruir, archivos_con_ruta, archivo)
+        assert ([(c, v.a_lista()) for c, v in resincronizado.arbol_b.seek()]
+                == [(c, v.a_lista()) for c, v in reconstruido.arbol_b.seek()])
+        
+        print(f"{'reconstruir todo':>18}: {seg_reconstruir * 1000:>8.1f} ms")
+        print(f"{'resincronizar':>18}: {seg_resincronizar * 1000:>8.1f} ms ({reindexadas} carpetas reindexadas, "
+              f"incluye llenar el índice de contenido)")
+        print(f"\nPoner el índice al día: {seg_reconstruir / seg_resincronizar:.1f}x más rápido")
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,40 @@
+"""
+Utilidades comunes para los benchmarks: datos sintéticos y medición de tiempos
+"""
+import random
+import time
+
+UNIDADES = ["C:", "D:", "F:"]
+CARPETAS = ["Documentos", "Proyectos", "Fotos", "Backup", "Musica", "Videos",
+            "Trabajo", "Personal", "Clases", "Descargas"]
+EXTENSIONES = ["txt", "md", "py", "json", "csv"]
+
+
+def generar_rutas(n, semilla=42, profundidad=4):
+    """Genera n rutas completas de archivo únicas con formato del índice global"""
+    aleatorio = random.Random(semilla)
+    rutas = set()
+    while len(rutas) < n:
+        unidad = aleatorio.choice(UNIDADES)
+        carpetas = [aleatorio.choice(CARPETAS) for _ in range(aleatorio.randint(1, profundidad))]
+        nombre = f"archivo_{aleatorio.randrange(n * 10)}"
+        extension = aleatorio.choice(EXTENSIONES)
+        rutas.add(f"{unidad}:/{'/'.join(carpetas)}/{nombre}.{extension}")
+    
+    rutas = list(rutas)
+    aleatorio.shuffle(rutas)
+    return rutas
+
+
+def medir(funcion, *args, **kwargs):
+    """Ejecuta una función y retorna (segundos, resultado)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*args, **kwargs)
+    return time.perf_counter() - inicio, resultado
+
+
+def formatear_tasa(operaciones, segundos):
+    """Formatea operaciones por segundo"""
+    if segundos <= 0:
+        return "inf ops/s"
+    return f"{operaciones / segundos:,.0f} ops/s"
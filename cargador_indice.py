@@ -0,0 +1,49 @@
+"""
+Módulo para cargar el índice global en segundo plano: el hilo arranca junto con
+la consola y sólo los comandos que usan el índice esperan a que termine
+"""
+import threading
+import time
+
+
+class CargadorIndice:
+    """
+    Ejecuta 'construir' (carga o reconstrucción del índice) en un hilo aparte.
+    obtener() retorna el índice, esperando la primera vez si el hilo no terminó.
+    """
+    
+    def __init__(self, construir):
+        self.construir = construir  # Función sin argumentos que retorna el índice listo para usar
+        self._indice = None
+        self._error = None
+        self._inicio = time.perf_counter()
+        self.segundos_carga = None  # Duración de la carga en el hilo
+        self.segundos_espera = 0.0  # Tiempo que los comandos esperaron al hilo
+        self._hilo = threading.Thread(target=self._ejecutar, name="CargadorIndice", daemon=True)
+        self._hilo.start()
+    
+    def _ejecutar(self):
+        try:
+            self._indice = self.construir()
+        except Exception as e:
+            self._error = e
+        self.segundos_carga = time.perf_counter() - self._inicio
+    
+    @property
+    def listo(self):
+        """Indica si el índice ya está disponible sin esperar"""
+        return not self._hilo.is_alive()
+    
+    def esperar(self):
+        """Espera a que el hilo termine (sin lanzar el error de la carga, si lo hubo)"""
+        if self._hilo.is_alive():
+            inicio = time.perf_counter()
+            self._hilo.join()
+            self.segundos_espera += time.perf_counter() - inicio
+    
+    def obtener(self):
+        """Índice cargado; si el hilo sigue trabajando, espera a que termine"""
+        self.esperar()
+        if self._error is not None:
+            raise self._error
+        return self._indice
@@ -89,8 +89,14 @@ class ComandoTYPE(Comando):
             
             if archivo_existente:
                 # El archivo existe, actualizarlo
+                ruta_vieja = f"{directorio_actual.ruta_completa}/{archivo_existente.nombre}.{archivo_existente.extension}"
                 archivo_existente.actualizar_contenido(contenido)
                 archivo_existente.extension = extension
+                directorio_actual.marcar_modificada()
+                
+                # Actualizar en índice global (tamaño y fecha de modificación cambiaron)
+                if indice_global:
+                    indice_global.actualizar_archivo(ruta_vieja, archivo_existente, directorio_actual.ruta_completa)
                 
                 logger.registrar_operacion(f"type {argumentos}", f"Archivo actualizado: {nombre_archivo_completo}")
                 
@@ -272,6 +278,7 @@ class ComandoRENAME(Comando):
             archivo.nombre = nombre_base_nuevo
             if ext_nuevo:
                 archivo.extension = ext_nuevo
+            directorio_actual.marcar_modificada()
             
             # Nueva ruta
             ruta_nueva = f"{directorio_actual.ruta_completa}/{archivo.nombre}.{archivo.extension}"
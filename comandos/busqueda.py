@@ -1,8 +1,21 @@
 """
 Módulo que implementa el comando INDEX para búsquedas en índice global
 """
+from datetime import datetime, timedelta
 from .base import Comando
 
+# Opciones de búsqueda por fecha -> campo de fecha del índice global
+OPCIONES_FECHA = {
+    '-created': 'creacion',
+    '-modified': 'modificacion'
+}
+
+# Resultados por página cuando no se indica --limit
+TAMANIO_PAGINA = 50
+
+# Cantidad de resultados por defecto en búsquedas por contenido (top-k)
+K_CONTENIDO = 10
+
 
 class ComandoINDEX(Comando):
     """Nuevo comando para búsquedas en índice global (Árbol B)"""
@@ -33,6 +46,68 @@ class ComandoINDEX(Comando):
         
         return True, (min_val, max_val)
     
+    def _validar_rango_fechas(self, rango_str):
+        """
+        Valida un rango de fechas desde..hasta (AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS).
+        Cualquiera de los extremos puede omitirse. Retorna timestamps epoch inclusivos.
+        """
+        if '..' not in rango_str:
+            return False, "El rango de fechas debe tener formato desde..hasta (ej: 2025-01-01..2025-12-31)"
+        
+        desde_str, hasta_str = rango_str.split('..', 1)
+        if not desde_str and not hasta_str:
+            return False, "El rango de fechas necesita al menos un extremo"
+        
+        try:
+            desde = datetime.fromisoformat(desde_str).timestamp() if desde_str else None
+            hasta = None
+            if hasta_str:
+                fecha_hasta = datetime.fromisoformat(hasta_str)
+                # Una fecha sin hora incluye el día completo
+                if len(hasta_str) == 10:
+                    fecha_hasta += timedelta(days=1) - timedelta(microseconds=1)
+                hasta = fecha_hasta.timestamp()
+        except ValueError:
+            return False, "Las fechas deben tener formato AAAA-MM-DD o AAAA-MM-DDTHH:MM:SS"
+        
+        if desde is not None and hasta is not None and desde > hasta:
+            return False, f"Error: La fecha inicial ({desde_str}) no puede ser posterior a la final ({hasta_str})"
+        
+        return True, (desde, hasta)
+    
+    def _extraer_opcion_entera(self, partes, nombre, minimo=0):
+        """
+        Extrae una opción numérica (ej: -limit 10 o --limit 10) de la lista de partes.
+        Retorna (valor, error); quita la opción y su valor de partes. Un valor menor
+        que minimo es un error de uso.
+        """
+        for opcion in (f"-{nombre}", f"--{nombre}"):
+            if opcion not in partes:
+                continue
+            
+            idx = partes.index(opcion)
+            if len(partes) <= idx + 1:
+                return None, f"Error: {opcion} requiere un número entero"
+            
+            try:
+                valor = int(partes[idx + 1])
+            except ValueError:
+                return None, f"Error: {opcion} requiere un número entero"
+            
+            if valor < minimo:
+                return None, f"Error: {opcion} debe ser mayor o igual a {minimo}"
+            
+            del partes[idx:idx + 2]
+            return valor, None
+        
+        return None, None
+    
+    def _mostrar_pagina(self, indice, logger, operacion, descripcion, resultados, paginacion):
+        """Muestra una página de resultados (consumiendo el generador sólo hasta el límite) y la registra"""
+        desplazamiento, limite, pagina = paginacion
+        logger.registrar_operacion(operacion, f"{descripcion} (desde resultado {desplazamiento + 1})")
+        return indice.mostrar_resultados(resultados, desplazamiento, limite, pagina)
+    
     def ejecutar(self, sistema, logger, config, indice_global, argumentos=None):
         try:
             if not config.comando_habilitado('index'):
@@ -45,10 +120,20 @@ class ComandoINDEX(Comando):
                 return "Uso: index search <texto>\n" + \
                        "       index search -file <nombre>\n" + \
                        "       index search -range <min>-<max>\n" + \
-                       "       index search -file <nombre> -range <min>-<max>"
+                       "       index search -file <nombre> -range <min>-<max>\n" + \
+                       "       index search -path <carpeta>\n" + \
+                       "       index search -name <nombre.extension>\n" + \
+                       "       index search -content <términos>\n" + \
+                       "       index search -created <desde>..<hasta>\n" + \
+                       "       index search -modified <desde>..<hasta>\n" + \
+                       "       index export [archivo.json]\n" + \
+                       "Opciones de paginación: --offset <n> --limit <m> --page <p>"
+            
+            if argumentos.lower().startswith('export'):
+                return self._exportar(argumentos, indice_global, logger, config)
             
             if not argumentos.lower().startswith('search'):
-                return "Error: Comando INDEX solo soporta 'search'"
+                return "Error: Comando INDEX solo soporta 'search' y 'export'"
             
             return self._procesar_busqueda(argumentos, indice_global, logger)
             
@@ -56,25 +141,110 @@ class ComandoINDEX(Comando):
             logger.registrar_error(f"index {argumentos}", str(e))
             return f"Error en búsqueda de índice: {e}"
     
+    def _exportar(self, argumentos, indice, logger, config):
+        """Exporta el índice a JSON (por defecto al archivo 'indice_global_archivo' de la configuración)"""
+        partes = argumentos.split(maxsplit=1)
+        archivo = partes[1].strip() if len(partes) > 1 else config.config.get('indice_global_archivo', indice.ARCHIVO_JSON)
+        if not indice.exportar_json(archivo):
+            return f"Error: No se pudo exportar el índice a {archivo}"
+        
+        logger.registrar_operacion(f"index {argumentos}", f"Índice exportado a {archivo}")
+        return f"Índice exportado a {archivo} ({indice.obtener_estadisticas()['total_archivos']} archivos)"
+    
     def _procesar_busqueda(self, argumentos, indice, logger):
         """Procesa diferentes tipos de búsqueda en el índice"""
         partes = argumentos.split()
         
+        # Paginación común: [--offset <n>] [--limit <m>] [--page <p>]
+        limite, error = self._extraer_opcion_entera(partes, 'limit', minimo=1)
+        if error:
+            return error
+        
+        desplazamiento, error = self._extraer_opcion_entera(partes, 'offset')
+        if error:
+            return error
+        desplazamiento = desplazamiento or 0
+        
+        pagina, error = self._extraer_opcion_entera(partes, 'page', minimo=1)
+        if error:
+            return error
+        
+        if limite is not None:
+            tamanio_pagina = limite
+        else:
+            tamanio_pagina = K_CONTENIDO if '-content' in partes else TAMANIO_PAGINA
+        if pagina:
+            desplazamiento += (pagina - 1) * tamanio_pagina
+        paginacion = (desplazamiento, tamanio_pagina, pagina)
+        
+        # index search -path <carpeta>
+        if '-path' in partes:
+            idx_path = partes.index('-path')
+            if len(partes) > idx_path + 1:
+                carpeta = partes[idx_path + 1]
+                resultados = indice.buscar_por_carpeta(carpeta, desplazamiento)
+                return self._mostrar_pagina(indice, logger, f"index search -path {carpeta}", "Búsqueda por carpeta",
+                                            resultados, paginacion)
+            else:
+                return "Error: -path requiere una ruta de carpeta"
+        
+        # index search -name <nombre.extension>
+        if '-name' in partes:
+            idx_name = partes.index('-name')
+            if len(partes) > idx_name + 1:
+                nombre = partes[idx_name + 1]
+                resultados = indice.buscar_por_nombre(nombre, desplazamiento)
+                return self._mostrar_pagina(indice, logger, f"index search -name {nombre}", "Búsqueda por nombre exacto",
+                                            resultados, paginacion)
+            else:
+                return "Error: -name requiere un nombre de archivo con extensión (ej: notas.txt)"
+        
+        # index search -content <términos>
+        if '-content' in partes:
+            idx_content = partes.index('-content')
+            terminos = ' '.join(partes[idx_content + 1:])
+            if not terminos:
+                return "Error: -content requiere uno o más términos a buscar"
+            
+            # Top-k por relevancia: se pide uno más para saber si hay otra página
+            resultados = indice.buscar_por_contenido(terminos, tamanio_pagina + 1, desplazamiento)
+            return self._mostrar_pagina(indice, logger, f"index search -content {terminos}", "Búsqueda en contenido",
+                                        resultados, paginacion)
+        
+        # index search -created|-modified <desde>..<hasta>
+        for opcion, campo in OPCIONES_FECHA.items():
+            if opcion not in partes:
+                continue
+            
+            idx_fecha = partes.index(opcion)
+            if len(partes) <= idx_fecha + 1:
+                return f"Error: {opcion} requiere un rango en formato desde..hasta (ej: 2025-01-01..2025-12-31)"
+            
+            rango = partes[idx_fecha + 1]
+            valido, resultado_validacion = self._validar_rango_fechas(rango)
+            if not valido:
+                return f"Error en rango de fechas: {resultado_validacion}"
+            
+            desde, hasta = resultado_validacion
+            resultados = indice.buscar_por_rango_fecha(campo, desde, hasta, desplazamiento)
+            return self._mostrar_pagina(indice, logger, f"index search {opcion} {rango}", "Búsqueda por fecha",
+                                        resultados, paginacion)
+        
         # index search <texto>
         if len(partes) == 2:
             texto = partes[1]
-            resultados = indice.buscar_parcial(texto)
-            logger.registrar_operacion(f"index search {texto}", f"Búsqueda parcial: {len(resultados)} resultados")
-            return indice.mostrar_resultados(resultados)
+            resultados = indice.buscar_parcial(texto, desplazamiento)
+            return self._mostrar_pagina(indice, logger, f"index search {texto}", "Búsqueda parcial",
+                                        resultados, paginacion)
         
         # index search -file <nombre>
         if '-file' in partes and '-range' not in partes:
             idx_file = partes.index('-file')
             if len(partes) > idx_file + 1:
                 nombre = partes[idx_file + 1]
-                resultados = indice.buscar_parcial(nombre)
-                logger.registrar_operacion(f"index search -file {nombre}", f"Búsqueda archivos: {len(resultados)} resultados")
-                return indice.mostrar_resultados(resultados)
+                resultados = indice.buscar_parcial(nombre, desplazamiento)
+                return self._mostrar_pagina(indice, logger, f"index search -file {nombre}", "Búsqueda archivos",
+                                            resultados, paginacion)
             else:
                 return "Error: -file requiere un nombre de archivo"
         
@@ -90,9 +260,9 @@ class ComandoINDEX(Comando):
                     return f"Error en rango: {resultado_validacion}"
                 
                 min_kb, max_kb = resultado_validacion
-                resultados = indice.buscar_por_rango_tamanio(min_kb, max_kb)
-                logger.registrar_operacion(f"index search -range {rango}", f"Búsqueda rango: {len(resultados)} resultados")
-                return indice.mostrar_resultados(resultados)
+                resultados = indice.buscar_por_rango_tamanio(min_kb, max_kb, desplazamiento)
+                return self._mostrar_pagina(indice, logger, f"index search -range {rango}", "Búsqueda rango",
+                                            resultados, paginacion)
             else:
                 return "Error: -range requiere un valor en formato min-max (ej: 0-100)"
         
@@ -111,10 +281,9 @@ class ComandoINDEX(Comando):
                     return f"Error en rango: {resultado_validacion}"
                 
                 min_kb, max_kb = resultado_validacion
-                resultados = indice.buscar_combinada(nombre, min_kb, max_kb)
-                logger.registrar_operacion(f"index search -file {nombre} -range {rango}", 
-                                         f"Búsqueda combinada: {len(resultados)} resultados")
-                return indice.mostrar_resultados(resultados)
+                resultados = indice.buscar_combinada(nombre, min_kb, max_kb, desplazamiento)
+                return self._mostrar_pagina(indice, logger, f"index search -file {nombre} -range {rango}",
+                                            "Búsqueda combinada", resultados, paginacion)
             else:
                 if len(partes) <= idx_file + 1:
                     return "Error: -file requiere un nombre de archivo"
@@ -125,5 +294,11 @@ class ComandoINDEX(Comando):
                "index search texto\n" + \
                "index search -file nombre\n" + \
                "index search -range min-max\n" + \
-               "index search -file nombre -range min-max"
+               "index search -file nombre -range min-max\n" + \
+               "index search -path carpeta\n" + \
+               "index search -name nombre.extension\n" + \
+               "index search -content términos\n" + \
+               "index search -created desde..hasta\n" + \
+               "index search -modified desde..hasta\n" + \
+               "Opciones de paginación: --offset n --limit m --page p"
 
@@ -3,8 +3,9 @@ Módulo de configuración del sistema
 """
 import json
 import os
-import shutil
+import uuid
 from datetime import datetime
+from sistema import Carpeta
 
 class Configuracion:
     """Maneja la configuración del sistema y backups"""
@@ -12,6 +13,14 @@ class Configuracion:
         self.archivo_config = archivo_config
         self.config = self._cargar_configuracion()
         self._crear_directorio_backups()
+        # Generación del último backup escrito en esta sesión (la sella también el índice global)
+        self.generacion_backup = None
+        # Cadena de backups actual: base completa, su generación y cuántos deltas tiene encima
+        self._base_backup = None
+        self._generacion_base = None
+        self._deltas_base = 0
+        # Digest de cada carpeta en el último backup escrito o cargado (ruta_completa -> digest)
+        self._digests_backup = {}
     
     def _cargar_configuracion(self):
         """Carga la configuración desde archivo o crea una por defecto"""
@@ -33,7 +42,12 @@ class Configuracion:
             },
             "api_key_cohere": "RsR6jdXJrR6xkRHuUcxOO9MieuYnKVbUQDOh2San",
             "unidades_por_defecto": ["C:", "D:", "F:"],
-            "grado_arbol_b": 3,
+            "grado_arbol_b": 64,
+            "motor_indice": "b",
+            "diario_indice_max_registros": 1000,
+            "diario_indice_max_bytes": 1048576,
+            "espera_guardado_indice": 1.0,
+            "backup_deltas_por_base": 50,
             "indice_global_archivo": "indice_global.json"
         }
         
@@ -69,28 +83,106 @@ class Configuracion:
         return f"{self.config['backup_dir']}/backup_{timestamp}.{formato}"
     
     def hacer_backup(self, datos):
-        """Realiza un backup de los datos"""
+        """
+        Realiza un backup de los datos, identificado con una generación nueva ('generacion').
+        Si hay una base completa con menos de backup_deltas_por_base deltas encima, sólo
+        escribe un delta con las carpetas cuyo digest cambió desde el último backup; si no,
+        escribe una base nueva con la estructura completa.
+        """
         if not self.config['backup_automatico']:
             return None
         
-        archivo_backup = self.generar_nombre_backup()
+        generacion = uuid.uuid4().hex
+        digests = self._recolectar_digests(datos)
         
         try:
-            with open(archivo_backup, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, indent=4, ensure_ascii=False)
-            
-            # También guardar un backup del índice global si existe
-            if os.path.exists("indice_global.json"):
-                # Obtener timestamp para usar en el nombre del backup del índice
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                backup_indice = f"{self.config['backup_dir']}/indice_global_{timestamp}.json"
-                shutil.copy2("indice_global.json", backup_indice)
-                
+            if (self._base_backup is None or not self._digests_backup
+                    or self._deltas_base >= self.obtener_deltas_por_base()):
+                archivo_backup = self._escribir_base(datos, generacion)
+            else:
+                archivo_backup = self._escribir_delta(datos, generacion)
+            self.generacion_backup = generacion
+            self._digests_backup = digests
             return archivo_backup
         except Exception as e:
             print(f"Error haciendo backup: {e}")
             return None
     
+    def _escribir_base(self, datos, generacion):
+        """Escribe un backup completo, que pasa a ser la base de los próximos deltas"""
+        archivo_backup = self.generar_nombre_backup()
+        with open(archivo_backup, 'w', encoding='utf-8') as f:
+            json.dump(dict(datos, generacion=generacion), f, indent=4, ensure_ascii=False)
+        self._base_backup = archivo_backup
+        self._generacion_base = generacion
+        self._deltas_base = 0
+        return archivo_backup
+    
+    def _prefijo_deltas(self, archivo_base):
+        """Prefijo de los deltas de una base (backups/backup_<fecha>.json -> delta_<fecha>_)"""
+        nombre = os.path.splitext(os.path.basename(archivo_base))[0]
+        return f"delta_{nombre[len('backup_'):]}_"
+    
+    def _escribir_delta(self, datos, generacion):
+        """
+        Escribe un delta sobre el último backup: por unidad, su directorio actual y las
+        carpetas cuyo digest cambió (ver _carpetas_cambiadas). Cada delta indica su base
+        y la generación anterior, así que al cargar sólo se aplica una cadena sin huecos.
+        """
+        unidades = []
+        for unidad_data in datos['unidades']:
+            unidad = {'nombre': unidad_data['nombre'], 'directorio_actual': unidad_data['directorio_actual']}
+            estructura = unidad_data['estructura']
+            if estructura and estructura['ruta_completa'] not in self._digests_backup:
+                # Unidad nueva: va completa
+                unidad['estructura'] = estructura
+            elif estructura:
+                unidad['carpetas'] = []
+                self._carpetas_cambiadas(estructura, unidad['carpetas'])
+            unidades.append(unidad)
+        
+        delta = {
+            'tipo': 'delta',
+            'base': self._generacion_base,
+            'anterior': self.generacion_backup,
+            'generacion': generacion,
+            'unidades': unidades,
+            'unidad_actual': datos['unidad_actual']
+        }
+        archivo_backup = os.path.join(self.config['backup_dir'],
+                                      f"{self._prefijo_deltas(self._base_backup)}{self._deltas_base + 1:05d}.json")
+        with open(archivo_backup, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+        self._deltas_base += 1
+        return archivo_backup
+    
+    def _carpetas_cambiadas(self, carpeta_data, cambios):
+        """
+        Agrega a cambios, de arriba hacia abajo, las carpetas cuyo digest difiere del
+        último backup. Como los digests son Merkle, un digest igual descarta todo el
+        subárbol. Cada carpeta va sin el detalle de las subcarpetas que ya existían
+        (sólo su ruta_completa, y las que cambiaron van aparte); las nuevas van completas.
+        """
+        if self._digests_backup.get(carpeta_data['ruta_completa']) == carpeta_data.get('digest'):
+            return
+        
+        existentes = [subcarpeta for subcarpeta in carpeta_data['subcarpetas']
+                      if subcarpeta['ruta_completa'] in self._digests_backup]
+        subcarpetas = [{'ruta_completa': subcarpeta['ruta_completa']}
+                       if subcarpeta['ruta_completa'] in self._digests_backup else subcarpeta
+                       for subcarpeta in carpeta_data['subcarpetas']]
+        cambios.append(dict(carpeta_data, subcarpetas=subcarpetas))
+        for subcarpeta in existentes:
+            self._carpetas_cambiadas(subcarpeta, cambios)
+    
+    def _recolectar_digests(self, datos):
+        """Digest de cada carpeta de una estructura serializada: ruta_completa -> digest"""
+        digests = {}
+        for unidad_data in datos.get('unidades', []):
+            if unidad_data['estructura']:
+                Carpeta.recolectar_digests(unidad_data['estructura'], digests)
+        return digests
+    
     def cargar_ultimo_backup(self):
         """Carga el último backup disponible"""
         backup_dir = self.config['backup_dir']
@@ -106,11 +198,83 @@ class Configuracion:
         
         try:
             with open(ultimo_backup, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                datos = json.load(f)
+            
+            self._base_backup = ultimo_backup
+            self._generacion_base = self.generacion_backup = datos.get('generacion')
+            self._deltas_base = self._aplicar_deltas(datos)
+            datos['generacion'] = self.generacion_backup
+            self._digests_backup = self._recolectar_digests(datos)
+            return datos
         except Exception as e:
             print(f"Error cargando backup: {e}")
             return None
     
+    def _aplicar_deltas(self, datos):
+        """
+        Aplica sobre la base cargada sus deltas, en orden, mientras formen una cadena
+        (cada uno sobre la generación del anterior); uno dañado o de otra base corta la
+        cadena. Retorna cuántos se aplicaron.
+        """
+        prefijo = self._prefijo_deltas(self._base_backup)
+        backup_dir = self.config['backup_dir']
+        deltas = sorted(f for f in os.listdir(backup_dir) if f.startswith(prefijo))
+        if not deltas or self._generacion_base is None:
+            return 0
+        
+        carpetas = {}
+        for unidad_data in datos['unidades']:
+            if unidad_data['estructura']:
+                self._indexar_carpetas(unidad_data['estructura'], carpetas)
+        
+        aplicados = 0
+        for nombre in deltas:
+            try:
+                with open(os.path.join(backup_dir, nombre), 'r', encoding='utf-8') as f:
+                    delta = json.load(f)
+            except (OSError, ValueError):
+                break
+            if delta.get('base') != self._generacion_base or delta.get('anterior') != self.generacion_backup:
+                break
+            self._aplicar_delta(datos, delta, carpetas)
+            self.generacion_backup = delta['generacion']
+            aplicados += 1
+        return aplicados
+    
+    def _indexar_carpetas(self, carpeta_data, carpetas):
+        """Agrega a carpetas cada carpeta de un subárbol serializado, por ruta_completa"""
+        carpetas[carpeta_data['ruta_completa']] = carpeta_data
+        for subcarpeta_data in carpeta_data['subcarpetas']:
+            self._indexar_carpetas(subcarpeta_data, carpetas)
+    
+    def _aplicar_delta(self, datos, delta, carpetas):
+        """Aplica un delta a la estructura serializada (carpetas: ruta_completa -> carpeta en datos)"""
+        anteriores = {unidad_data['nombre']: unidad_data for unidad_data in datos['unidades']}
+        unidades = []
+        for unidad_delta in delta['unidades']:
+            unidad_data = anteriores.get(unidad_delta['nombre'])
+            if 'estructura' in unidad_delta or unidad_data is None:
+                unidad_data = {'nombre': unidad_delta['nombre'], 'estructura': unidad_delta.get('estructura', {})}
+                if unidad_data['estructura']:
+                    self._indexar_carpetas(unidad_data['estructura'], carpetas)
+            unidad_data['directorio_actual'] = unidad_delta['directorio_actual']
+            
+            for registro in unidad_delta.get('carpetas', []):
+                subcarpetas = []
+                for subcarpeta in registro['subcarpetas']:
+                    if 'archivos' in subcarpeta:
+                        # Subcarpeta nueva, completa
+                        self._indexar_carpetas(subcarpeta, carpetas)
+                        subcarpetas.append(subcarpeta)
+                    else:
+                        subcarpetas.append(carpetas[subcarpeta['ruta_completa']])
+                # Se actualiza en su lugar: su carpeta padre ya la referencia
+                carpetas[registro['ruta_completa']].update(registro, subcarpetas=subcarpetas)
+            unidades.append(unidad_data)
+        
+        datos['unidades'] = unidades
+        datos['unidad_actual'] = delta['unidad_actual']
+    
     def comando_habilitado(self, comando):
         """Verifica si un comando está habilitado"""
         return self.config['comandos_habilitados'].get(comando, False)
@@ -125,5 +289,42 @@ class Configuracion:
         return self.config.get('unidades_por_defecto', ["C:", "D:", "F:"])
     
     def obtener_grado_arbol_b(self):
-        """Obtiene el grado del árbol B"""
-        return self.config.get('grado_arbol_b', 3)
\ No newline at end of file
+        """Obtiene el grado del árbol B (un valor inválido usa el grado por defecto)"""
+        grado = self.config.get('grado_arbol_b', 64)
+        if not isinstance(grado, int) or grado < 2:
+            return 64
+        return grado
+    
+    def obtener_motor_indice(self):
+        """Obtiene el motor del índice global: "b" (Árbol B) o "b+" (Árbol B+)"""
+        motor = self.config.get('motor_indice', "b")
+        if motor not in ("b", "b+"):
+            return "b"
+        return motor
+    
+    def obtener_limites_diario_indice(self):
+        """
+        Obtiene (registros, bytes) que puede acumular el diario del índice global
+        antes de reescribir el índice completo (un valor inválido usa el de por defecto)
+        """
+        registros = self.config.get('diario_indice_max_registros', 1000)
+        if not isinstance(registros, int) or registros < 0:
+            registros = 1000
+        max_bytes = self.config.get('diario_indice_max_bytes', 1048576)
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            max_bytes = 1048576
+        return registros, max_bytes
+    
+    def obtener_deltas_por_base(self):
+        """Cantidad de backups delta entre dos backups completos (base)"""
+        deltas = self.config.get('backup_deltas_por_base', 50)
+        if not isinstance(deltas, int) or deltas < 0:
+            return 50
+        return deltas
+    
+    def obtener_espera_guardado_indice(self):
+        """Segundos sin cambios que espera el guardado en segundo plano del índice global"""
+        espera = self.config.get('espera_guardado_indice', 1.0)
+        if not isinstance(espera, (int, float)) or espera < 0:
+            return 1.0
+        return espera
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Módulo para guardar el índice global en segundo plano: agrupa cada ráfaga de
+cambios en un solo guardado cuando pasan 'espera' segundos sin cambios nuevos
+"""
+import threading
+import time
+
+
+class EscritorIndice:
+    """
+    Hilo escritor del índice global con retardo (debounce). Quien modifica el
+    índice lo hace con 'bloqueo' tomado y llama a marcar_cambios; el hilo guarda
+    (también con 'bloqueo' tomado) cuando los cambios dejan de llegar.
+    """
+    
+    # Segundos antes de reintentar un guardado que falló
+    REINTENTO = 1.0
+    
+    def __init__(self, guardar, espera=1.0, logger=None):
+        self.guardar = guardar  # Función sin argumentos que persiste el índice; retorna True si pudo
+        self.espera = espera  # Segundos sin cambios antes de guardar
+        self.logger = logger
+        self.bloqueo = threading.RLock()
+        self._condicion = threading.Condition()
+        self._cambios = 0  # Cambios marcados y aún no guardados
+        self._ultimo_cambio = 0.0
+        self._detenido = False
+        # Métricas
+        self.guardados = 0
+        self.cambios_guardados = 0
+        self.errores = 0
+        self._latencia_total = 0.0
+        self._latencia_maxima = 0.0
+        self._ultima_latencia = 0.0
+        self._hilo = threading.Thread(target=self._ejecutar, name="EscritorIndice", daemon=True)
+        self._hilo.start()
+    
+    def marcar_cambios(self, cantidad=1):
+        """Avisa que el índice cambió; el guardado se posterga hasta que pase 'espera' sin cambios"""
+        with self._condicion:
+            self._cambios += cantidad
+            self._ultimo_cambio = time.monotonic()
+            self._condicion.notify()
+    
+    def _ejecutar(self):
+        """Bucle del hilo: espera cambios, deja pasar el período de calma y guarda"""
+        while True:
+            with self._condicion:
+                while not self._detenido and not self._cambios:
+                    self._condicion.wait()
+                if self._detenido:
+                    return
+                
+                restante = self._ultimo_cambio + self.espera - time.monotonic()
+                if restante > 0:
+                    self._condicion.wait(restante)
+                    continue
+            
+            self.vaciar(en_segundo_plano=True)
+    
+    def vaciar(self, en_segundo_plano=False):
+        """
+        Guarda ya los cambios pendientes (si los hay). Si el hilo está guardando,
+        espera a que termine. Retorna False sólo si el guardado falló.
+        """
+        with self.bloqueo:
+            with self._condicion:
+                cambios, self._cambios = self._cambios, 0
+            if not cambios:
+                return True
+            
+            inicio = time.perf_counter()
+            try:
+                exito = self.guardar()
+            except Exception as e:
+                print(f"Error guardando índice: {e}")
+                exito = False
+            latencia = time.perf_counter() - inicio
+        
+        self._registrar_guardado(cambios, latencia, exito, en_segundo_plano)
+        return exito
+    
+    def _registrar_guardado(self, cambios, latencia, exito, en_segundo_plano):
+        """Actualiza las métricas y deja constancia del guardado en el log"""
+        if not exito:
+            self.errores += 1
+            # Los cambios siguen pendientes: se reintenta más tarde (o al salir)
+            with self._condicion:
+                self._cambios += cambios
+                self._ultimo_cambio = time.monotonic() + self.REINTENTO
+            if self.logger:
+                self.logger.registrar_error("Guardado índice global", f"{cambios} cambios sin guardar")
+            return
+        
+        self.guardados += 1
+        self.cambios_guardados += cambios
+        self._latencia_total += latencia
+        self._latencia_maxima = max(self._latencia_maxima, latencia)
+        self._ultima_latencia = latencia
+        if self.logger and en_segundo_plano:
+            self.logger.registrar_operacion("Guardado índice global",
+                                            f"{latencia * 1000:.1f} ms, {cambios} cambios en un guardado")
+    
+    def detener(self):
+        """Detiene el hilo (esperando el guardado en curso) y guarda lo pendiente; retorna las métricas"""
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+        self._hilo.join()
+        self.vaciar()
+        return self.obtener_metricas()
+    
+    def obtener_metricas(self):
+        """Métricas de monitoreo: guardados, cambios agrupados y latencia de guardado"""
+        with self._condicion:
+            pendientes = self._cambios
+        return {
+            'guardados': self.guardados,
+            'cambios_guardados': self.cambios_guardados,
+            # Guardados que se ahorraron al agrupar ráfagas de cambios
+            'cambios_agrupados': self.cambios_guardados - self.guardados,
+            'cambios_pendientes': pendientes,
+            'errores': self.errores,
+            'latencia_media_ms': self._latencia_total / self.guardados * 1000 if self.guardados else 0.0,
+            'latencia_maxima_ms': self._latencia_maxima * 1000,
+            'ultima_latencia_ms': self._ultima_latencia * 1000
+        }
@@ -0,0 +1,96 @@
+"""
+Módulo para el índice invertido de contenido de archivos con ranking BM25
+"""
+import heapq
+import math
+import re
+
+# Palabras: secuencias de letras, dígitos o guión bajo (incluye acentos)
+PATRON_TOKEN = re.compile(r"\w+")
+
+
+class IndiceContenido:
+    """Índice invertido sobre el contenido de los archivos, mantenido incrementalmente"""
+    
+    # Parámetros estándar de BM25
+    K1 = 1.2
+    B = 0.75
+    
+    def __init__(self):
+        self.postings = {}  # término -> {ruta_completa: frecuencia}
+        self.documentos = {}  # ruta_completa -> {término: frecuencia}
+        self.longitudes = {}  # ruta_completa -> cantidad de tokens
+        self.total_tokens = 0
+    
+    def tokenizar(self, texto):
+        """Divide un texto en términos en minúsculas"""
+        return PATRON_TOKEN.findall(texto.lower()) if texto else []
+    
+    def agregar(self, ruta, contenido):
+        """Indexa el contenido de un archivo (reemplaza el anterior si existía)"""
+        if ruta in self.documentos:
+            self.eliminar(ruta)
+        
+        frecuencias = {}
+        tokens = self.tokenizar(contenido)
+        for token in tokens:
+            frecuencias[token] = frecuencias.get(token, 0) + 1
+        
+        for termino, frecuencia in frecuencias.items():
+            self.postings.setdefault(termino, {})[ruta] = frecuencia
+        
+        self.documentos[ruta] = frecuencias
+        self.longitudes[ruta] = len(tokens)
+        self.total_tokens += len(tokens)
+    
+    def eliminar(self, ruta):
+        """Quita un archivo del índice usando sus términos guardados (sin re-tokenizar)"""
+        frecuencias = self.documentos.pop(ruta, None)
+        if frecuencias is None:
+            return False
+        
+        for termino in frecuencias:
+            rutas = self.postings[termino]
+            del rutas[ruta]
+            if not rutas:
+                del self.postings[termino]
+        
+        self.total_tokens -= self.longitudes.pop(ruta)
+        return True
+    
+    def buscar(self, consulta, k=10):
+        """
+        Retorna los k archivos más relevantes para la consulta como
+        lista de (ruta_completa, puntaje BM25) en orden descendente.
+        Usa un heap para no ordenar todos los documentos coincidentes.
+        """
+        return self.buscar_varios([self], consulta, k)
+    
+    @staticmethod
+    def buscar_varios(indices, consulta, k=10):
+        """
+        Como buscar, pero sobre varios índices (uno por unidad) como si fueran uno
+        solo: idf y longitud promedio salen de los totales de todos, así que los
+        puntajes son los mismos que daría un único índice con todos los archivos.
+        """
+        total_documentos = sum(len(indice.documentos) for indice in indices)
+        if not total_documentos or k <= 0:
+            return []
+        
+        longitud_promedio = sum(indice.total_tokens for indice in indices) / total_documentos or 1
+        puntajes = {}
+        
+        for termino in set(indices[0].tokenizar(consulta)):
+            listas = [(indice, indice.postings[termino]) for indice in indices if termino in indice.postings]
+            if not listas:
+                continue
+            
+            documentos = sum(len(rutas) for _, rutas in listas)
+            idf = math.log(1 + (total_documentos - documentos + 0.5) / (documentos + 0.5))
+            for indice, rutas in listas:
+                for ruta, frecuencia in rutas.items():
+                    normalizacion = indice.K1 * (1 - indice.B + indice.B * indice.longitudes[ruta] / longitud_promedio)
+                    puntaje = idf * frecuencia * (indice.K1 + 1) / (frecuencia + normalizacion)
+                    puntajes[ruta] = puntajes.get(ruta, 0.0) + puntaje
+        
+        return heapq.nlargest(k, puntajes.items(), key=lambda item: item[1])
@@ -1,110 +1,761 @@
 """
 Módulo para el índice global usando Árbol B
 """
+import io
 import json
+import os
+import struct
+import uuid
 from datetime import datetime
-from arboles import BTree
+from itertools import islice
+from arboles import BTree, BPlusTree
+from arboles.arbol_b_disco import ArchivoPaginas, guardar_paginas, es_archivo_paginas
+from indice_contenido import IndiceContenido
+
+
+class EntradaIndice:
+    """
+    Registro compacto de un archivo en el índice global. La ruta es la misma
+    cadena que la clave del árbol (no se duplica); nombre y extensión se derivan
+    de ella y las fechas se guardan como timestamps epoch.
+    """
+    __slots__ = ('ruta_completa', 'tamanio_kb', 'creacion', 'modificacion', 'contenido_preview')
+    
+    # Forma binaria: tamanio_kb, creacion y modificacion; le sigue el preview en UTF-8
+    FORMATO_BINARIO = struct.Struct('<ddd')
+    
+    def __init__(self, ruta_completa, tamanio_kb, creacion, modificacion, contenido_preview=""):
+        self.ruta_completa = ruta_completa
+        self.tamanio_kb = tamanio_kb
+        self.creacion = creacion
+        self.modificacion = modificacion
+        self.contenido_preview = contenido_preview
+    
+    @property
+    def nombre_completo(self):
+        """nombre.extension del archivo"""
+        return self.ruta_completa.rsplit('/', 1)[-1]
+    
+    @property
+    def nombre(self):
+        return self.nombre_completo.rpartition('.')[0]
+    
+    @property
+    def extension(self):
+        return self.nombre_completo.rpartition('.')[2]
+    
+    def a_lista(self):
+        """Forma serializable (sin la ruta, que ya es la clave del árbol)"""
+        return [self.tamanio_kb, self.creacion, self.modificacion, self.contenido_preview]
+    
+    @classmethod
+    def desde_datos(cls, clave, datos):
+        """Reconstruye la entrada desde lo guardado; acepta también el formato anterior (diccionario)"""
+        if isinstance(datos, dict):
+            return cls(clave, datos['tamanio_kb'],
+                       datetime.fromisoformat(datos['fecha_creacion']).timestamp(),
+                       datetime.fromisoformat(datos['fecha_modificacion']).timestamp(),
+                       datos.get('contenido_preview', ""))
+        return cls(clave, *datos)
+    
+    def a_bytes(self):
+        """Forma binaria para el índice en páginas (sin la ruta, que ya es la clave)"""
+        return (self.FORMATO_BINARIO.pack(self.tamanio_kb, self.creacion, self.modificacion)
+                + self.contenido_preview.encode('utf-8'))
+    
+    @classmethod
+    def desde_bytes(cls, clave, datos):
+        """Inversa de a_bytes"""
+        tamanio_kb, creacion, modificacion = cls.FORMATO_BINARIO.unpack_from(datos)
+        return cls(clave, tamanio_kb, creacion, modificacion, datos[cls.FORMATO_BINARIO.size:].decode('utf-8'))
+    
+    def __repr__(self):
+        return f"EntradaIndice({self.ruta_completa!r}, {self.tamanio_kb:.2f} KB)"
+
 
 class IndiceGlobal:
-    """Índice global de archivos usando Árbol B"""
+    """
+    Índice global de archivos usando Árbol B (o Árbol B+, según el motor).
+    El árbol principal está ordenado por ruta completa; los índices
+    secundarios (árboles del mismo motor) se derivan de él y no se persisten.
+    """
     
-    def __init__(self, t=3):
-        self.arbol_b = BTree(t)
-        self.archivo_indice = "indice_global.json"
+    # Campos de fecha indexados (atributos epoch de EntradaIndice)
+    CAMPOS_FECHA = ('creacion', 'modificacion')
     
-    def insertar_archivo(self, archivo, ruta_completa):
-        """Inserta un archivo en el índice global"""
+    # Motores de árbol disponibles (clave "motor_indice" de config.json)
+    MOTORES = {'b': BTree, 'b+': BPlusTree}
+    
+    # Archivo JSON por defecto para exportar (y el que usaban las versiones anteriores)
+    ARCHIVO_JSON = "indice_global.json"
+    
+    # Umbrales del diario de cambios a partir de los cuales guardar_indice reescribe el índice completo
+    MAX_REGISTROS_DIARIO = 1000
+    MAX_BYTES_DIARIO = 1024 * 1024
+    
+    def __init__(self, t=3, motor='b'):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor de índice desconocido: {motor} (opciones: {', '.join(self.MOTORES)})")
+        self.nombre_motor = motor
+        self.motor = self.MOTORES[motor]
+        self.arbol_b = self.motor(t)
+        self._vaciar_secundarios(t)
+        self._secundarios_listos = True
+        # Índice invertido del contenido completo; se llena desde los archivos, no se persiste
+        self.indice_contenido = IndiceContenido()
+        # Archivos de indexar_contenido que todavía no se tokenizaron, y claves eliminadas desde entonces
+        self._contenido_pendiente = []
+        self._contenido_descartado = set()
+        self.archivo_indice = "indice_global.idx"
+        # Archivo binario abierto con mmap mientras arbol_b se lee bajo demanda desde él
+        self._paginas = None
+        # Diario de cambios: registros aún no escritos y tamaño del diario en disco
+        self.max_registros_diario = self.MAX_REGISTROS_DIARIO
+        self.max_bytes_diario = self.MAX_BYTES_DIARIO
+        self._pendientes = []
+        self._registros_diario = 0
+        self._bytes_diario = 0
+        # Identificador del último checkpoint; el diario lo repite en su primera línea
+        self._id_checkpoint = None
+        # Archivo cuyo contenido (más su diario) coincide con el índice en memoria
+        self._sincronizado = None
+        # Generación del backup cuyos archivos coinciden con el índice (None = ninguno conocido)
+        self.generacion = None
+        # Digest Merkle de cada carpeta de ese backup (ruta_completa -> digest), para resincronizar
+        self.digests = {}
+    
+    def _vaciar_secundarios(self, t):
+        """Deja los índices secundarios vacíos (quien lo llama decide si quedan listos o pendientes)"""
+        # Índice secundario ordenado por (tamanio_kb, ruta_completa)
+        self.indice_tamanio = self.motor(t)
+        # Índices secundarios ordenados por (timestamp epoch, ruta_completa)
+        self.indices_fecha = {campo: self.motor(t) for campo in self.CAMPOS_FECHA}
+        # Índice hash: "nombre.extension" en minúsculas -> {ruta_completa: valor}
+        self.indice_nombres = {}
+        # Índice de trigramas: trigrama de la ruta en minúsculas -> {rutas_completas}
+        self.indice_trigramas = {}
+    
+    def _crear_entrada(self, archivo, ruta_completa):
+        """Crea el par (clave, valor) que representa un archivo en el índice"""
         clave = f"{ruta_completa}/{archivo.nombre}.{archivo.extension}"
-        valor = {
-            'nombre': archivo.nombre,
-            'extension': archivo.extension,
-            'ruta_completa': f"{ruta_completa}/{archivo.nombre}.{archivo.extension}",
-            'tamanio_kb': archivo.tamanio_kb,
-            'fecha_creacion': archivo.fecha_creacion.isoformat(),
-            'fecha_modificacion': archivo.fecha_modificacion.isoformat(),
-            'contenido_preview': archivo.contenido[:100] if archivo.contenido else ""  # Preview de contenido
-        }
+        valor = EntradaIndice(
+            clave,
+            archivo.tamanio_kb,
+            archivo.fecha_creacion.timestamp(),
+            archivo.fecha_modificacion.timestamp(),
+            archivo.contenido[:100] if archivo.contenido else ""  # Preview de contenido
+        )
+        return clave, valor
+    
+    def _prefijo_carpeta(self, ruta_carpeta):
+        """Prefijo común de las claves de todos los archivos bajo una carpeta"""
+        return ruta_carpeta.replace('\\', '/').rstrip('/') + '/'
+    
+    def _trigramas(self, texto):
+        """Conjunto de trigramas (subcadenas de 3 caracteres) de un texto"""
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+    
+    def _clave_nombre(self, valor):
+        """Clave del índice de nombres: nombre.extension en minúsculas"""
+        return valor.nombre_completo.lower()
+    
+    def _indexar_secundarios(self, clave, valor):
+        """Agrega una entrada a los índices secundarios (si ya están construidos)"""
+        if not self._secundarios_listos:
+            return
+        self.indice_tamanio.insertar((valor.tamanio_kb, clave), valor)
+        for campo, arbol in self.indices_fecha.items():
+            arbol.insertar((getattr(valor, campo), clave), valor)
+        self.indice_nombres.setdefault(self._clave_nombre(valor), {})[clave] = valor
+        for trigrama in self._trigramas(clave.lower()):
+            self.indice_trigramas.setdefault(trigrama, set()).add(clave)
+    
+    def _desindexar_secundarios(self, clave, valor):
+        """Quita una entrada de los índices secundarios (si ya están construidos) y del de contenido"""
+        self.indice_contenido.eliminar(clave)
+        if self._contenido_pendiente:
+            self._contenido_descartado.add(clave)
+        if not self._secundarios_listos:
+            return
+        
+        self.indice_tamanio.eliminar((valor.tamanio_kb, clave))
+        for campo, arbol in self.indices_fecha.items():
+            arbol.eliminar((getattr(valor, campo), clave))
+        
+        nombre = self._clave_nombre(valor)
+        rutas = self.indice_nombres.get(nombre)
+        if rutas is not None:
+            rutas.pop(clave, None)
+            if not rutas:
+                del self.indice_nombres[nombre]
+        
+        for trigrama in self._trigramas(clave.lower()):
+            rutas = self.indice_trigramas.get(trigrama)
+            if rutas is not None:
+                rutas.discard(clave)
+                if not rutas:
+                    del self.indice_trigramas[trigrama]
+    
+    def _reconstruir_secundarios(self):
+        """Reconstruye los índices secundarios a partir del árbol principal"""
+        t = self.arbol_b.t
+        entradas = list(self.arbol_b.seek())
         
+        pares = sorted(((valor.tamanio_kb, clave), valor) for clave, valor in entradas)
+        self.indice_tamanio = self.motor.bulk_load(pares, t=t)
+        
+        for campo in self.CAMPOS_FECHA:
+            pares = sorted(((getattr(valor, campo), clave), valor) for clave, valor in entradas)
+            self.indices_fecha[campo] = self.motor.bulk_load(pares, t=t)
+        
+        self.indice_nombres = {}
+        self.indice_trigramas = {}
+        for clave, valor in entradas:
+            self.indice_nombres.setdefault(self._clave_nombre(valor), {})[clave] = valor
+            for trigrama in self._trigramas(clave.lower()):
+                self.indice_trigramas.setdefault(trigrama, set()).add(clave)
+        self._secundarios_listos = True
+    
+    def _asegurar_secundarios(self):
+        """
+        Construye los índices secundarios si quedaron pendientes al cargar el índice
+        (recorre el árbol principal una vez, aunque siga en disco). Lo llaman las
+        búsquedas que los usan; las demás operaciones no los esperan.
+        """
+        if not self._secundarios_listos:
+            self._reconstruir_secundarios()
+    
+    def _convertir_arbol(self, arbol, t):
+        """Copia un árbol (de cualquier motor, en memoria o en disco) a uno en memoria del motor y grado configurados"""
+        entradas = list(arbol.seek())
+        if type(arbol) is self.motor:
+            return self.motor.bulk_load(entradas, t=t)
+        # Del otro motor: inserción por lote (bulk_load de B+ no admite claves repetidas)
+        convertido = self.motor(t)
+        convertido.insertar_lote(entradas)
+        return convertido
+    
+    def _materializar(self, t=None):
+        """
+        Si el árbol principal se está leyendo bajo demanda desde el archivo binario,
+        lo copia a memoria. Lo llaman las modificaciones; las búsquedas leen del
+        archivo sin necesitarlo.
+        """
+        if self._paginas is None:
+            return
+        self.arbol_b = self._convertir_arbol(self.arbol_b, t or self.arbol_b.t)
+        self._cerrar_paginas()
+    
+    def _cerrar_paginas(self):
+        if self._paginas is not None:
+            self._paginas.cerrar()
+            self._paginas = None
+    
+    def _registrar_cambio(self, registro):
+        """Anota un cambio para el diario; el índice deja de coincidir con el último backup"""
+        self._pendientes.append(registro)
+        self.generacion = None
+    
+    def sellar_generacion(self, generacion, digests=None):
+        """
+        Marca que el índice coincide con los archivos del backup de esa generación,
+        cuyas carpetas tienen esos digests. El diario sólo registra los digests que cambiaron.
+        """
+        digests = digests or {}
+        cambios = {ruta: digest for ruta, digest in digests.items() if self.digests.get(ruta) != digest}
+        cambios.update((ruta, None) for ruta in self.digests.keys() - digests.keys())
+        if generacion != self.generacion or cambios:
+            self.generacion = generacion
+            self.digests = dict(digests)
+            self._pendientes.append(['g', generacion, cambios])
+    
+    def insertar_archivo(self, archivo, ruta_completa):
+        """Inserta un archivo en el índice global"""
+        self._materializar()
+        clave, valor = self._crear_entrada(archivo, ruta_completa)
         self.arbol_b.insertar(clave, valor)
+        self._indexar_secundarios(clave, valor)
+        self.indice_contenido.agregar(clave, archivo.contenido)
+        self._registrar_cambio(['i', clave, valor.a_lista()])
+    
+    def insertar_archivos(self, archivos_con_ruta):
+        """
+        Inserta un lote de archivos ({'archivo': Archivo, 'ruta': str}) en el índice:
+        cada árbol B recibe el lote completo con insertar_lote en vez de una
+        inserción por archivo. Retorna cuántos archivos se insertaron.
+        """
+        self._materializar()
+        pares = []
+        for item in archivos_con_ruta:
+            clave, valor = self._crear_entrada(item['archivo'], item['ruta'])
+            pares.append((clave, valor))
+            self.indice_contenido.agregar(clave, item['archivo'].contenido)
+            self._registrar_cambio(['i', clave, valor.a_lista()])
+        
+        self.arbol_b.insertar_lote(pares)
+        if not self._secundarios_listos:
+            return len(pares)
+        
+        self.indice_tamanio.insertar_lote(((valor.tamanio_kb, clave), valor) for clave, valor in pares)
+        for campo, arbol in self.indices_fecha.items():
+            arbol.insertar_lote(((getattr(valor, campo), clave), valor) for clave, valor in pares)
+        
+        for clave, valor in pares:
+            self.indice_nombres.setdefault(self._clave_nombre(valor), {})[clave] = valor
+            for trigrama in self._trigramas(clave.lower()):
+                self.indice_trigramas.setdefault(trigrama, set()).add(clave)
+        
+        return len(pares)
+    
+    def indexar_contenido(self, archivos_con_ruta):
+        """
+        Llena el índice de contenido (que no se guarda con el índice) desde una
+        lista de {'archivo': Archivo, 'ruta': str}; sirve tras cargar un índice guardado.
+        Los archivos se tokenizan recién en la primera búsqueda por contenido.
+        """
+        self.indice_contenido = IndiceContenido()
+        self._contenido_pendiente = list(archivos_con_ruta)
+        self._contenido_descartado = set()
+    
+    def _asegurar_contenido(self):
+        """
+        Tokeniza los archivos pendientes de indexar_contenido. Los que se insertaron
+        o eliminaron después ya tienen su estado final en el índice de contenido.
+        """
+        for item in self._contenido_pendiente:
+            archivo = item['archivo']
+            clave = f"{item['ruta']}/{archivo.nombre}.{archivo.extension}"
+            if clave not in self.indice_contenido.documentos and clave not in self._contenido_descartado:
+                self.indice_contenido.agregar(clave, archivo.contenido)
+        self._contenido_pendiente = []
+        self._contenido_descartado = set()
+    
+    def _claves_directas(self, ruta_carpeta):
+        """Claves de los archivos que están directamente en una carpeta (salta sus subcarpetas)"""
+        prefijo = f"{ruta_carpeta}/"
+        claves = []
+        desde = prefijo
+        while desde is not None:
+            inicio, desde = desde, None
+            for clave, _ in self.arbol_b.seek(inicio):
+                if not clave.startswith(prefijo):
+                    break
+                barra = clave.find('/', len(prefijo))
+                if barra < 0:
+                    claves.append(clave)
+                    continue
+                # Subcarpeta: se retoma después de su última clave ('0' sigue a '/')
+                desde = clave[:barra] + '0'
+                break
+        return claves
+    
+    def resincronizar(self, digests, archivos_con_ruta):
+        """
+        Pone el índice al día con los archivos de un backup ({'archivo', 'ruta'}) comparando
+        los digests de sus carpetas con self.digests (los del contenido del índice). Como los
+        digests son Merkle, las carpetas que coinciden tienen todo su subárbol igual y no se
+        tocan; de las demás se reindexan sólo sus archivos propios. Las carpetas que ya no
+        existen pierden sus archivos propios (sus subcarpetas tampoco existen, así que cada
+        una pierde los suyos). Retorna cuántas carpetas se reindexaron.
+        """
+        cambiadas = {ruta for ruta, digest in digests.items() if self.digests.get(ruta) != digest}
+        borradas = self.digests.keys() - digests.keys()
+        if not cambiadas and not borradas:
+            # Nada cambió: el árbol puede seguir leyéndose desde el archivo
+            return 0
+        
+        self._materializar()
+        for ruta in cambiadas | borradas:
+            for clave in self._claves_directas(ruta):
+                self.eliminar_archivo(clave)
+        self.insertar_archivos([item for item in archivos_con_ruta if item['ruta'] in cambiadas])
+        return len(cambiadas)
+    
+    def reconstruir(self, archivos_con_ruta):
+        """
+        Reconstruye el índice completo a partir de una lista de
+        {'archivo': Archivo, 'ruta': str}: ordena una vez y carga el árbol
+        de abajo hacia arriba (O(n log n) por el ordenamiento, O(n) la carga)
+        """
+        self._cerrar_paginas()
+        pares = []
+        self.indice_contenido = IndiceContenido()
+        self._contenido_pendiente = []
+        self._contenido_descartado = set()
+        for item in archivos_con_ruta:
+            clave, valor = self._crear_entrada(item['archivo'], item['ruta'])
+            pares.append((clave, valor))
+            self.indice_contenido.agregar(clave, item['archivo'].contenido)
+        
+        pares.sort(key=lambda par: par[0])
+        self.arbol_b = self.motor.bulk_load(pares, t=self.arbol_b.t)
+        self._reconstruir_secundarios()
+        # El próximo guardado reescribe el índice completo
+        self._pendientes = []
+        self._sincronizado = None
+        self.generacion = None
+        self.digests = {}
     
     def eliminar_archivo(self, ruta_completa):
         """Elimina un archivo del índice global"""
+        self._materializar()
+        valor = self.arbol_b.buscar(ruta_completa)
+        if valor is not None:
+            self._desindexar_secundarios(ruta_completa, valor)
+            self._registrar_cambio(['e', ruta_completa])
         return self.arbol_b.eliminar(ruta_completa)
     
-    def buscar_por_nombre(self, nombre):
-        """Busca archivos por nombre exacto"""
-        # Buscar en todas las claves que terminen con el nombre
-        resultados = []
-        self._buscar_por_nombre_rec(self.arbol_b.raiz, nombre, resultados)
-        return resultados
+    def eliminar_carpeta(self, ruta_carpeta):
+        """
+        Elimina del índice todos los archivos bajo una carpeta (recursivo)
+        con un solo corte de rango en el árbol B. Retorna cuántos se eliminaron.
+        """
+        self._materializar()
+        prefijo = self._prefijo_carpeta(ruta_carpeta)
+        eliminados = self.arbol_b.eliminar_prefijo(prefijo)
+        for clave, valor in eliminados:
+            self._desindexar_secundarios(clave, valor)
+        if eliminados:
+            self._registrar_cambio(['c', prefijo])
+        return len(eliminados)
     
-    def _buscar_por_nombre_rec(self, nodo, nombre, resultados):
-        """Búsqueda recursiva por nombre"""
-        if not nodo:
+    def buscar_por_nombre(self, nombre, desplazamiento=0):
+        """
+        Busca archivos por nombre exacto "nombre.extension" (sin distinguir
+        mayúsculas) en el índice hash de nombres: O(1) + cantidad de coincidencias
+        """
+        self._asegurar_secundarios()
+        rutas = self.indice_nombres.get(nombre.lower(), {})
+        for ruta in islice(sorted(rutas), desplazamiento, None):
+            yield rutas[ruta]
+    
+    def buscar_parcial(self, texto, desplazamiento=0):
+        """
+        Genera los archivos que contienen texto en nombre o ruta (sin distinguir
+        mayúsculas), en orden de ruta. Intersecta las listas de trigramas del texto
+        y verifica sólo esos candidatos; textos de 1-2 caracteres, o tan comunes que
+        ni la lista más corta descarta mucho, recorren el árbol en orden con el
+        cursor, de modo que los primeros resultados salen de inmediato.
+        """
+        self._asegurar_secundarios()
+        texto = texto.lower()
+        trigramas = self._trigramas(texto)
+        listas = sorted((self.indice_trigramas.get(trigrama, set()) for trigrama in trigramas), key=len)
+        if not listas or len(listas[0]) * 4 > self.arbol_b.contar():
+            coincidencias = (valor for clave, valor in self.arbol_b.seek() if texto in clave.lower())
+            yield from islice(coincidencias, desplazamiento, None)
             return
         
-        for i, clave in enumerate(nodo.claves):
-            if clave.endswith(f"/{nombre}"):
-                resultados.append(nodo.valores[i])
+        # Intersectar empezando por la lista más corta
+        candidatos = set(listas[0])
+        for rutas in listas[1:]:
+            if not candidatos:
+                break
+            candidatos &= rutas
         
-        if not nodo.hoja:
-            for hijo in nodo.hijos:
-                self._buscar_por_nombre_rec(hijo, nombre, resultados)
+        # Sólo se buscan en el árbol las rutas que se llegan a consumir
+        rutas = (ruta for ruta in sorted(candidatos) if texto in ruta.lower())
+        for ruta in islice(rutas, desplazamiento, None):
+            yield self.arbol_b.buscar(ruta)
     
-    def buscar_parcial(self, texto):
-        """Busca archivos que contengan texto en nombre o ruta"""
-        return self.arbol_b.buscar_parcial(texto)
+    def buscar_por_carpeta(self, carpeta, desplazamiento=0):
+        """
+        Genera los archivos bajo una carpeta (incluyendo subcarpetas). Salta directo
+        al desplazamiento con rank/seek_posicion del árbol B: O(log n) + 1 por resultado
+        """
+        prefijo = self._prefijo_carpeta(carpeta)
+        inicio = self.arbol_b.rank(prefijo) + desplazamiento
+        for clave, valor in self.arbol_b.seek_posicion(inicio):
+            if not clave.startswith(prefijo):
+                return
+            yield valor
     
-    def buscar_por_rango_tamanio(self, min_kb, max_kb):
-        """Busca archivos por rango de tamaño"""
-        return self.arbol_b.buscar_por_rango(min_kb, max_kb, 'tamanio')
+    def buscar_por_contenido(self, consulta, k=10, desplazamiento=0):
+        """Busca en el contenido completo de los archivos; genera los k más relevantes (BM25)"""
+        self._asegurar_contenido()
+        mejores = self.indice_contenido.buscar(consulta, desplazamiento + k)
+        for ruta, _ in mejores[desplazamiento:]:
+            yield self.arbol_b.buscar(ruta)
     
-    def buscar_combinada(self, texto, min_kb=None, max_kb=None):
-        """Búsqueda combinada por texto y rango de tamaño"""
-        resultados_texto = self.buscar_parcial(texto)
-        
+    def _iterar_rango(self, arbol, minimo=None, maximo=None, desplazamiento=0):
+        """
+        Genera los valores de un índice secundario con claves (valor, ruta) y
+        minimo <= valor <= maximo, saltando 'desplazamiento' resultados con rank
+        """
+        inicio = 0 if minimo is None else arbol.rank((minimo,))
+        for (dato, _), valor in arbol.seek_posicion(inicio + desplazamiento):
+            if maximo is not None and dato > maximo:
+                return
+            yield valor
+    
+    def buscar_por_rango_fecha(self, campo, desde=None, hasta=None, desplazamiento=0):
+        """
+        Genera los archivos cuya fecha de 'creacion' o 'modificacion' está entre
+        desde y hasta (timestamps epoch inclusivos, None = sin límite), O(log n + k)
+        """
+        self._asegurar_secundarios()
+        return self._iterar_rango(self.indices_fecha[campo], desde, hasta, desplazamiento)
+    
+    def buscar_por_rango_tamanio(self, min_kb, max_kb, desplazamiento=0):
+        """Genera los archivos en un rango de tamaño usando el índice secundario de tamaños"""
+        self._asegurar_secundarios()
+        return self._iterar_rango(self.indice_tamanio, min_kb, max_kb, desplazamiento)
+    
+    def buscar_combinada(self, texto, min_kb=None, max_kb=None, desplazamiento=0):
+        """Búsqueda combinada por texto y rango de tamaño (generador)"""
         if min_kb is None and max_kb is None:
-            return resultados_texto
-        
-        resultados_filtrados = []
-        for resultado in resultados_texto:
-            tamanio = resultado['tamanio_kb']
-            if (min_kb is None or tamanio >= min_kb) and (max_kb is None or tamanio <= max_kb):
-                resultados_filtrados.append(resultado)
+            yield from self.buscar_parcial(texto, desplazamiento)
+            return
         
-        return resultados_filtrados
+        # Acotar primero por tamaño (búsqueda binaria) y filtrar sólo esos candidatos por texto
+        self._asegurar_secundarios()
+        texto = texto.lower()
+        valores = (valor for valor in self._iterar_rango(self.indice_tamanio, min_kb, max_kb)
+                   if texto in valor.ruta_completa.lower())
+        yield from islice(valores, desplazamiento, None)
+    
+    def escribir_resultados(self, resultados, escritor, desplazamiento=0, limite=None):
+        """
+        Escribe los resultados uno por línea en 'escritor' (cualquier objeto con
+        write, por ejemplo sys.stdout) a medida que se generan, sin acumularlos.
+        Retorna (cantidad escrita, si quedaron más resultados después del límite).
+        """
+        escritos = 0
+        for numero, resultado in enumerate(resultados, desplazamiento + 1):
+            if limite is not None and escritos >= limite:
+                return escritos, True
+            escritor.write(f"{numero}. {resultado.ruta_completa} ({resultado.tamanio_kb:.2f} KB)\n")
+            escritos += 1
+        return escritos, False
     
-    def mostrar_resultados(self, resultados):
-        """Muestra resultados de búsqueda de forma formateada"""
-        if not resultados:
+    def mostrar_resultados(self, resultados, desplazamiento=0, limite=None, pagina=None):
+        """
+        Muestra una página de resultados de búsqueda de forma formateada.
+        Consume el generador sólo hasta llenar la página (más uno para saber si hay más).
+        """
+        cuerpo = io.StringIO()
+        escritos, hay_mas = self.escribir_resultados(resultados, cuerpo, desplazamiento, limite)
+        if not escritos:
             return "No se encontraron resultados."
         
-        salida = f"Resultados encontrados en índice global ({len(resultados)}):\n"
-        for i, resultado in enumerate(resultados, 1):
-            salida += f"{i}. {resultado['ruta_completa']} ({resultado['tamanio_kb']:.2f} KB)\n"
+        # El total no se conoce sin consumir todo el generador: se indica sólo el tramo mostrado
+        salida = (f"Resultados encontrados en índice global (mostrando {desplazamiento + 1}-"
+                  f"{desplazamiento + escritos}):\n" + cuerpo.getvalue())
+        if hay_mas:
+            siguiente = f"--page {pagina + 1}" if pagina else f"--offset {desplazamiento + escritos}"
+            salida += f"... hay más resultados, use {siguiente} para continuar\n"
         
         return salida
     
+    def _archivo_diario(self, archivo):
+        """Diario de cambios de un archivo de índice (indice_global.idx -> indice_global.diario)"""
+        return os.path.splitext(archivo)[0] + '.diario'
+    
     def guardar_indice(self, archivo=None):
-        """Guarda el índice en un archivo"""
+        """
+        Guarda el índice en formato binario de páginas (en JSON si el archivo termina
+        en .json). Si el archivo ya tiene el índice salvo los últimos cambios, sólo
+        agrega esos cambios a su diario, O(cambios); cuando el diario supera
+        max_registros_diario o max_bytes_diario se reescribe el índice completo
+        (checkpoint) y el diario se vacía.
+        """
         archivo = archivo or self.archivo_indice
+        if archivo.lower().endswith('.json'):
+            return self.exportar_json(archivo)
         try:
-            with open(archivo, 'w', encoding='utf-8') as f:
-                json.dump(self.arbol_b.to_dict(), f, indent=4, ensure_ascii=False)
+            if self._sincronizado == os.path.abspath(archivo):
+                if not self._pendientes:
+                    return True
+                if self._agregar_al_diario(archivo):
+                    return True
+            self._checkpoint(archivo)
             return True
         except Exception as e:
             print(f"Error guardando índice: {e}")
             return False
     
+    def _agregar_al_diario(self, archivo):
+        """Agrega los registros pendientes al diario; retorna False si eso superaría los umbrales"""
+        lineas = ''.join(json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + '\n'
+                         for registro in self._pendientes)
+        if self._bytes_diario == 0:
+            # Diario nuevo: su primera línea indica el checkpoint sobre el que se aplica
+            lineas = json.dumps(['k', self._id_checkpoint]) + '\n' + lineas
+        tamanio = len(lineas.encode('utf-8'))
+        if (self._registros_diario + len(self._pendientes) > self.max_registros_diario
+                or self._bytes_diario + tamanio > self.max_bytes_diario):
+            return False
+        
+        with open(self._archivo_diario(archivo), 'a', encoding='utf-8') as f:
+            f.write(lineas)
+        self._registros_diario += len(self._pendientes)
+        self._bytes_diario += tamanio
+        self._pendientes = []
+        return True
+    
+    def _checkpoint(self, archivo):
+        """
+        Reescribe el índice completo en archivo y borra su diario. Cada checkpoint
+        tiene un identificador nuevo; si se corta entre el reemplazo y el borrado,
+        el diario viejo lleva el identificador anterior y al cargar se descarta
+        (reproducirlo devolvería claves ya eliminadas y una generación vieja).
+        """
+        if self._paginas is not None and os.path.abspath(archivo) == os.path.abspath(self._paginas.ruta):
+            # No se puede reemplazar el archivo del que se está leyendo
+            self._materializar()
+        id_checkpoint = uuid.uuid4().hex
+        metadatos = json.dumps({'generacion': self.generacion, 'digests': self.digests,
+                                'checkpoint': id_checkpoint}).encode('utf-8')
+        guardar_paginas(self.arbol_b, archivo, EntradaIndice.a_bytes, metadatos)
+        self._id_checkpoint = id_checkpoint
+        diario = self._archivo_diario(archivo)
+        if os.path.exists(diario):
+            os.remove(diario)
+        self._pendientes = []
+        self._registros_diario = 0
+        self._bytes_diario = 0
+        self._sincronizado = os.path.abspath(archivo)
+    
+    def _reproducir_diario(self, archivo):
+        """
+        Aplica al índice recién cargado los cambios del diario de archivo. Cada
+        registro deja su clave (o carpeta) en el estado final que indica, así que
+        reproducir registros ya incluidos en el índice no los duplica. Una última
+        línea incompleta (corte a mitad de una escritura) se descarta, y un diario
+        de otro checkpoint (ver _checkpoint) se vacía sin aplicarlo.
+        """
+        diario = self._archivo_diario(archivo)
+        if not os.path.exists(diario):
+            return
+        
+        registros = []
+        validos = 0
+        with open(diario, 'rb') as f:
+            for linea in f:
+                try:
+                    if not linea.endswith(b'\n'):
+                        raise ValueError("línea incompleta")
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    break
+                validos += len(linea)
+        
+        # Los diarios anteriores a los identificadores no tienen encabezado
+        id_diario = registros.pop(0)[1] if registros and registros[0][0] == 'k' else None
+        if id_diario != self._id_checkpoint:
+            registros = []
+            validos = 0
+        
+        if validos < os.path.getsize(diario):
+            # Se descarta la cola dañada (o el diario ajeno) para que los próximos registros no queden pegados a ella
+            with open(diario, 'r+b') as f:
+                f.truncate(validos)
+        
+        if registros:
+            self._materializar()
+            for registro in registros:
+                self._aplicar_registro(registro)
+        self._registros_diario = len(registros)
+        self._bytes_diario = validos
+    
+    def _aplicar_registro(self, registro):
+        """
+        Aplica un registro del diario: ['i', clave, datos], ['e', clave],
+        ['c', prefijo de carpeta] o ['g', generación del backup, digests que cambiaron]
+        """
+        operacion, clave = registro[0], registro[1]
+        if operacion == 'g':
+            self.generacion = clave
+            for ruta, digest in (registro[2] if len(registro) > 2 else {}).items():
+                if digest is None:
+                    self.digests.pop(ruta, None)
+                else:
+                    self.digests[ruta] = digest
+            return
+        
+        self.generacion = None
+        if operacion == 'c':
+            for eliminada, valor in self.arbol_b.eliminar_prefijo(clave):
+                self._desindexar_secundarios(eliminada, valor)
+            return
+        
+        anterior = self.arbol_b.buscar(clave)
+        if anterior is not None:
+            self._desindexar_secundarios(clave, anterior)
+            self.arbol_b.eliminar(clave)
+        if operacion == 'i':
+            valor = EntradaIndice.desde_datos(clave, registro[2])
+            self.arbol_b.insertar(clave, valor)
+            self._indexar_secundarios(clave, valor)
+    
+    def exportar_json(self, archivo=None):
+        """Exporta el índice a JSON (el formato de las versiones anteriores)"""
+        archivo = archivo or self.ARCHIVO_JSON
+        try:
+            with open(archivo, 'w', encoding='utf-8') as f:
+                # JSON compacto: con indentación, los espacios pesaban más que las claves comprimidas
+                json.dump(self.arbol_b.to_dict(EntradaIndice.a_lista), f, ensure_ascii=False, separators=(',', ':'))
+            return True
+        except Exception as e:
+            print(f"Error exportando índice: {e}")
+            return False
+    
     def cargar_indice(self, archivo=None):
-        """Carga el índice desde un archivo"""
+        """
+        Carga el índice desde un archivo. El formato binario se abre con mmap y los
+        nodos se leen recién cuando una búsqueda llega a ellos; un JSON se lee completo.
+        """
         archivo = archivo or self.archivo_indice
+        destino = archivo
+        if archivo == self.archivo_indice and not os.path.exists(archivo) and os.path.exists(self.ARCHIVO_JSON):
+            # Índice de una versión anterior: se lee el JSON y el próximo guardado lo pasa a binario
+            archivo = self.ARCHIVO_JSON
+        
+        t = self.arbol_b.t
+        self._pendientes = []
+        self._registros_diario = 0
+        self._bytes_diario = 0
+        self._id_checkpoint = None
+        self._sincronizado = None
+        self.generacion = None
+        self.digests = {}
         try:
+            if es_archivo_paginas(archivo):
+                paginas = ArchivoPaginas(archivo, EntradaIndice.desde_bytes)
+                self._cerrar_paginas()
+                self.arbol_b = paginas.arbol()
+                self._paginas = paginas
+                if paginas.metadatos:
+                    metadatos = json.loads(paginas.metadatos)
+                    self.generacion = metadatos.get('generacion')
+                    self.digests = metadatos.get('digests', {})
+                    self._id_checkpoint = metadatos.get('checkpoint')
+                convertir = paginas.clase is not self.motor or paginas.t != t
+                if convertir:
+                    # Guardado con otro motor o grado: se convierte ya al configurado (y el próximo guardado lo reescribe)
+                    self._materializar(t)
+                # Los índices secundarios se construyen recién cuando se necesitan
+                self._vaciar_secundarios(t)
+                self._secundarios_listos = False
+                self._reproducir_diario(archivo)
+                if not convertir:
+                    self._sincronizado = os.path.abspath(archivo)
+                return True
+            
             with open(archivo, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             
             if data:
-                self.arbol_b = BTree.from_dict(data)
+                # Un índice guardado con otro grado se recarga con el configurado
+                clase = BPlusTree if data.get('tipo') == BPlusTree.TIPO else BTree
+                arbol = clase.from_dict(data, EntradaIndice.desde_datos, t=t)
+                if clase is not self.motor:
+                    arbol = self._convertir_arbol(arbol, t)
+                self._cerrar_paginas()
+                self.arbol_b = arbol
+                self._vaciar_secundarios(t)
+                self._secundarios_listos = False
+                self._reproducir_diario(destino)
                 return True
         except FileNotFoundError:
             print(f"Archivo de índice no encontrado, se creará uno nuevo.")
@@ -113,26 +764,21 @@ class IndiceGlobal:
         
         return False
     
-    def obtener_estadisticas(self):
-        """Obtiene estadísticas del índice"""
-        if not self.arbol_b.raiz:
-            return {"total_archivos": 0}
-        
-        total = self._contar_archivos(self.arbol_b.raiz)
-        return {"total_archivos": total}
+    def cambiar_grado(self, t):
+        """Cambia el grado mínimo de todos los árboles B del índice (recarga masiva)"""
+        self._materializar(t)
+        self.arbol_b.cambiar_grado(t)
+        if self._secundarios_listos:
+            self._reconstruir_secundarios()
     
-    def _contar_archivos(self, nodo):
-        """Cuenta archivos en el árbol B"""
-        if not nodo:
-            return 0
-        
-        total = len(nodo.claves)
-        
-        if not nodo.hoja:
-            for hijo in nodo.hijos:
-                total += self._contar_archivos(hijo)
-        
-        return total
+    def obtener_estadisticas(self):
+        """Obtiene estadísticas del índice (O(1) gracias a las cantidades por subárbol)"""
+        return {
+            "total_archivos": self.arbol_b.contar(),
+            "motor_indice": self.nombre_motor,
+            "grado_arbol_b": self.arbol_b.t,
+            "altura_arbol_b": self.arbol_b.altura()
+        }
     
     def actualizar_archivo(self, ruta_vieja, archivo_nuevo, ruta_nueva):
         """Actualiza un archivo en el índice (para renombrado)"""
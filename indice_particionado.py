@@ -0,0 +1,340 @@
+"""
+Módulo para el índice global particionado por unidad: un IndiceGlobal (con su
+archivo y su diario) por cada unidad, de modo que un cambio en D: sólo escribe
+el archivo de D:
+"""
+import glob
+import heapq
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from indice_global import IndiceGlobal, EntradaIndice
+from indice_contenido import IndiceContenido
+
+
+class IndiceParticionado:
+    """
+    Índice global con una partición (IndiceGlobal) por unidad, con la misma interfaz.
+    Las modificaciones van a la partición de la unidad de la ruta; las búsquedas
+    recorren todas y mezclan sus resultados en orden (heapq.merge). Cargar y guardar
+    trabajan sobre todas las particiones a la vez con un pool de hilos.
+    """
+    
+    # Archivo JSON por defecto para exportar (el índice completo, todas las unidades juntas)
+    ARCHIVO_JSON = IndiceGlobal.ARCHIVO_JSON
+    
+    def __init__(self, t=3, motor='b', unidades=None):
+        if motor not in IndiceGlobal.MOTORES:
+            raise ValueError(f"Motor de índice desconocido: {motor} (opciones: {', '.join(IndiceGlobal.MOTORES)})")
+        self.t = t
+        self.nombre_motor = motor
+        self.motor = IndiceGlobal.MOTORES[motor]
+        # Base de los nombres de archivo: indice_global.idx -> indice_global_C.idx, indice_global_D.idx...
+        self.archivo_indice = "indice_global.idx"
+        self._max_registros_diario = IndiceGlobal.MAX_REGISTROS_DIARIO
+        self._max_bytes_diario = IndiceGlobal.MAX_BYTES_DIARIO
+        # Nombre de unidad ("C:") -> IndiceGlobal con los archivos de esa unidad
+        self.particiones = {}
+        for unidad in unidades or []:
+            self._particion(unidad)
+    
+    @property
+    def max_registros_diario(self):
+        return self._max_registros_diario
+    
+    @max_registros_diario.setter
+    def max_registros_diario(self, valor):
+        self._max_registros_diario = valor
+        for particion in self.particiones.values():
+            particion.max_registros_diario = valor
+    
+    @property
+    def max_bytes_diario(self):
+        return self._max_bytes_diario
+    
+    @max_bytes_diario.setter
+    def max_bytes_diario(self, valor):
+        self._max_bytes_diario = valor
+        for particion in self.particiones.values():
+            particion.max_bytes_diario = valor
+    
+    def _unidad(self, ruta):
+        """Unidad de una clave o ruta de carpeta ("C::/Documentos/x.txt" -> "C:"); None si no tiene"""
+        posicion = ruta.find(':')
+        return ruta[:posicion + 1] if posicion > 0 else None
+    
+    def _archivo_particion(self, archivo, unidad):
+        """Archivo de la partición de una unidad (indice_global.idx -> indice_global_C.idx)"""
+        base, extension = os.path.splitext(archivo)
+        return f"{base}_{unidad.rstrip(':')}{extension}"
+    
+    def _particion(self, unidad):
+        """Partición de una unidad; la crea vacía si todavía no existe"""
+        particion = self.particiones.get(unidad)
+        if particion is None:
+            particion = IndiceGlobal(self.t, self.nombre_motor)
+            particion.archivo_indice = self._archivo_particion(self.archivo_indice, unidad)
+            particion.max_registros_diario = self._max_registros_diario
+            particion.max_bytes_diario = self._max_bytes_diario
+            self.particiones[unidad] = particion
+        return particion
+    
+    def _ordenadas(self):
+        """Pares (unidad, partición) en orden de unidad, que es también el orden de sus claves"""
+        return sorted(self.particiones.items())
+    
+    def _agrupar(self, archivos_con_ruta):
+        """Reparte una lista de {'archivo', 'ruta'} por unidad"""
+        grupos = {}
+        for item in archivos_con_ruta:
+            grupos.setdefault(self._unidad(item['ruta']), []).append(item)
+        return grupos
+    
+    def _en_paralelo(self, funcion, tareas):
+        """Aplica funcion a cada tarea en un pool de hilos (uno por tarea); retorna los resultados en orden"""
+        if not tareas:
+            return []
+        with ThreadPoolExecutor(max_workers=len(tareas), thread_name_prefix="IndiceParticion") as pool:
+            return list(pool.map(funcion, tareas))
+    
+    @property
+    def generacion(self):
+        """Generación del backup con la que coinciden todas las particiones (None si alguna difiere)"""
+        generaciones = {particion.generacion for particion in self.particiones.values()}
+        return generaciones.pop() if len(generaciones) == 1 else None
+    
+    @property
+    def digests(self):
+        """Digests de las carpetas de todas las unidades"""
+        digests = {}
+        for particion in self.particiones.values():
+            digests.update(particion.digests)
+        return digests
+    
+    def _repartir_digests(self, digests):
+        """Reparte un diccionario ruta_completa -> digest por unidad"""
+        por_unidad = {}
+        for ruta, digest in (digests or {}).items():
+            por_unidad.setdefault(self._unidad(ruta), {})[ruta] = digest
+        return por_unidad
+    
+    def sellar_generacion(self, generacion, digests=None):
+        """Sella cada partición con la generación y los digests de las carpetas de su unidad"""
+        por_unidad = self._repartir_digests(digests)
+        for unidad in por_unidad:
+            self._particion(unidad)
+        for unidad, particion in self.particiones.items():
+            particion.sellar_generacion(generacion, por_unidad.get(unidad, {}))
+    
+    def insertar_archivo(self, archivo, ruta_completa):
+        """Inserta un archivo en la partición de su unidad"""
+        self._particion(self._unidad(ruta_completa)).insertar_archivo(archivo, ruta_completa)
+    
+    def insertar_archivos(self, archivos_con_ruta):
+        """Inserta un lote de archivos, un lote por unidad; retorna cuántos se insertaron"""
+        return sum(self._particion(unidad).insertar_archivos(grupo)
+                   for unidad, grupo in self._agrupar(archivos_con_ruta).items())
+    
+    def indexar_contenido(self, archivos_con_ruta):
+        """Llena el índice de contenido de cada partición con los archivos de su unidad"""
+        grupos = self._agrupar(archivos_con_ruta)
+        for unidad in grupos:
+            self._particion(unidad)
+        for unidad, particion in self.particiones.items():
+            particion.indexar_contenido(grupos.get(unidad, []))
+    
+    def resincronizar(self, digests, archivos_con_ruta):
+        """
+        Resincroniza cada partición con las carpetas y archivos de su unidad. Una partición
+        sin generación o sin digests (modificada después del último sellado) se reconstruye.
+        Retorna cuántas carpetas se reindexaron.
+        """
+        por_unidad = self._repartir_digests(digests)
+        grupos = self._agrupar(archivos_con_ruta)
+        reindexadas = 0
+        for unidad in por_unidad.keys() | grupos.keys() | self.particiones.keys():
+            particion = self._particion(unidad)
+            digests_unidad = por_unidad.get(unidad, {})
+            archivos = grupos.get(unidad, [])
+            if particion.generacion is None or not particion.digests:
+                particion.reconstruir(archivos)
+                reindexadas += len(digests_unidad)
+            else:
+                reindexadas += particion.resincronizar(digests_unidad, archivos)
+        return reindexadas
+    
+    def reconstruir(self, archivos_con_ruta):
+        """Reconstruye todas las particiones (las de unidades sin archivos quedan vacías)"""
+        grupos = self._agrupar(archivos_con_ruta)
+        for unidad in grupos:
+            self._particion(unidad)
+        for unidad, particion in self.particiones.items():
+            particion.reconstruir(grupos.get(unidad, []))
+    
+    def eliminar_archivo(self, ruta_completa):
+        """Elimina un archivo de la partición de su unidad"""
+        particion = self.particiones.get(self._unidad(ruta_completa))
+        return particion.eliminar_archivo(ruta_completa) if particion else False
+    
+    def eliminar_carpeta(self, ruta_carpeta):
+        """Elimina todos los archivos bajo una carpeta; retorna cuántos se eliminaron"""
+        particion = self.particiones.get(self._unidad(ruta_carpeta))
+        return particion.eliminar_carpeta(ruta_carpeta) if particion else 0
+    
+    def actualizar_archivo(self, ruta_vieja, archivo_nuevo, ruta_nueva):
+        """Actualiza un archivo en el índice (para renombrado, incluso entre unidades)"""
+        if self.eliminar_archivo(ruta_vieja):
+            self.insertar_archivo(archivo_nuevo, ruta_nueva)
+            return True
+        return False
+    
+    def _mezclar(self, generadores, clave, desplazamiento):
+        """Mezcla en orden los resultados de cada partición y salta los primeros 'desplazamiento'"""
+        return islice(heapq.merge(*generadores, key=clave), desplazamiento, None)
+    
+    def buscar_por_nombre(self, nombre, desplazamiento=0):
+        """Busca archivos por nombre exacto en todas las unidades, en orden de ruta"""
+        return self._mezclar([particion.buscar_por_nombre(nombre) for _, particion in self._ordenadas()],
+                             lambda valor: valor.ruta_completa, desplazamiento)
+    
+    def buscar_parcial(self, texto, desplazamiento=0):
+        """Genera los archivos que contienen texto en nombre o ruta, en orden de ruta"""
+        return self._mezclar([particion.buscar_parcial(texto) for _, particion in self._ordenadas()],
+                             lambda valor: valor.ruta_completa, desplazamiento)
+    
+    def buscar_por_carpeta(self, carpeta, desplazamiento=0):
+        """Genera los archivos bajo una carpeta: sólo la partición de su unidad puede tenerlos"""
+        particion = self.particiones.get(self._unidad(carpeta.replace('\\', '/')))
+        if particion is None:
+            return iter(())
+        return particion.buscar_por_carpeta(carpeta, desplazamiento)
+    
+    def buscar_por_contenido(self, consulta, k=10, desplazamiento=0):
+        """Busca en el contenido completo de los archivos de todas las unidades (BM25 sobre el total)"""
+        for particion in self.particiones.values():
+            particion._asegurar_contenido()
+        mejores = IndiceContenido.buscar_varios([particion.indice_contenido for particion in self.particiones.values()],
+                                                consulta, desplazamiento + k)
+        for ruta, _ in mejores[desplazamiento:]:
+            yield self.particiones[self._unidad(ruta)].arbol_b.buscar(ruta)
+    
+    def buscar_por_rango_fecha(self, campo, desde=None, hasta=None, desplazamiento=0):
+        """Genera los archivos con la fecha 'campo' entre desde y hasta, en orden de (fecha, ruta)"""
+        return self._mezclar([particion.buscar_por_rango_fecha(campo, desde, hasta)
+                              for _, particion in self._ordenadas()],
+                             lambda valor: (getattr(valor, campo), valor.ruta_completa), desplazamiento)
+    
+    def buscar_por_rango_tamanio(self, min_kb, max_kb, desplazamiento=0):
+        """Genera los archivos en un rango de tamaño, en orden de (tamaño, ruta)"""
+        return self._mezclar([particion.buscar_por_rango_tamanio(min_kb, max_kb) for _, particion in self._ordenadas()],
+                             lambda valor: (valor.tamanio_kb, valor.ruta_completa), desplazamiento)
+    
+    def buscar_combinada(self, texto, min_kb=None, max_kb=None, desplazamiento=0):
+        """Búsqueda combinada por texto y rango de tamaño (en el orden de la búsqueda de una sola partición)"""
+        if min_kb is None and max_kb is None:
+            return self.buscar_parcial(texto, desplazamiento)
+        return self._mezclar([particion.buscar_combinada(texto, min_kb, max_kb) for _, particion in self._ordenadas()],
+                             lambda valor: (valor.tamanio_kb, valor.ruta_completa), desplazamiento)
+    
+    # La presentación de resultados no depende de cómo esté guardado el índice
+    escribir_resultados = IndiceGlobal.escribir_resultados
+    mostrar_resultados = IndiceGlobal.mostrar_resultados
+    
+    def guardar_indice(self, archivo=None):
+        """
+        Guarda cada partición en su archivo (en paralelo); una partición sin cambios
+        no escribe nada. Con un archivo .json exporta el índice completo.
+        """
+        archivo = archivo or self.archivo_indice
+        if archivo.lower().endswith('.json'):
+            return self.exportar_json(archivo)
+        
+        def guardar(par):
+            unidad, particion = par
+            return particion.guardar_indice(self._archivo_particion(archivo, unidad))
+        return all(self._en_paralelo(guardar, self._ordenadas()))
+    
+    def cargar_indice(self, archivo=None):
+        """
+        Carga en paralelo la partición de cada unidad conocida y la de cada archivo de
+        partición que haya en disco. Retorna True sólo si todas se cargaron. Si todavía
+        no hay archivos de partición se carga el índice de una versión anterior, en un
+        solo archivo (ver _cargar_anterior).
+        """
+        archivo = archivo or self.archivo_indice
+        base, extension = os.path.splitext(archivo)
+        rutas = glob.glob(f"{glob.escape(base)}_*{extension}")
+        if not rutas:
+            return self._cargar_anterior(archivo)
+        for ruta in rutas:
+            self._particion(ruta[len(base) + 1:len(ruta) - len(extension)] + ':')
+        
+        def cargar(par):
+            unidad, particion = par
+            ruta = self._archivo_particion(archivo, unidad)
+            return os.path.exists(ruta) and particion.cargar_indice(ruta)
+        return bool(self.particiones) and all(self._en_paralelo(cargar, self._ordenadas()))
+    
+    def _cargar_anterior(self, archivo):
+        """
+        Carga el índice de una versión anterior (archivo con todas las unidades, o el JSON
+        por defecto, con su diario) y lo reparte por unidad, con la generación y los digests
+        de cada una; luego escribe los archivos de partición, que son los que se cargan
+        desde entonces. Retorna False si no hay índice anterior.
+        """
+        anterior = IndiceGlobal(self.t, self.nombre_motor)
+        anterior.archivo_indice = archivo
+        if not os.path.exists(archivo) and not (archivo == self.archivo_indice and os.path.exists(self.ARCHIVO_JSON)):
+            return False
+        if not anterior.cargar_indice(archivo):
+            return False
+        
+        # Las claves de cada unidad empiezan con su nombre: en orden de clave quedan contiguas
+        pares = {}
+        for clave, valor in anterior.arbol_b.seek():
+            pares.setdefault(self._unidad(clave), []).append((clave, valor))
+        digests = self._repartir_digests(anterior.digests)
+        for unidad in pares.keys() | digests.keys():
+            self._particion(unidad)
+        for unidad, particion in self.particiones.items():
+            particion.arbol_b = self.motor.bulk_load(pares.get(unidad, []), t=self.t)
+            # Como al cargar, los índices secundarios se construyen recién cuando se necesitan
+            particion._vaciar_secundarios(self.t)
+            particion._secundarios_listos = False
+            particion.generacion = anterior.generacion
+            particion.digests = digests.get(unidad, {})
+        anterior._cerrar_paginas()
+        self.guardar_indice(archivo)
+        return True
+    
+    def exportar_json(self, archivo=None):
+        """Exporta el índice completo (todas las unidades en un solo árbol) a JSON"""
+        archivo = archivo or self.ARCHIVO_JSON
+        try:
+            # Las claves de cada unidad empiezan con su nombre: en orden de unidad ya quedan ordenadas
+            pares = [par for _, particion in self._ordenadas() for par in particion.arbol_b.seek()]
+            arbol = self.motor.bulk_load(pares, t=self.t)
+            with open(archivo, 'w', encoding='utf-8') as f:
+                json.dump(arbol.to_dict(EntradaIndice.a_lista), f, ensure_ascii=False, separators=(',', ':'))
+            return True
+        except Exception as e:
+            print(f"Error exportando índice: {e}")
+            return False
+    
+    def cambiar_grado(self, t):
+        """Cambia el grado mínimo de los árboles B de todas las particiones"""
+        self.t = t
+        for particion in self.particiones.values():
+            particion.cambiar_grado(t)
+    
+    def obtener_estadisticas(self):
+        """Estadísticas del índice completo: total de archivos y altura de la partición más alta"""
+        estadisticas = [particion.obtener_estadisticas() for particion in self.particiones.values()]
+        return {
+            "total_archivos": sum(e["total_archivos"] for e in estadisticas),
+            "motor_indice": self.nombre_motor,
+            "grado_arbol_b": self.t,
+            "altura_arbol_b": max((e["altura_arbol_b"] for e in estadisticas), default=0),
+            "particiones": len(self.particiones)
+        }
@@ -4,34 +4,123 @@ modificado para múltiples unidades y árboles
 """
 import os
 import json
+import time
 from sistema import SistemaArchivos, UnidadAlmacenamiento, ListaUnidades
 from logger import Logger
 from configuracion import Configuracion
 from chatbot import ChatbotIA
 from comandos import FabricaComandos
-from indice_global import IndiceGlobal
+from indice_particionado import IndiceParticionado
+from escritor_indice import EscritorIndice
+from cargador_indice import CargadorIndice
 from arboles import BTree
 
 
 class SistemaConsola:
     """Clase principal que orquesta todo el sistema"""
     
+    # Comandos que usan el índice global (los demás no esperan a que termine de cargarse)
+    COMANDOS_INDICE = ['type', 'rm', 'rmdir', 'rename', 'ren', 'index']
+    # Comandos que modifican el índice global
+    COMANDOS_MODIFICAN_INDICE = ['type', 'rm', 'rmdir', 'rename', 'ren']
+    
     def __init__(self):
+        self._inicio_arranque = time.perf_counter()
         self.config = Configuracion()
         self.sistema_archivos = SistemaArchivos()
         self.logger = Logger()
         self.chatbot = ChatbotIA(self.config.config['api_key_cohere'])
-        self.indice_global = IndiceGlobal()
-        self._inicializar_indice_global()
-        self.sistema_archivos.actualizar_indice_global(self.indice_global)
+        self._indice_global = None
+        self._archivos_backup = None  # Archivos a indexar si el sistema se cargó desde un backup
+        self._generacion_backup = None  # Generación de ese backup
+        self._digests_backup = {}  # Digest de cada carpeta de ese backup
         self.cargar_datos_iniciales()
+        # El índice se carga (o reconstruye) en segundo plano mientras se muestra el prompt
+        self.cargador_indice = CargadorIndice(self._preparar_indice_global)
+        # Guarda el índice global en segundo plano después de cada ráfaga de cambios
+        self.escritor_indice = EscritorIndice(self._guardar_indice_global,
+                                              self.config.obtener_espera_guardado_indice(), self.logger)
+    
+    @property
+    def indice_global(self):
+        """Índice global; el primer uso espera a que termine la carga en segundo plano"""
+        if self._indice_global is None:
+            try:
+                indice = self.cargador_indice.obtener()
+            except Exception as e:
+                print(f"Error cargando índice global: {e}. Se usará un índice vacío.")
+                self.logger.registrar_error("Índice global", str(e))
+                indice = self._nuevo_indice_global()
+            self._indice_global = indice
+            self.sistema_archivos.actualizar_indice_global(indice)
+            
+            cargador = self.cargador_indice
+            tiempos = f"cargado en {cargador.segundos_carga * 1000:.0f} ms"
+            if cargador.segundos_espera:
+                tiempos += f", primer uso esperó {cargador.segundos_espera * 1000:.0f} ms"
+            print(f"Índice global: {tiempos}")
+            self.logger.registrar_operacion("Índice global", tiempos)
+        return self._indice_global
+    
+    def _nuevo_indice_global(self):
+        """
+        Crea un índice global vacío, con una partición (y un archivo) por unidad, con
+        el grado, el motor y los límites del diario configurados
+        """
+        unidades = [unidad.nombre for unidad in self.sistema_archivos.unidades.listar_unidades()]
+        indice = IndiceParticionado(self.config.obtener_grado_arbol_b(), self.config.obtener_motor_indice(), unidades)
+        indice.max_registros_diario, indice.max_bytes_diario = self.config.obtener_limites_diario_indice()
+        return indice
+    
+    def _guardar_indice_global(self):
+        return self.indice_global.guardar_indice()
+    
+    def _cerrar_indice_global(self):
+        """Detiene el guardado en segundo plano (esperando el guardado en curso) y guarda lo pendiente"""
+        # Una carga en curso puede estar escribiendo el índice: se deja terminar
+        self.cargador_indice.esperar()
+        metricas = self.escritor_indice.detener()
+        resumen = (f"{metricas['cambios_guardados']} cambios en {metricas['guardados']} guardados "
+                   f"({metricas['cambios_agrupados']} agrupados), latencia media "
+                   f"{metricas['latencia_media_ms']:.1f} ms, máxima {metricas['latencia_maxima_ms']:.1f} ms")
+        self.logger.registrar_operacion("Guardado índice global", resumen)
+        print(f"Índice global: {resumen}")
+    
+    def _preparar_indice_global(self):
+        """
+        Carga el índice global (en segundo plano). Si el sistema se cargó desde un
+        backup, el índice guardado se usa tal cual si fue sellado con la generación
+        de ese backup; si guarda digests de carpetas, se resincroniza (cada partición
+        reindexa sólo las carpetas cuyo digest cambió, o se reconstruye si se modificó
+        después de sellarla); si no, se reconstruye con todos sus archivos.
+        """
+        if self._archivos_backup is None:
+            return self._inicializar_indice_global()
+        
+        indice = self._nuevo_indice_global()
+        cargado = self._generacion_backup and indice.cargar_indice()
+        if cargado and indice.generacion == self._generacion_backup:
+            self.logger.registrar_operacion("Índice global", "Coincide con el backup, no se reconstruye")
+        elif cargado and indice.digests and self._digests_backup:
+            carpetas = indice.resincronizar(self._digests_backup, self._archivos_backup)
+            indice.sellar_generacion(self._generacion_backup, self._digests_backup)
+            indice.guardar_indice()
+            self.logger.registrar_operacion("Índice global", f"Resincronizado con el backup: {carpetas} carpetas reindexadas")
+        else:
+            return self._reconstruir_indice_global(indice, self._archivos_backup)
+        
+        # El índice de contenido no se guarda: se llena con los archivos del backup en la primera búsqueda -content
+        indice.indexar_contenido(self._archivos_backup)
+        return indice
     
     def _inicializar_indice_global(self):
         """Inicializa y carga el índice global"""
-        if not self.indice_global.cargar_indice():
-            print("Índice global: Creando nuevo índice...")
+        indice = self._nuevo_indice_global()
+        if not indice.cargar_indice():
+            self.logger.registrar_operacion("Índice global", "Creando nuevo índice")
             # Construir índice inicial con archivos existentes
             self._construir_indice_inicial()
+        return indice
     
     def _construir_indice_inicial(self):
         """Construye índice inicial con archivos del sistema"""
@@ -52,8 +141,10 @@ class SistemaConsola:
                 self.logger.registrar_operacion("Sistema", "Datos cargados desde backup")
                 print("Sistema: Datos cargados desde backup existente")
                 
-                # Reconstruir índice global después de cargar datos
-                self._reconstruir_indice_global()
+                # El índice global se reconstruye en segundo plano con los archivos cargados
+                self._archivos_backup = self.sistema_archivos.obtener_todos_archivos_con_ruta()
+                self._generacion_backup = datos_backup.get('generacion')
+                self._digests_backup = self.sistema_archivos.digests_carpetas
                 
             except Exception as e:
                 print(f"Error cargando backup: {e}. Iniciando con datos por defecto.")
@@ -61,24 +152,17 @@ class SistemaConsola:
         else:
             self._crear_datos_por_defecto()
     
-    def _reconstruir_indice_global(self):
+    def _reconstruir_indice_global(self, indice, archivos_con_ruta):
         """Reconstruye el índice global con todos los archivos"""
-        print("Índice global: Reconstruyendo índice...")
-        self.indice_global = IndiceGlobal()
-        
-        # Obtener todos los archivos con sus rutas
-        archivos_con_ruta = self.sistema_archivos.obtener_todos_archivos_con_ruta()
-        
-        # Insertar cada archivo en el índice global
-        for item in archivos_con_ruta:
-            archivo = item['archivo']
-            ruta = item['ruta']
-            self.indice_global.insertar_archivo(archivo, ruta)
+        # Carga masiva: ordena una vez y construye el árbol de abajo hacia arriba
+        indice.reconstruir(archivos_con_ruta)
+        indice.sellar_generacion(self._generacion_backup, self._digests_backup)
         
-        print(f"Índice global: {len(archivos_con_ruta)} archivos indexados")
+        self.logger.registrar_operacion("Índice global", f"Reconstruido: {len(archivos_con_ruta)} archivos indexados")
         
         # Guardar índice
-        self.indice_global.guardar_indice()
+        indice.guardar_indice()
+        return indice
     
     def _crear_datos_por_defecto(self):
         """Crea una estructura de datos por defecto para pruebas"""
@@ -133,17 +217,30 @@ class SistemaConsola:
             argumentos = partes[1] if len(partes) > 1 else None
             
             comando_obj = FabricaComandos.crear_comando(comando_base)
-            resultado = comando_obj.ejecutar(
-                self.sistema_archivos, 
-                self.logger, 
-                self.config, 
-                self.indice_global,
-                argumentos
-            )
-            
-            # Guardar índice global si se modificó
-            if comando_base in ['type', 'rm', 'rmdir', 'rename', 'ren']:
-                self.indice_global.guardar_indice()
+            # cd, dir, mkdir... no esperan a que el índice termine de cargarse (si no está listo no lo reciben)
+            usa_indice = comando_base in self.COMANDOS_INDICE or self.cargador_indice.listo
+            indice = self.indice_global if usa_indice else None
+            generacion = self.config.generacion_backup
+            # Sólo un índice que coincidía con el último backup puede sellarse con el siguiente
+            coincidia = indice is not None and generacion is not None and indice.generacion == generacion
+            # El índice no se modifica ni se consulta mientras el escritor lo está guardando
+            with self.escritor_indice.bloqueo:
+                resultado = comando_obj.ejecutar(
+                    self.sistema_archivos, 
+                    self.logger, 
+                    self.config, 
+                    indice,
+                    argumentos
+                )
+                
+                # Programar el guardado del índice global si se modificó
+                if comando_base in self.COMANDOS_MODIFICAN_INDICE:
+                    self.escritor_indice.marcar_cambios()
+                
+                # El comando actualizó el índice y escribió un backup nuevo con los mismos archivos
+                if coincidia and self.config.generacion_backup != generacion:
+                    indice.sellar_generacion(self.config.generacion_backup, self.sistema_archivos.digests_carpetas)
+                    self.escritor_indice.marcar_cambios()
             
             return resultado
             
@@ -196,12 +293,24 @@ class SistemaConsola:
         print("  index search <texto> - Buscar en índice global")
         print("  index search -range <min-max> - Buscar por tamaño")
         print("  index search -file <nombre> -range <min-max> - Búsqueda combinada")
+        print("  index search -path <carpeta> - Archivos bajo una carpeta")
+        print("  index search -name <nombre.extension> - Buscar por nombre exacto")
+        print("  index search -content <términos> - Buscar en el contenido (BM25)")
+        print("  index search -created|-modified <desde>..<hasta> - Buscar por fecha")
+        print("  index search ... --offset <n> --limit <m> --page <p> - Paginar resultados (50 por página)")
+        print("  index export [archivo.json] - Exportar el índice a JSON")
         print("También puedes usar lenguaje natural (español)")
         print("Escribe 'salir' para terminar\n")
         
-        # Mostrar estadísticas iniciales
-        stats = self.indice_global.obtener_estadisticas()
-        print(f"Índice global: {stats['total_archivos']} archivos indexados\n")
+        # Mostrar estadísticas iniciales (sin esperar al índice si todavía se está cargando)
+        if self.cargador_indice.listo:
+            stats = self.indice_global.obtener_estadisticas()
+            print(f"Índice global: {stats['total_archivos']} archivos indexados "
+                  f"(árbol {stats['motor_indice'].upper()} t={stats['grado_arbol_b']}, altura {stats['altura_arbol_b']}, "
+                  f"{stats['particiones']} particiones)")
+        else:
+            print("Índice global: cargándose en segundo plano (sólo type, rm, rmdir, rename e index lo esperan)")
+        print(f"Arranque: {(time.perf_counter() - self._inicio_arranque) * 1000:.0f} ms hasta el prompt\n")
         
         while True:
             try:
@@ -209,7 +318,7 @@ class SistemaConsola:
                 
                 if entrada.lower() in ['salir', 'exit', 'quit']:
                     # Guardar índice global antes de salir
-                    self.indice_global.guardar_indice()
+                    self._cerrar_indice_global()
                     print("¡Hasta luego!")
                     break
                 
@@ -233,7 +342,7 @@ class SistemaConsola:
             except KeyboardInterrupt:
                 print("\n\nInterrupción del usuario. Saliendo...")
                 # Guardar índice global antes de salir
-                self.indice_global.guardar_indice()
+                self._cerrar_indice_global()
                 break
             except Exception as e:
                 print(f"Error inesperado: {e}")
@@ -1,6 +1,7 @@
 """
 Módulo que define la clase Carpeta del sistema
 """
+import hashlib
 from datetime import datetime
 from arboles import ArbolBinarioBusqueda, NodoArbolNario
 from .archivo import Archivo
@@ -27,17 +28,35 @@ class Carpeta:
         self.arbol_archivos = ArbolBinarioBusqueda()
         self.nodo_arbol = NodoArbolNario(self)
         self.fecha_creacion = datetime.now()
+        # Carpeta que la contiene (None en la raíz de una unidad)
+        self.padre = None
+        # Resultado del último to_dict; None si la carpeta (o algo debajo) cambió desde entonces
+        self._serializada = None
     
     def __str__(self):
         return f"[CARPETA] {self.nombre} ({len(self.listar_archivos())} archivos)"
     
+    def marcar_modificada(self):
+        """
+        Anota que la carpeta cambió (también si cambió uno de sus archivos): descarta
+        su serialización y la de sus ancestros, que la incluyen. Si un ancestro ya
+        estaba marcado, los de más arriba también lo están.
+        """
+        carpeta = self
+        while carpeta is not None and carpeta._serializada is not None:
+            carpeta._serializada = None
+            carpeta = carpeta.padre
+    
     def agregar_archivo(self, archivo):
         """Agrega un archivo al árbol binario de la carpeta"""
         self.arbol_archivos.insertar(archivo)
+        self.marcar_modificada()
     
     def agregar_subcarpeta(self, carpeta):
         """Agrega una subcarpeta al árbol n-ario"""
         self.nodo_arbol.agregar_hijo(carpeta.nodo_arbol)
+        carpeta.padre = self
+        self.marcar_modificada()
     
     def buscar_archivo(self, nombre):
         """Busca un archivo por nombre en el árbol binario"""
@@ -68,7 +87,10 @@ class Carpeta:
     
     def eliminar_archivo_completo(self, nombre):
         """Elimina un archivo completamente del árbol binario"""
-        return self.arbol_archivos.eliminar(nombre)
+        eliminado = self.arbol_archivos.eliminar(nombre)
+        if eliminado:
+            self.marcar_modificada()
+        return eliminado
 
     
     def eliminar_carpeta(self, nombre):
@@ -77,6 +99,8 @@ class Carpeta:
         for i, hijo in enumerate(self.nodo_arbol.hijos):
             if hijo.dato.nombre.lower() == nombre_lower:
                 del self.nodo_arbol.hijos[i]
+                hijo.dato.padre = None
+                self.marcar_modificada()
                 return True
         return False
     
@@ -97,20 +121,54 @@ class Carpeta:
         return [hijo.dato for hijo in self.nodo_arbol.hijos]
     
     def to_dict(self):
-        """Convierte la carpeta a diccionario para serialización"""
-        return {
+        """
+        Convierte la carpeta a diccionario para serialización (con su digest Merkle).
+        Se guarda el resultado: mientras la carpeta no se marque como modificada,
+        se reutiliza sin volver a recorrer su subárbol.
+        """
+        if self._serializada is not None:
+            return self._serializada
+        
+        archivos = [archivo.to_dict() for archivo in self.listar_archivos()]
+        subcarpetas = [carpeta.to_dict() for carpeta in self.listar_subcarpetas()]
+        self._serializada = {
             'nombre': self.nombre,
             'ruta': self.ruta,
             'ruta_completa': self.ruta_completa,
             'fecha_creacion': self.fecha_creacion.isoformat(),
-            'archivos': [archivo.to_dict() for archivo in self.listar_archivos()],
-            'subcarpetas': [carpeta.to_dict() for carpeta in self.listar_subcarpetas()]
+            'archivos': archivos,
+            'subcarpetas': subcarpetas,
+            'digest': self.calcular_digest(archivos, subcarpetas)
         }
+        return self._serializada
+    
+    @staticmethod
+    def calcular_digest(archivos, subcarpetas):
+        """
+        Digest Merkle de una carpeta serializada: cubre (nombre, extensión, tamaño,
+        fecha de modificación) de sus archivos y (nombre, digest) de sus subcarpetas,
+        así que un digest igual garantiza que todo el subárbol es igual
+        """
+        partes = sorted(f"{a['nombre']}\0{a['extension']}\0{a['tamanio_kb']!r}\0{a['fecha_modificacion']}"
+                        for a in archivos)
+        partes.append('')
+        partes.extend(sorted(f"{c['nombre']}\0{c['digest']}" for c in subcarpetas))
+        return hashlib.blake2b('\n'.join(partes).encode('utf-8'), digest_size=16).hexdigest()
+    
+    @classmethod
+    def recolectar_digests(cls, data, digests):
+        """Agrega a digests el digest de cada carpeta de un diccionario de to_dict, por ruta_completa"""
+        if 'digest' in data:
+            digests[data['ruta_completa']] = data['digest']
+        for subcarpeta_data in data['subcarpetas']:
+            cls.recolectar_digests(subcarpeta_data, digests)
     
     @classmethod
     def from_dict(cls, data):
         """Crea una carpeta desde diccionario"""
         carpeta = cls(data['nombre'], data['ruta'])
+        # La raíz de una unidad no sigue la regla ruta + nombre ("C::/"): se respeta la guardada
+        carpeta.ruta_completa = data.get('ruta_completa', carpeta.ruta_completa)
         carpeta.fecha_creacion = datetime.fromisoformat(data['fecha_creacion'])
         
         # Recargar archivos
@@ -2,6 +2,7 @@
 Módulo que define el gestor principal del sistema de archivos
 """
 from .unidad import UnidadAlmacenamiento
+from .carpeta import Carpeta
 
 
 class NodoUnidad:
@@ -89,6 +90,8 @@ class SistemaArchivos:
     def __init__(self):
         self.unidades = ListaUnidades()
         self.indice_global = None
+        # Digest de cada carpeta en la última estructura guardada o cargada (ruta_completa -> digest)
+        self.digests_carpetas = {}
         self._inicializar_unidades_predeterminadas()
     
     def _inicializar_unidades_predeterminadas(self):
@@ -145,9 +148,20 @@ class SistemaArchivos:
         self.indice_global = indice
     
     def obtener_estructura_completa(self):
-        """Obtiene toda la estructura del sistema para backup"""
-        return self.unidades.to_dict()
+        """Obtiene toda la estructura del sistema para backup (y recuerda el digest de cada carpeta)"""
+        estructura = self.unidades.to_dict()
+        self.digests_carpetas = self._recolectar_digests(estructura)
+        return estructura
     
     def cargar_estructura(self, data):
         """Carga la estructura del sistema desde backup"""
         self.unidades = ListaUnidades.from_dict(data)
+        self.digests_carpetas = self._recolectar_digests(data)
+    
+    def _recolectar_digests(self, estructura):
+        """Digest Merkle de cada carpeta de una estructura serializada: ruta_completa -> digest"""
+        digests = {}
+        for unidad_data in estructura['unidades']:
+            if unidad_data['estructura']:
+                Carpeta.recolectar_digests(unidad_data['estructura'], digests)
+        return digests
@@ -0,0 +1,146 @@
+"""
+Pruebas de los backups incrementales: una base completa más sus deltas debe
+reconstruir la misma estructura que un backup completo, y una cadena cortada
+se aplica sólo hasta el último delta válido.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from configuracion import Configuracion
+from tests.utilidades import construir_sistema, obtener_carpeta
+
+
+def _serializar(datos):
+    return json.dumps({'unidades': datos['unidades'], 'unidad_actual': datos['unidad_actual']}, sort_keys=True)
+
+
+class TestBackupIncremental(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.backups = os.path.join(self.directorio, "backups")
+        self.sistema = construir_sistema()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio)
+    
+    def _configuracion(self, deltas_por_base=50):
+        archivo_config = os.path.join(self.directorio, "config.json")
+        with open(archivo_config, 'w', encoding='utf-8') as f:
+            json.dump({"backup_dir": self.backups, "backup_automatico": True, "formato_backup": "json",
+                       "backup_deltas_por_base": deltas_por_base}, f)
+        return Configuracion(archivo_config)
+    
+    def _cambios(self):
+        """Cambios como los de distintos comandos, para aplicar en orden"""
+        unidad_c = self.sistema.unidades.obtener_unidad("C:")
+        docs = obtener_carpeta(self.sistema, "C::/Docs")
+        
+        def mkdir():
+            unidad_c.crear_carpeta("Nueva", docs)
+        
+        def archivo_en_carpeta_nueva():
+            unidad_c.crear_archivo("dentro", "Contenido dentro", docs.buscar_carpeta("Nueva"))
+        
+        def type_():
+            carpeta = obtener_carpeta(self.sistema, "D::/Proyectos/Viejos")
+            carpeta.buscar_archivo("viejo_2").actualizar_contenido("Contenido actualizado")
+            carpeta.marcar_modificada()
+        
+        def rmdir():
+            obtener_carpeta(self.sistema, "C::/Musica").eliminar_carpeta("Viejos")
+        
+        def cd():
+            self.sistema.cambiar_unidad("D:")
+            unidad_d = self.sistema.unidades.obtener_unidad("D:")
+            unidad_d.directorio_actual = obtener_carpeta(self.sistema, "D::/Backup")
+        
+        def archivo_en_unidad_vacia():
+            unidad_f = self.sistema.unidades.obtener_unidad("F:")
+            unidad_f.crear_archivo("suelto", "Primer archivo de F:", unidad_f.arbol_directorios.raiz.dato)
+        
+        return [mkdir, archivo_en_carpeta_nueva, type_, rmdir, cd, archivo_en_unidad_vacia]
+    
+    def _respaldar(self, config):
+        estructura = self.sistema.obtener_estructura_completa()
+        return config.hacer_backup(estructura), _serializar(estructura)
+    
+    def test_base_mas_deltas_reconstruye_la_estructura(self):
+        config = self._configuracion()
+        base, _ = self._respaldar(config)
+        for cambio in self._cambios():
+            cambio()
+            archivo, esperado = self._respaldar(config)
+            self.assertTrue(os.path.basename(archivo).startswith("delta_"))
+            # Un delta sólo lleva las carpetas que cambiaron
+            self.assertLess(os.path.getsize(archivo), os.path.getsize(base))
+            
+            cargada = self._configuracion()
+            datos = cargada.cargar_ultimo_backup()
+            self.assertEqual(_serializar(datos), esperado)
+            self.assertEqual(datos['generacion'], config.generacion_backup)
+    
+    def test_backup_cargado_sigue_la_cadena(self):
+        config = self._configuracion()
+        self._respaldar(config)
+        cambios = self._cambios()
+        cambios[0]()
+        self._respaldar(config)
+        
+        # Otra sesión carga la cadena y agrega sus propios deltas encima
+        config = self._configuracion()
+        config.cargar_ultimo_backup()
+        for cambio in cambios[1:]:
+            cambio()
+            archivo, esperado = self._respaldar(config)
+            self.assertTrue(os.path.basename(archivo).startswith("delta_"))
+        
+        self.assertEqual(_serializar(self._configuracion().cargar_ultimo_backup()), esperado)
+    
+    def test_cadena_cortada_se_aplica_hasta_el_ultimo_delta_valido(self):
+        config = self._configuracion()
+        self._respaldar(config)
+        estados = []
+        for cambio in self._cambios()[:3]:
+            cambio()
+            archivo, esperado = self._respaldar(config)
+            estados.append((esperado, config.generacion_backup))
+        
+        # El último delta quedó cortado a mitad de la escritura
+        with open(archivo, 'r+b') as f:
+            f.truncate(os.path.getsize(archivo) // 2)
+        datos = self._configuracion().cargar_ultimo_backup()
+        self.assertEqual((_serializar(datos), datos['generacion']), estados[1])
+        
+        # Falta un delta del medio: los siguientes no se aplican sobre el anterior
+        deltas = sorted(f for f in os.listdir(self.backups) if f.startswith("delta_"))
+        os.remove(os.path.join(self.backups, deltas[1]))
+        datos = self._configuracion().cargar_ultimo_backup()
+        self.assertEqual((_serializar(datos), datos['generacion']), estados[0])
+    
+    def test_nueva_base_cada_backup_deltas_por_base(self):
+        config = self._configuracion(deltas_por_base=2)
+        nombres = (os.path.join(self.backups, f"backup_{i:02d}.json") for i in range(10))
+        with mock.patch.object(config, 'generar_nombre_backup', side_effect=lambda: next(nombres)):
+            tipos = []
+            for cambio in [lambda: None] + self._cambios():
+                cambio()
+                archivo, esperado = self._respaldar(config)
+                tipos.append(os.path.basename(archivo).split('_')[0])
+        
+        self.assertEqual(tipos, ["backup", "delta", "delta", "backup", "delta", "delta", "backup"])
+        self.assertEqual(_serializar(self._configuracion().cargar_ultimo_backup()), esperado)
+    
+    def test_sin_cambios_el_delta_no_lleva_carpetas(self):
+        config = self._configuracion()
+        self._respaldar(config)
+        archivo, _ = self._respaldar(config)
+        with open(archivo, 'r', encoding='utf-8') as f:
+            delta = json.load(f)
+        self.assertEqual([unidad.get('carpetas') for unidad in delta['unidades']], [[], [], []])
+
+
+if __name__ == "__main__":
+    unittest.main()
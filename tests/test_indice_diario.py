@@ -0,0 +1,112 @@
+"""
+Pruebas del diario de cambios del índice global: reproducción al cargar, cola
+dañada, checkpoint interrumpido y búsquedas sobre un índice recién cargado.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from indice_global import IndiceGlobal
+from sistema import Archivo
+from tests.utilidades import construir_sistema, entradas
+
+GRADO = 3
+
+
+class TestDiarioIndice(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "indice_global.idx")
+        self.diario = os.path.join(self.directorio, "indice_global.diario")
+        self.indice = IndiceGlobal(GRADO)
+        self.indice.reconstruir(construir_sistema().obtener_todos_archivos_con_ruta())
+        self.indice.sellar_generacion("g1")
+        self.assertTrue(self.indice.guardar_indice(self.archivo))
+    
+    def tearDown(self):
+        self.indice._cerrar_paginas()
+        shutil.rmtree(self.directorio)
+    
+    def _cargar(self):
+        cargado = IndiceGlobal(GRADO)
+        self.assertTrue(cargado.cargar_indice(self.archivo))
+        self.addCleanup(cargado._cerrar_paginas)
+        return cargado
+    
+    def _modificar(self, indice):
+        indice.insertar_archivo(Archivo("nuevo", "Contenido nuevo"), "C::/Docs")
+        indice.eliminar_archivo("C::/Fotos/fotos_1.txt")
+        indice.eliminar_carpeta("D::/Backup")
+    
+    def test_guardado_sin_cambios_no_crea_diario(self):
+        self.assertTrue(self.indice.guardar_indice(self.archivo))
+        self.assertFalse(os.path.exists(self.diario))
+    
+    def test_cambios_van_al_diario_y_se_reproducen_al_cargar(self):
+        tamanio_indice = os.path.getsize(self.archivo)
+        self._modificar(self.indice)
+        self.assertTrue(self.indice.guardar_indice(self.archivo))
+        
+        self.assertTrue(os.path.exists(self.diario))
+        self.assertEqual(os.path.getsize(self.archivo), tamanio_indice)
+        cargado = self._cargar()
+        self.assertEqual(entradas(cargado), entradas(self.indice))
+        self.assertIsNone(cargado.generacion)
+    
+    def test_cola_incompleta_del_diario_se_descarta(self):
+        self._modificar(self.indice)
+        self.indice.guardar_indice(self.archivo)
+        esperado = entradas(self.indice)
+        with open(self.diario, 'ab') as f:
+            f.write(b'["i","C::/Docs/cortado.txt",[0.1,')
+        
+        cargado = self._cargar()
+        self.assertEqual(entradas(cargado), esperado)
+        # Los registros nuevos no quedan pegados a la línea cortada
+        cargado.insertar_archivo(Archivo("despues", "Otro contenido"), "C::/Musica")
+        self.assertTrue(cargado.guardar_indice(self.archivo))
+        self.assertEqual(entradas(self._cargar()), entradas(cargado))
+    
+    def test_checkpoint_al_superar_el_limite_del_diario(self):
+        self.indice.max_registros_diario = 2
+        self._modificar(self.indice)
+        self.assertTrue(self.indice.guardar_indice(self.archivo))
+        
+        self.assertFalse(os.path.exists(self.diario))
+        self.assertEqual(entradas(self._cargar()), entradas(self.indice))
+    
+    def test_checkpoint_interrumpido_no_reproduce_el_diario_viejo(self):
+        self.indice.insertar_archivo(Archivo("borrable", "Se elimina despues"), "C::/Docs")
+        self.indice.guardar_indice(self.archivo)
+        diario_viejo = os.path.join(self.directorio, "diario_viejo")
+        shutil.copy(self.diario, diario_viejo)
+        
+        # Checkpoint con el archivo ya eliminado y otra generación, cortado antes de borrar el diario
+        self.indice.eliminar_archivo("C::/Docs/borrable.txt")
+        self.indice.sellar_generacion("g2")
+        self.indice._checkpoint(self.archivo)
+        shutil.copy(diario_viejo, self.diario)
+        
+        cargado = self._cargar()
+        self.assertIsNone(cargado.arbol_b.buscar("C::/Docs/borrable.txt"))
+        self.assertEqual(cargado.generacion, "g2")
+        self.assertEqual(entradas(cargado), entradas(self.indice))
+        self.assertEqual(os.path.getsize(self.diario), 0)
+        
+        # El diario vaciado vuelve a aceptar cambios sobre el checkpoint nuevo
+        cargado.insertar_archivo(Archivo("otro", "Contenido"), "D::/Proyectos")
+        self.assertTrue(cargado.guardar_indice(self.archivo))
+        self.assertEqual(entradas(self._cargar()), entradas(cargado))
+    
+    def test_buscar_parcial_tras_cargar_construye_los_trigramas(self):
+        cargado = self._cargar()
+        self.assertFalse(cargado._secundarios_listos)
+        
+        resultados = [valor.ruta_completa for valor in cargado.buscar_parcial("viejo_2")]
+        self.assertTrue(cargado._secundarios_listos)
+        self.assertEqual(resultados, [valor.ruta_completa for valor in self.indice.buscar_parcial("viejo_2")])
+        self.assertEqual(len(resultados), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Pruebas de la carga del índice particionado a partir de un índice de una versión
+anterior, con todas las unidades en un solo archivo (.idx o el JSON por defecto).
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from indice_global import IndiceGlobal
+from indice_particionado import IndiceParticionado
+from tests.utilidades import construir_sistema, entradas
+
+GRADO = 3
+UNIDADES = ["C:", "D:", "F:"]
+
+
+class TestMigracionIndice(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "indice_global.idx")
+        sistema = construir_sistema()
+        sistema.obtener_estructura_completa()
+        self.anterior = IndiceGlobal(GRADO)
+        self.anterior.reconstruir(sistema.obtener_todos_archivos_con_ruta())
+        self.anterior.sellar_generacion("g1", sistema.digests_carpetas)
+        self.total = self.anterior.obtener_estadisticas()["total_archivos"]
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio)
+    
+    def _cargar(self, archivo=None):
+        indice = IndiceParticionado(GRADO, unidades=UNIDADES)
+        self.assertTrue(indice.cargar_indice(archivo))
+        return indice
+    
+    def _comprobar_migrado(self, indice):
+        self.assertEqual(indice.obtener_estadisticas()["total_archivos"], self.total)
+        self.assertEqual(entradas(indice), entradas(self.anterior))
+        self.assertEqual(sorted(unidad for unidad, particion in indice.particiones.items()
+                                if particion.obtener_estadisticas()["total_archivos"]), ["C:", "D:"])
+    
+    def test_indice_de_un_solo_archivo_se_reparte_por_unidad(self):
+        self.assertTrue(self.anterior.guardar_indice(self.archivo))
+        
+        indice = self._cargar(self.archivo)
+        self._comprobar_migrado(indice)
+        self.assertEqual(indice.generacion, "g1")
+        self.assertEqual(indice.digests, self.anterior.digests)
+        
+        # Quedan escritos los archivos de partición, que son los que se cargan la próxima vez
+        for unidad in ("C", "D", "F"):
+            self.assertTrue(os.path.exists(os.path.join(self.directorio, f"indice_global_{unidad}.idx")))
+        self._comprobar_migrado(self._cargar(self.archivo))
+    
+    def test_diario_del_indice_anterior_se_aplica(self):
+        self.assertTrue(self.anterior.guardar_indice(self.archivo))
+        self.anterior.eliminar_carpeta("D::/Backup")
+        self.assertTrue(self.anterior.guardar_indice(self.archivo))
+        self.total = self.anterior.obtener_estadisticas()["total_archivos"]
+        
+        self._comprobar_migrado(self._cargar(self.archivo))
+    
+    def test_json_por_defecto_de_una_version_anterior(self):
+        directorio_original = os.getcwd()
+        os.chdir(self.directorio)
+        self.addCleanup(os.chdir, directorio_original)
+        self.assertTrue(self.anterior.exportar_json())
+        
+        self._comprobar_migrado(self._cargar())
+    
+    def test_sin_indice_anterior_no_carga(self):
+        indice = IndiceParticionado(GRADO, unidades=UNIDADES)
+        self.assertFalse(indice.cargar_indice(self.archivo))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Pruebas de resincronizar: poner al día un índice guardado comparando los digests
+de las carpetas debe dejar lo mismo que reconstruirlo con todos los archivos.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from indice_global import IndiceGlobal
+from indice_particionado import IndiceParticionado
+from sistema import Archivo
+from tests.utilidades import construir_sistema, obtener_carpeta, entradas
+
+GRADO = 3
+UNIDADES = ["C:", "D:", "F:"]
+
+
+def _modificar_sistema(sistema):
+    """Un archivo nuevo, uno modificado y una carpeta eliminada, en C: y D:"""
+    docs = obtener_carpeta(sistema, "C::/Docs")
+    sistema.unidades.obtener_unidad("C:").crear_archivo("agregado", "Contenido agregado", docs)
+    viejos = obtener_carpeta(sistema, "D::/Proyectos/Viejos")
+    viejos.buscar_archivo("viejo_1").actualizar_contenido("Contenido modificado y mas largo")
+    viejos.marcar_modificada()
+    obtener_carpeta(sistema, "C::/Fotos").eliminar_carpeta("Viejos")
+
+
+class TestResincronizacion(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "indice_global.idx")
+        self.sistema = construir_sistema()
+        self.sistema.obtener_estructura_completa()
+        self.digests_sellados = dict(self.sistema.digests_carpetas)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio)
+    
+    def _guardar_sellado(self, nuevo):
+        indice = nuevo()
+        indice.reconstruir(self.sistema.obtener_todos_archivos_con_ruta())
+        indice.sellar_generacion("g1", self.digests_sellados)
+        self.assertTrue(indice.guardar_indice(self.archivo))
+        return indice
+    
+    def _cargar(self, nuevo):
+        indice = nuevo()
+        self.assertTrue(indice.cargar_indice(self.archivo))
+        return indice
+    
+    def _reconstruido(self, nuevo):
+        indice = nuevo()
+        indice.reconstruir(self.sistema.obtener_todos_archivos_con_ruta())
+        return indice
+    
+    def _comprobar_resincronizado(self, nuevo):
+        _modificar_sistema(self.sistema)
+        self.sistema.obtener_estructura_completa()
+        archivos = self.sistema.obtener_todos_archivos_con_ruta()
+        
+        indice = self._cargar(nuevo)
+        carpetas = indice.resincronizar(self.sistema.digests_carpetas, archivos)
+        indice.indexar_contenido(archivos)
+        esperado = self._reconstruido(nuevo)
+        self.assertGreater(carpetas, 0)
+        self.assertEqual(entradas(indice), entradas(esperado))
+        self.assertEqual([valor.ruta_completa for valor in indice.buscar_por_contenido("modificado")],
+                         ["D::/Proyectos/Viejos/viejo_1.txt"])
+        return indice
+    
+    def test_sin_cambios_no_reindexa_nada(self):
+        self._guardar_sellado(lambda: IndiceGlobal(GRADO))
+        indice = self._cargar(lambda: IndiceGlobal(GRADO))
+        carpetas = indice.resincronizar(self.digests_sellados, self.sistema.obtener_todos_archivos_con_ruta())
+        self.assertEqual(carpetas, 0)
+        # El árbol sigue leyéndose desde el archivo
+        self.assertIsNotNone(indice._paginas)
+    
+    def test_indice_global_resincronizado_igual_a_reconstruido(self):
+        self._guardar_sellado(lambda: IndiceGlobal(GRADO))
+        self._comprobar_resincronizado(lambda: IndiceGlobal(GRADO))
+    
+    def test_particionado_resincronizado_igual_a_reconstruido(self):
+        self._guardar_sellado(lambda: IndiceParticionado(GRADO, unidades=UNIDADES))
+        self._comprobar_resincronizado(lambda: IndiceParticionado(GRADO, unidades=UNIDADES))
+    
+    def test_particion_modificada_despues_de_sellar_se_reconstruye(self):
+        indice = self._guardar_sellado(lambda: IndiceParticionado(GRADO, unidades=UNIDADES))
+        # Un cambio en D: que no llegó al backup, en una carpeta que el backup no cambia:
+        # esa partición pierde su generación y resincronizar la reconstruye
+        indice.insertar_archivo(Archivo("huerfano", "No esta en el backup"), "D::/Backup")
+        self.assertTrue(indice.guardar_indice(self.archivo))
+        
+        cargado = self._cargar(lambda: IndiceParticionado(GRADO, unidades=UNIDADES))
+        self.assertIsNone(cargado.particiones["D:"].generacion)
+        self.assertEqual(cargado.particiones["C:"].generacion, "g1")
+        self.assertIsNone(cargado.generacion)
+        self.assertTrue(cargado.digests)
+        
+        self._comprobar_resincronizado(lambda: IndiceParticionado(GRADO, unidades=UNIDADES))
+
+
+if __name__ == "__main__":
+    unittest.main()
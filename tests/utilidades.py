@@ -0,0 +1,35 @@
+"""
+Utilidades comunes de las pruebas: un sistema de archivos chico con carpetas
+en varias unidades y la lista ordenada de entradas de un índice global.
+"""
+from sistema import SistemaArchivos
+
+
+def construir_sistema():
+    """SistemaArchivos con carpetas anidadas y archivos en C: y D: (F: queda vacía)"""
+    sistema = SistemaArchivos()
+    for nombre_unidad, carpetas in (("C:", ("Docs", "Fotos", "Musica")), ("D:", ("Proyectos", "Backup"))):
+        unidad = sistema.unidades.obtener_unidad(nombre_unidad)
+        raiz = unidad.arbol_directorios.raiz.dato
+        for nombre in carpetas:
+            carpeta = unidad.crear_carpeta(nombre, raiz)
+            subcarpeta = unidad.crear_carpeta("Viejos", carpeta)
+            for i in range(4):
+                unidad.crear_archivo(f"{nombre.lower()}_{i}", f"Contenido de {nombre} numero {i}", carpeta)
+                unidad.crear_archivo(f"viejo_{i}", f"Version vieja {i} de {nombre}", subcarpeta)
+    return sistema
+
+
+def obtener_carpeta(sistema, ruta_completa):
+    """Carpeta de sistema por su ruta completa (ej: C::/Docs/Viejos)"""
+    nombre_unidad, resto = ruta_completa.split(':/', 1)
+    carpeta = sistema.unidades.obtener_unidad(nombre_unidad).arbol_directorios.raiz.dato
+    for parte in resto.strip('/').split('/'):
+        if parte:
+            carpeta = carpeta.buscar_carpeta(parte)
+    return carpeta
+
+
+def entradas(indice):
+    """Todas las entradas de un índice (de una o varias particiones), en orden de ruta"""
+    return [(valor.ruta_completa, valor.a_lista()) for valor in indice.buscar_parcial("")]